@@ -1,96 +1,311 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, g, render_template, jsonify, request
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import os
 import base64
 import json
-from matplotlib.backends.backend_agg import FigureCanvasAgg
+import resource
+import time
+import tracemalloc
 import warnings
+import contextvars
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import wraps
+from multiprocessing import resource_tracker
+from binary_format import MEDIA_TYPE, Matrix, encode, negotiate, to_jsonable
+from charts import CHART_OPTIONS, IMAGE_FORMATS, prepare_chart, render_chart
+from column_cache import CACHE_DIR, load_csv
+from compact_dtypes import append_rows, compact_frame, memory_report
+from correlation import CorrelationIndex, CorrelationStats
+from datasets import (Dataset, DatasetRegistry, active_dataset, parse_datasets, release_dataset,
+                      use_dataset)
+from filters import FilterCache, FilterError, column_index, describe, parse_filter, resolve
+from feature_selection import DEFAULT_THRESHOLDS, removed_columns, select_features
+from downsample import (AUTO_THRESHOLD, DEFAULT_MAX_POINTS, DEFAULT_RESOLUTION,
+                        reduce_values, scatter_lod)
+from http_cache import DiskCache, ResponseCache, make_etag
+from groups import GroupIndex, parse_stats, segment_stats
+from jobs import JobStore
+from null_masks import NullMaskIndex, missing_report
+from metrics import BYTE_BUCKETS, CONTENT_TYPE, Registry, current_profile, end_profile, start_profile
+from model_search import run_search, search_cache_path
+from price_model import load_or_fit
+from sample_data import make_sample_data
+from pipeline import Pipeline, Snapshot, make_version, run_stages, source_signature, timed_call
+from shared_dataset import SharedDatasetStore
+from sketches import EXACT_MAX_ROWS, box_plot_stats, quartiles, sketch_frame
+from timeseries import FREQUENCIES, MONTH, YEAR, SaleIndex, parse_stats as parse_trend_stats
+from streaming import DEFAULT_MEMORY_BUDGET_MB, stream_csv
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 
-# Global variable to store data
-data = None
-
-def load_and_process_data():
-    """Load and process the house price data"""
-    global data
+# Data file and default analysis parameters
+DATA_PATH = 'data.csv'  # Update with your actual file path
+IQR_MULTIPLIER = 3
+
+# Named datasets (``?dataset=``): the default one reads DATA_PATH, DATASETS adds more as
+# "name=path;name=path". Their frames are kept under DATASET_CACHE_MB, least recently used
+# datasets being spilled to disk
+DEFAULT_DATASET = os.environ.get('DEFAULT_DATASET', 'default')
+DATASETS = parse_datasets(os.environ.get('DATASETS'))
+DATASET_CACHE_MB = int(os.environ.get('DATASET_CACHE_MB', 2048))
+
+# Files larger than this are summarised in bounded chunks instead of loaded whole
+STREAM_THRESHOLD_BYTES = 512 * 1024 * 1024
+STREAM_MEMORY_BUDGET_MB = DEFAULT_MEMORY_BUDGET_MB
+
+# Features removed by the original notebook analysis (``?drop=original``); by default
+# the feature stage selects columns from the data instead (see feature_selection.py)
+AUTO_SELECT = 'auto'
+FEATURE_THRESHOLDS = dict(DEFAULT_THRESHOLDS)
+COLS_TO_REMOVE = [
+    'BsmtFinSF1', 'LotFrontage', 'WoodDeckSF', '2ndFlrSF', 'OpenPorchSF',
+    'HalfBath', 'LotArea', 'BsmtFullBath', 'BsmtUnfSF', 'BedroomAbvGr',
+    'ScreenPorch', 'PoolArea', 'MoSold', '3SsnPorch', 'BsmtHalfBath',
+    'MiscVal', 'Id', 'LowQualFinSF', 'YrSold', 'OverallCond', 'MSSubClass',
+    'EnclosedPorch', 'KitchenAbvGr', 'FireplaceQu', 'Fence', 'Alley',
+    'MiscFeature', 'PoolQC', 'GarageCars', '1stFlrSF', 'FullBath'
+]
+
+# Ridge penalty of the price model fitted on the feature-reduced snapshot
+MODEL_ALPHA = 1.0
+
+# Parameters in effect when a request does not override them. Every dataset starts from
+# these; a model search (POST /api/model-search) replaces a dataset's copy with the best
+# cross-validated configuration
+pipeline_params = {
+    'iqr_multiplier': IQR_MULTIPLIER,
+    'cols_to_remove': AUTO_SELECT,
+    'alpha': MODEL_ALPHA,
+    'source': 'default'
+}
+
+# Default search grid
+SEARCH_IQR_MULTIPLIERS = (1.5, 2.0, 2.5, 3.0, 4.0)
+SEARCH_ALPHAS = (0.1, 1.0, 10.0, 100.0)
+
+# Prometheus metrics served at /metrics; TRACE_MEMORY=1 also records peak memory per stage
+TRACE_MEMORY = os.environ.get('TRACE_MEMORY', '').lower() in ('1', 'true', 'yes')
+if TRACE_MEMORY:
+    tracemalloc.start()
+metrics = Registry()
+request_seconds = metrics.histogram('http_request_duration_seconds', 'Request latency by route',
+                                    ('route', 'method', 'status'))
+response_bytes = metrics.histogram('http_response_bytes', 'Response body size by route',
+                                   ('route',), buckets=BYTE_BUCKETS)
+serialize_seconds = metrics.histogram('http_serialize_seconds',
+                                      'Time spent encoding response payloads', ('route', 'format'))
+stage_seconds = metrics.histogram('pipeline_stage_duration_seconds',
+                                  'Computation time of pipeline stages (cache misses)', ('stage',))
+stage_cache = metrics.counter('pipeline_cache_requests_total',
+                              'Pipeline stage lookups by cache result', ('stage', 'result'))
+stage_rows = metrics.counter('pipeline_rows_processed_total',
+                             'Rows read by computed pipeline stages', ('stage',))
+stage_columns = metrics.gauge('pipeline_stage_columns',
+                              'Columns read by the last computed run of a stage', ('stage',))
+render_seconds = metrics.histogram('chart_render_seconds',
+                                   'Time to draw a chart image on the render pool', ('chart',))
+stage_peak_bytes = metrics.gauge('pipeline_stage_peak_bytes',
+                                 'Peak traced memory of the last computed run of a stage',
+                                 ('stage',))
+
+def observe_stage(stage, hit, seconds, frame, peak_bytes):
+    """Pipeline observer: feed stage metrics and the current request's profile"""
+    stage_cache.inc(stage=stage, result='hit' if hit else 'miss')
+    profile = current_profile()
+    if profile is not None:
+        profile.add(f"stage-{stage}", seconds, 'hit' if hit else 'miss')
+    if hit:
+        return
+    stage_seconds.observe(seconds, stage=stage)
+    if frame is not None:
+        stage_rows.inc(len(frame), stage=stage)
+        stage_columns.set(len(frame.columns), stage=stage)
+    if peak_bytes is not None:
+        stage_peak_bytes.set(peak_bytes, stage=stage)
+
+# Independent pipeline stages run concurrently; correlation is split by column block.
+# The block pool may be 'thread' (NumPy releases the GIL) or 'process' (blocks read the
+# data from shared memory).
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', os.cpu_count() or 1))
+CORRELATION_POOL = os.environ.get('CORRELATION_POOL', 'thread')
+stage_executor = ThreadPoolExecutor(max_workers=max(PIPELINE_WORKERS, 3),
+                                    thread_name_prefix='pipeline-stage')
+if CORRELATION_POOL == 'process':
+    # Started before the workers fork, so they share it and the per-run shared-memory
+    # blocks are tracked (and released) by this process only
+    resource_tracker.ensure_running()
+correlation_executor = (ProcessPoolExecutor(max_workers=PIPELINE_WORKERS)
+                        if CORRELATION_POOL == 'process'
+                        else ThreadPoolExecutor(max_workers=PIPELINE_WORKERS,
+                                                thread_name_prefix='correlation-block'))
+
+# Background process-all runs (POST /api/jobs); finished results are kept in a bounded store
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+job_store = JobStore(ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='pipeline-job'))
+
+# Chart images are drawn on a process pool (matplotlib holds the GIL while drawing)
+# and kept in a size-capped disk LRU keyed by chart, options, format and dataset version
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+RENDER_TIMEOUT = float(os.environ.get('RENDER_TIMEOUT', 120))
+RENDER_CACHE_MB = int(os.environ.get('RENDER_CACHE_MB', 256))
+render_executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+render_pool_lock = threading.Lock()
+render_cache = DiskCache(os.path.join(CACHE_DIR, 'render'), RENDER_CACHE_MB * 1024 * 1024)
+
+# Directory shared by several worker processes (e.g. gunicorn -w 4); unset = one process
+SHARED_DATA_DIR = os.environ.get('SHARED_DATA_DIR')
+
+# Rendered read-endpoint responses, keyed by ETag (dataset version + request)
+response_cache = ResponseCache()
+
+# Clause bitmaps and filtered snapshots for ``?filter=``, in an LRU capped at FILTER_CACHE_MB
+FILTER_CACHE_MB = int(os.environ.get('FILTER_CACHE_MB', 256))
+filter_cache = FilterCache(FILTER_CACHE_MB * 1024 * 1024)
+
+# WARM_START=1 saves the pipeline state after each process-all run and restores it
+# at boot, so a restarted worker answers its first request from cached results
+WARM_START = os.environ.get('WARM_START', '').lower() in ('1', 'true', 'yes')
+WARM_START_PATH = os.environ.get('WARM_START_PATH', os.path.join(CACHE_DIR, 'warm_start.pkl'))
+warm_start_info = {'enabled': WARM_START, 'restored': False}
+
+def make_dataset(name, path):
+    """A dataset with its own versioned snapshots (load -> outliers -> features) and cached results"""
+    default = name == DEFAULT_DATASET
+    state_path = WARM_START_PATH if default else os.path.join(CACHE_DIR, 'datasets', f"{name}.pkl")
+    shared_store = None
+    if SHARED_DATA_DIR:
+        shared_store = SharedDatasetStore(
+            SHARED_DATA_DIR if default else os.path.join(SHARED_DATA_DIR, 'datasets', name))
+    return Dataset(name, path, Pipeline(observer=observe_stage), pipeline_params, state_path,
+                   shared_store)
+
+datasets = DatasetRegistry(make_dataset(DEFAULT_DATASET, DATA_PATH), DATASET_CACHE_MB * 1024 * 1024)
+for name, path in DATASETS.items():
+    if name != DEFAULT_DATASET:
+        datasets.add(make_dataset(name, path))
+
+def current_dataset():
+    """The dataset of the current request (``?dataset=``) or job, else the default one"""
+    return active_dataset() or datasets.default
+
+def current_pipeline():
+    return current_dataset().pipeline
+
+def bind_dataset(func):
+    """``func`` bound to the current context, so it sees this dataset on another thread"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+def read_data(dataset):
+    """Read a dataset's data file through the columnar cache.
+
+    Only a missing data file falls back to sample data; parse errors are
+    raised instead of being hidden behind the demo dataset.
+    """
+    started = time.perf_counter()
     try:
-        # Load data - you'll need to update this path
-        data = pd.read_csv('data.csv')  # Update with your actual file path
-        
-        # Basic data processing
-        return True
-    except Exception as e:
+        data, dataset.load_info = load_csv(dataset.path)
+        return data
+    except FileNotFoundError as e:
         print(f"Error loading data: {e}")
         # Create sample data for demonstration
-        np.random.seed(42)
-        sample_size = 1460
-        
-        data = pd.DataFrame({
-            'SalePrice': np.random.normal(180000, 50000, sample_size),
-            'OverallQual': np.random.randint(1, 11, sample_size),
-            'GrLivArea': np.random.normal(1500, 500, sample_size),
-            'GarageArea': np.random.normal(500, 200, sample_size),
-            'GarageCars': np.random.randint(0, 4, sample_size),
-            'TotalBsmtSF': np.random.normal(1000, 300, sample_size),
-            '1stFlrSF': np.random.normal(1000, 300, sample_size),
-            'FullBath': np.random.randint(1, 4, sample_size),
-            'YearBuilt': np.random.randint(1900, 2020, sample_size),
-            'TotRmsAbvGrd': np.random.randint(4, 12, sample_size),
-            'WoodDeckSF': np.random.normal(100, 150, sample_size),
-            'LotFrontage': np.random.normal(70, 20, sample_size),
-            'BsmtFinSF1': np.random.normal(400, 200, sample_size),
-            '2ndFlrSF': np.random.normal(300, 400, sample_size),
-            'OpenPorchSF': np.random.normal(50, 100, sample_size),
-            'HalfBath': np.random.randint(0, 3, sample_size),
-            'LotArea': np.random.normal(10000, 5000, sample_size),
-            'BsmtFullBath': np.random.randint(0, 3, sample_size),
-            'BsmtUnfSF': np.random.normal(500, 300, sample_size),
-            'BedroomAbvGr': np.random.randint(1, 6, sample_size),
-            'ScreenPorch': np.random.normal(20, 50, sample_size),
-            'PoolArea': np.random.normal(10, 100, sample_size),
-            'MoSold': np.random.randint(1, 13, sample_size),
-            '3SsnPorch': np.random.normal(5, 20, sample_size),
-            'BsmtHalfBath': np.random.randint(0, 2, sample_size),
-            'MiscVal': np.random.normal(50, 200, sample_size),
-            'Id': range(1, sample_size + 1),
-            'LowQualFinSF': np.random.normal(10, 50, sample_size),
-            'YrSold': np.random.randint(2006, 2021, sample_size),
-            'OverallCond': np.random.randint(1, 11, sample_size),
-            'MSSubClass': np.random.randint(20, 200, sample_size),
-            'EnclosedPorch': np.random.normal(20, 100, sample_size),
-            'KitchenAbvGr': np.random.randint(1, 3, sample_size),
-        })
-        
-        # Add some categorical columns with missing values
-        data['FireplaceQu'] = np.random.choice(['Ex', 'Gd', 'TA', 'Fa', 'Po', np.nan], 
-                                              sample_size, p=[0.1, 0.2, 0.3, 0.2, 0.1, 0.1])
-        data['Fence'] = np.random.choice(['GdPrv', 'MnPrv', 'GdWo', 'MnWw', np.nan], 
-                                        sample_size, p=[0.05, 0.1, 0.05, 0.1, 0.7])
-        data['Alley'] = np.random.choice(['Grvl', 'Pave', np.nan], 
-                                        sample_size, p=[0.05, 0.05, 0.9])
-        data['MiscFeature'] = np.random.choice(['Elev', 'Gar2', 'Othr', 'Shed', 'TenC', np.nan], 
-                                              sample_size, p=[0.01, 0.02, 0.02, 0.03, 0.01, 0.91])
-        data['PoolQC'] = np.random.choice(['Ex', 'Fa', 'Gd', np.nan], 
-                                         sample_size, p=[0.02, 0.02, 0.02, 0.94])
-        
-        # Make sure SalePrice is positive
-        data['SalePrice'] = np.abs(data['SalePrice'])
-        data['GrLivArea'] = np.abs(data['GrLivArea'])
-        data['GarageArea'] = np.abs(data['GarageArea'])
-        data['TotalBsmtSF'] = np.abs(data['TotalBsmtSF'])
+        data = compact_frame(make_sample_data())
         
-        return True
+        dataset.load_info = {
+            'source': 'sample',
+            'path': dataset.path,
+            'cache_hit': False,
+            'error': str(e),
+            'rows': len(data),
+            'columns': len(data.columns),
+            'load_seconds': round(time.perf_counter() - started, 6)
+        }
+        return data
+
+def save_warm_start():
+    """Write the dataset's pipeline state, load info and parameters in effect for the next boot"""
+    started = time.perf_counter()
+    size = current_dataset().save()
+    warm_start_info.update(saved_bytes=size, save_seconds=round(time.perf_counter() - started, 6))
+
+def restore_warm_start():
+    """Adopt each dataset's saved pipeline state if it was built from the current data file"""
+    started = time.perf_counter()
+    restored = [dataset.name for dataset in datasets if dataset.restore()]
+    if restored:
+        warm_start_info.update(restored=True, datasets=restored,
+                               restore_seconds=round(time.perf_counter() - started, 6))
+        datasets.enforce_budget(keep=datasets.default)
+    return bool(restored)
 
-def get_data_summary():
+def load_and_process_data():
+    """Load the current dataset as its pipeline's base snapshot.
+
+    Concurrent first requests for a dataset wait on its load lock and
+    share the one load; other datasets are spilled if the budget is exceeded.
+    """
+    dataset = current_dataset()
+    datasets.touch(dataset)
+    with dataset.load_lock:
+        snapshot = dataset.pipeline.snapshot('load')
+        # Keep sales appended to the current file; reload only when the file changes
+        if snapshot is None or snapshot.lineage()[0]['version'] != dataset.source_version():
+            snapshot = dataset.pipeline.load(lambda: read_data(dataset),
+                                             source_signature(dataset.path))
+    datasets.enforce_budget(keep=dataset)
+    return snapshot
+
+def current_load_version():
+    """Version of the load snapshot a run on the current dataset starts from (a changed file means a reload)"""
+    dataset = current_dataset()
+    loaded = get_snapshot('load')
+    if loaded is None or loaded.lineage()[0]['version'] != dataset.source_version():
+        return dataset.source_version()
+    return loaded.version
+
+def get_stream_summary(memory_budget_mb=STREAM_MEMORY_BUDGET_MB):
+    """Single-pass chunked summary of the data file, cached until the file changes"""
+    path = current_dataset().path
+    return current_pipeline().memoize(
+        'stream', {'source': source_signature(path), 'memory_budget_mb': memory_budget_mb},
+        lambda: stream_csv(path, memory_budget_mb=memory_budget_mb))
+
+def sync_shared_dataset(dataset):
+    """Adopt snapshots another worker published since this worker last looked"""
+    if dataset.shared_store is None:
+        return
+    chain = dataset.shared_store.poll()
+    for snapshot in chain or []:
+        dataset.pipeline.publish(snapshot)
+
+def publish_shared_dataset(snapshot):
+    """Publish a snapshot chain for the other workers (no-op in single-process mode).
+
+    Called after every stage that adds snapshots, so it also re-checks the dataset budget.
+    """
+    shared_store = current_dataset().shared_store
+    if shared_store is not None:
+        shared_store.publish(snapshot)
+    datasets.enforce_budget(keep=current_dataset())
+
+def get_snapshot(stage=None):
+    """Get the latest snapshot for a stage (or the pipeline head) of the current dataset"""
+    dataset = current_dataset()
+    datasets.touch(dataset)
+    sync_shared_dataset(dataset)
+    return dataset.pipeline.snapshot(stage or None)
+
+def get_data_summary(data):
     """Get basic data summary statistics"""
     if data is None:
         return {}
-    
+
     return {
         'total_houses': len(data),
         'avg_price': f"${data['SalePrice'].mean():,.0f}",
@@ -102,16 +317,18 @@ def get_data_summary():
         'shape': data.shape
     }
 
-def get_missing_data():
-    """Get missing data information"""
+def get_missing_data(data, masks=None):
+    """Get missing data information (counts from the null-mask index when given)"""
     if data is None:
         return []
     
-    missing = data.isnull().sum()
-    missing = missing[missing > 0]
+    if masks is None:
+        masks = NullMaskIndex.from_frame(data)
     missing_data = []
     
-    for col, count in missing.items():
+    for col, count in masks.missing_counts().items():
+        if count == 0:
+            continue
         percentage = (count / len(data)) * 100
         missing_data.append({
             'feature': col,
@@ -121,95 +338,291 @@ def get_missing_data():
     
     return sorted(missing_data, key=lambda x: x['missing'], reverse=True)
 
-def get_correlation_data():
-    """Get correlation data for numeric features"""
-    if data is None:
+def get_null_masks(snapshot):
+    """Packed missing-value bitmaps of a snapshot, built once per snapshot.
+
+    The feature stage only drops columns, so its index is a subset of
+    the parent's rather than a rescan.
+    """
+    def compute(data):
+        if snapshot.stage == 'features' and snapshot.parent is not None:
+            return get_null_masks(snapshot.parent).subset(list(data.columns))
+        return NullMaskIndex.from_frame(data)
+
+    return current_pipeline().analyze('null_masks', snapshot, compute)
+
+def get_snapshot_missing(snapshot):
+    """Cached per-column missing counts of a snapshot"""
+    return current_pipeline().analyze('missing', snapshot,
+                                      lambda data: get_missing_data(data, get_null_masks(snapshot)))
+
+def get_sketches(snapshot, columns=None):
+    """KLL sketches of a snapshot's numeric columns (or of ``columns``), built once per snapshot"""
+    return current_pipeline().analyze('sketches', snapshot, sketch_frame, columns=columns)
+
+def get_correlation_stats(snapshot):
+    """Correlation sufficient statistics for a snapshot.
+
+    Derived from the parent snapshot when possible: outlier removal (and
+    a filter that keeps most rows) subtracts the dropped rows, appended
+    sales add the new rows and feature removal takes a sub-matrix, so
+    none of them rescans the frame.
+    """
+    def compute(data):
+        parent = snapshot.parent
+        if parent is not None and snapshot.stage == 'load' and parent.stage == 'load':
+            stats = get_correlation_stats(parent)
+            added = data.iloc[len(parent.frame):]
+            if list(added.select_dtypes(include=[np.number]).columns) == stats.columns:
+                return stats.copy().append(added)
+        if parent is not None and snapshot.stage == 'features':
+            stats = get_correlation_stats(parent)
+            kept = [col for col in stats.columns if col in data.columns]
+            return stats.subset(kept)
+        if parent is not None and snapshot.stage in ('outliers', 'filter'):
+            removed = parent.frame.index.difference(data.index)
+            # A filter keeping most rows is cheaper to subtract than to rescan
+            if snapshot.stage == 'outliers' or len(removed) < len(data):
+                return get_correlation_stats(parent).copy().remove(parent.frame.loc[removed])
+        return CorrelationStats.from_frame(data.select_dtypes(include=[np.number]),
+                                           executor=correlation_executor)
+
+    return current_pipeline().analyze('correlation_stats', snapshot, compute)
+
+def get_correlation_index(snapshot):
+    """Cached correlation index (compact matrix + neighbour lists) for a snapshot"""
+    return current_pipeline().analyze(
+        'correlation_index', snapshot,
+        lambda data: CorrelationIndex.from_stats(get_correlation_stats(snapshot)))
+
+def get_snapshot_correlation(snapshot, **query):
+    """Correlation query answered from the snapshot's cached correlation index"""
+    return query_correlation(get_correlation_index(snapshot), **query)
+
+def query_correlation(index, target='SalePrice', k=10, min_abs=0.0, columns=None,
+                      order='signed', include_matrix=False):
+    """Top-k correlations with ``target`` and, only when asked for, the (sub-)matrix"""
+    if not index.columns:
         return {}
+    unknown = [col for col in [target] + list(columns or []) if col not in index.positions]
+    if unknown:
+        return {'error': f"Unknown columns: {', '.join(unknown)}"}
     
-    numeric_features = data.select_dtypes(include=[np.number])
-    correlation = numeric_features.corr()
+    top_features = [{'name': name, 'correlation': round(value, 3)}
+                    for name, value in index.top(target, k, min_abs, columns, order)]
+    result = {'target': target, 'top_features': top_features}
+    if include_matrix:
+        names = list(columns) if columns else index.columns
+        result['correlation_matrix'] = Matrix(names, np.round(index.matrix(names), 3))
+    return result
+
+def get_correlation_data(data, stats=None, **query):
+    """Get correlation data for numeric features"""
+    if data is None and stats is None:
+        return {}
     
-    # Get top correlations with SalePrice
-    sale_price_corr = correlation['SalePrice'].sort_values(ascending=False)
+    if stats is None:
+        stats = CorrelationStats.from_frame(data.select_dtypes(include=[np.number]))
+    return query_correlation(CorrelationIndex.from_stats(stats), **query)
+
+def get_group_index(snapshot, by):
+    """Cached group index (codes, rows in group order, offsets) of a snapshot column"""
+    return current_pipeline().analyze('group_index', snapshot,
+                                      lambda data, by: GroupIndex.from_series(data[by]), by=by)
+
+def get_group_segments(snapshot, by, value):
+    """Cached per-group sorted values of ``value``, as ``(values, offsets)``"""
+    return current_pipeline().analyze(
+        'group_segments', snapshot,
+        lambda data, by, value: get_group_index(snapshot, by).sorted_segments(
+            data[value].to_numpy(dtype=np.float64, na_value=np.nan)),
+        by=by, value=value)
+
+def get_sale_index(snapshot, value, by=None):
+    """Cached sale-date index of a snapshot; appended sales extend their parent's index"""
+    def compute(data, value, by):
+        parent = snapshot.parent
+        if snapshot.stage == 'load' and parent is not None and parent.stage == 'load':
+            index = get_sale_index(parent, value, by).extend(data.iloc[len(parent.frame):])
+            if index is not None:
+                return index
+        return SaleIndex.from_frame(data, value, by)
+
+    return current_pipeline().analyze('sale_index', snapshot, compute, value=value, by=by)
+
+def append_sales(data, columns, rows):
+    """Load stage with new sales appended at the compact dtypes; returns (frame, info)"""
+    frame = append_rows(data, pd.DataFrame(columns, index=pd.RangeIndex(rows)))
+    return frame, {'rows_added': rows, 'total_rows': len(frame)}
+
+def get_filter_index(snapshot, column):
+    """Cached filter index (sorted rows or category bitmaps) of a snapshot column"""
+    return current_pipeline().analyze('filter_index', snapshot,
+                                      lambda data, column: column_index(data[column]),
+                                      column=column)
+
+def filter_version(snapshot, clauses):
+    """Version of a snapshot narrowed by a filter"""
+    return make_version(snapshot.version, 'filter', describe(clauses))
+
+def filter_snapshot(snapshot, clauses):
+    """Snapshot of the rows matching every filter clause.
+
+    Clause bitmaps and the filtered snapshot are kept in the filter LRU;
+    the version depends only on the input and the canonical filter, so
+    results computed for it stay valid after an eviction.
+    """
+    key = describe(clauses)
+
+    def clause_bits(clause, compute):
+        return filter_cache.get_or_compute(('clause', snapshot.version, clause), compute,
+                                           lambda bits: bits.nbytes)
+
+    def select():
+        selection = resolve(clauses, snapshot.frame,
+                            lambda column: get_filter_index(snapshot, column), clause_bits)
+        return Snapshot(snapshot.frame.take(selection.positions), 'filter',
+                        filter_version(snapshot, clauses), parent=snapshot,
+                        params={'filter': key, 'rows': len(selection)})
+
+    return filter_cache.get_or_compute(
+        ('snapshot', snapshot.version, key), select,
+        lambda filtered: int(filtered.frame.memory_usage(index=True, deep=True).sum()))
+
+def get_price_distribution(data, max_points=None):
+    """Histogram, stats and (optionally downsampled) prices for the distribution chart"""
+    prices = data['SalePrice'].values
+    if not len(prices):
+        # A filter that matches no sales: an empty histogram and no stats
+        distribution = {
+            'prices': prices,
+            'histogram': {'counts': [], 'bins': [], 'bin_edges': []},
+            'stats': dict.fromkeys(('mean', 'median', 'std', 'min', 'max'))
+        }
+        if max_points is not None:
+            distribution.update(total_points=0, downsampled=False)
+        return distribution
     
-    # Get top features (excluding SalePrice itself)
-    top_features = []
-    for feature, corr_value in sale_price_corr.items():
-        if feature != 'SalePrice' and not pd.isna(corr_value):
-            top_features.append({
-                'name': feature,
-                'correlation': round(corr_value, 3)
-            })
+    # Create histogram data
+    hist, bin_edges = np.histogram(prices, bins=20)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
     
-    return {
-        'top_features': top_features[:10],
-        'correlation_matrix': correlation.round(3).to_dict()
+    distribution = {
+        'prices': prices,
+        'histogram': {
+            'counts': hist,
+            'bins': bin_centers,
+            'bin_edges': bin_edges
+        },
+        'stats': {
+            'mean': float(prices.mean()),
+            'median': float(np.median(prices)),
+            'std': float(prices.std()),
+            'min': float(prices.min()),
+            'max': float(prices.max())
+        }
     }
-
-def remove_outliers():
-    """Remove outliers using IQR method"""
-    global data
+    if max_points is not None:
+        sample = reduce_values(prices, bin_edges, max_points)
+        distribution['prices'] = sample
+        distribution['total_points'] = int(len(prices))
+        distribution['downsampled'] = bool(len(sample) < len(prices))
+    return distribution
+
+def remove_outliers(data, iqr_multiplier=IQR_MULTIPLIER):
+    """Remove outliers using IQR method, returning the trimmed frame and a report"""
     if data is None:
-        return {}
+        return None, {}
     
     original_count = len(data)
     
-    # Calculate quartiles and IQR
-    first_quartile = data['SalePrice'].quantile(0.25)
-    third_quartile = data['SalePrice'].quantile(0.75)
+    # Calculate quartiles and IQR (exact for small data, KLL sketch at scale)
+    first_quartile, _, third_quartile = quartiles(data['SalePrice'].to_numpy(dtype=np.float64))
     IQR = third_quartile - first_quartile
     
     # Define boundary (using 3*IQR as in original code)
-    new_boundary = third_quartile + 3 * IQR
+    new_boundary = third_quartile + iqr_multiplier * IQR
     
     # Remove outliers
     outliers_mask = data['SalePrice'] > new_boundary
     outliers_count = outliers_mask.sum()
     
-    data = data[~outliers_mask].copy()
+    trimmed = data[~outliers_mask].copy()
     
-    return {
+    return trimmed, {
         'original_count': original_count,
         'outliers_removed': int(outliers_count),
-        'final_count': len(data),
+        'final_count': len(trimmed),
         'boundary': f"${new_boundary:,.0f}",
         'q1': f"${first_quartile:,.0f}",
         'q3': f"${third_quartile:,.0f}",
         'iqr': f"${IQR:,.0f}"
     }
 
-def remove_features():
-    """Remove features as per original analysis"""
-    global data
+def remove_features(data, cols_to_remove=AUTO_SELECT, stats=None):
+    """Remove features, returning the reduced frame and a report.
+
+    With ``AUTO_SELECT`` the columns are chosen from the data by missing
+    ratio, correlation with SalePrice and multicollinearity (from
+    ``stats``, the frame's correlation statistics, when given); otherwise
+    the given list is removed.
+    """
     if data is None:
-        return {}
-    
-    # Features to remove as per original code
-    cols_to_remove = [
-        'BsmtFinSF1', 'LotFrontage', 'WoodDeckSF', '2ndFlrSF', 'OpenPorchSF', 
-        'HalfBath', 'LotArea', 'BsmtFullBath', 'BsmtUnfSF', 'BedroomAbvGr', 
-        'ScreenPorch', 'PoolArea', 'MoSold', '3SsnPorch', 'BsmtHalfBath', 
-        'MiscVal', 'Id', 'LowQualFinSF', 'YrSold', 'OverallCond', 'MSSubClass', 
-        'EnclosedPorch', 'KitchenAbvGr', 'FireplaceQu', 'Fence', 'Alley', 
-        'MiscFeature', 'PoolQC', 'GarageCars', '1stFlrSF', 'FullBath'
-    ]
+        return None, {}
     
-    # Only remove columns that exist in the dataset
-    columns_to_drop_existing = [col for col in cols_to_remove if col in data.columns]
+    if cols_to_remove == AUTO_SELECT:
+        categories, scores = select_features(data, stats=stats, **FEATURE_THRESHOLDS)
+        columns_to_drop_existing = removed_columns(categories)
+        selection = {'method': 'data-driven', 'thresholds': FEATURE_THRESHOLDS,
+                     'categories': categories, 'scores': scores}
+    else:
+        # Only remove columns that exist in the dataset
+        columns_to_drop_existing = [col for col in cols_to_remove if col in data.columns]
+        selection = {'method': 'manual', 'categories': {'manual': columns_to_drop_existing},
+                     'not_found': [col for col in cols_to_remove if col not in data.columns]}
     
     original_columns = len(data.columns)
-    data.drop(columns_to_drop_existing, axis=1, inplace=True)
+    reduced = data.drop(columns_to_drop_existing, axis=1)
     
-    return {
+    return reduced, dict({
         'original_features': original_columns,
         'removed_features': len(columns_to_drop_existing),
-        'final_features': len(data.columns),
+        'final_features': len(reduced.columns),
         'removed_list': columns_to_drop_existing,
-        'remaining_features': list(data.columns)
-    }
+        'remaining_features': list(reduced.columns)
+    }, **selection)
+
+def get_price_model(snapshot, alpha=None):
+    """Price model for a snapshot: fitted once, saved to disk and reloaded from there"""
+    if alpha is None:
+        alpha = current_dataset().params['alpha']
+    
+    def compute(data, alpha):
+        model, _ = load_or_fit(data, make_version(snapshot.version, 'price_model', alpha), alpha)
+        return model
+
+    return current_pipeline().analyze('price_model', snapshot, compute, alpha=alpha)
+
+def prediction_columns(payload, features):
+    """Column arrays and row count from ``{"rows": [{...}, ...]}`` or ``{"columns": {name: [...]}}``"""
+    if not isinstance(payload, dict):
+        raise ValueError('Expected a JSON object with "rows" or "columns"')
+    if isinstance(payload.get('columns'), dict):
+        lengths = {len(values) for values in payload['columns'].values()}
+        if len(lengths) > 1:
+            raise ValueError('All input columns must have the same length')
+        columns = {name: values for name, values in payload['columns'].items() if name in features}
+        return columns, lengths.pop() if lengths else 0
+    rows = payload.get('rows')
+    if not isinstance(rows, list):
+        raise ValueError('Expected a JSON object with "rows" or "columns"')
+    provided = {name for row in rows for name in row if name in features}
+    return {name: [row.get(name) for row in rows] for name in features if name in provided}, len(rows)
 
 def create_plot_base64(fig):
     """Convert matplotlib figure to base64 string"""
+    # Plotting libraries are imported on first use; no request path needs them at startup
+    import matplotlib.pyplot as plt
     img = io.BytesIO()
     fig.savefig(img, format='png', bbox_inches='tight', dpi=100)
     img.seek(0)
@@ -222,60 +635,366 @@ def index():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
+def respond(payload):
+    """JSON response, or columnar binary when the client's Accept header asks for it"""
+    started = time.perf_counter()
+    float_dtype = negotiate(request.headers.get('Accept'))
+    if float_dtype is None:
+        response = jsonify(to_jsonable(payload))
+        observe_serialization('json', time.perf_counter() - started)
+        return response
+    compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+    response = Response(encode(payload, float_dtype, compress), mimetype=MEDIA_TYPE)
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    observe_serialization('binary', time.perf_counter() - started)
+    return response
+
+def observe_serialization(fmt, seconds):
+    serialize_seconds.observe(seconds, route=request_route(), format=fmt)
+    profile = current_profile()
+    if profile is not None:
+        profile.add('serialize', seconds, fmt)
+
+def request_route():
+    """Route pattern of the current request (bounded label values for metrics)"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def profiling_requested():
+    """Per-request profiling via ``?profile=1`` or an ``X-Profile: 1`` header"""
+    flag = request.args.get('profile') or request.headers.get('X-Profile', '')
+    return flag.lower() in ('1', 'true', 'yes')
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    if profiling_requested():
+        g.profile_token = start_profile()
+
+@app.after_request
+def record_request_metrics(response):
+    """Observe latency and body size; add a Server-Timing breakdown when profiling"""
+    seconds = time.perf_counter() - g.get('request_started', time.perf_counter())
+    route = request_route()
+    request_seconds.observe(seconds, route=route, method=request.method,
+                            status=str(response.status_code))
+    if not response.is_streamed:
+        response_bytes.observe(response.calculate_content_length() or 0, route=route)
+    profile = current_profile()
+    if profile is not None:
+        profile.add('total', seconds)
+        response.headers['Server-Timing'] = profile.server_timing()
+    return response
+
+@app.before_request
+def select_dataset():
+    """Make ``?dataset=`` (or the default dataset) current for this request"""
+    dataset = datasets.get(request.args.get('dataset'))
+    if dataset is None:
+        response = jsonify({'error': f"Unknown dataset {request.args['dataset']}",
+                            'datasets': [entry.name for entry in datasets]})
+        response.status_code = 404
+        return response
+    g.dataset_token = use_dataset(dataset)
+    return None
+
+@app.before_request
+def parse_request_filter():
+    """Parse ``?filter=`` once per request; endpoints that change the pipeline reject it"""
+    if 'filter' not in request.args:
+        return None
+    try:
+        g.filter_clauses = parse_filter(request.args.getlist('filter'))
+        if not getattr(app.view_functions.get(request.endpoint), 'filterable', False):
+            raise FilterError(f'{request.path} does not take a filter')
+        if request.args.get('mode') == 'stream':
+            raise FilterError('Filters are applied in memory; drop mode=stream')
+    except FilterError as e:
+        return filter_error(e)
+    return None
+
+@app.errorhandler(FilterError)
+def filter_error(e):
+    """A filter naming an unknown column or value is a bad request"""
+    response = jsonify({'error': str(e)})
+    response.status_code = 400
+    return response
+
+@app.teardown_request
+def end_request_profile(exc=None):
+    token = g.pop('profile_token', None)
+    if token is not None:
+        end_profile(token)
+    token = g.pop('dataset_token', None)
+    if token is not None:
+        release_dataset(token)
+
+def collect_runtime_metrics():
+    """Render-time gauges for caches, jobs and process memory"""
+    pipeline_stats = [dataset.pipeline.stats() for dataset in datasets]
+    dataset_stats = datasets.stats()
+    cache_stats = response_cache.stats()
+    jobs = job_store.stats()
+    # ru_maxrss is in KiB on Linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    yield ('pipeline_cache_entries', 'gauge', 'Cached pipeline stage results',
+           [({}, sum(stats['entries'] for stats in pipeline_stats))])
+    yield ('datasets', 'gauge', 'Registered datasets by state',
+           [({'state': 'loaded'}, dataset_stats['loaded']),
+            ({'state': 'other'}, dataset_stats['datasets'] - dataset_stats['loaded'])])
+    yield ('dataset_cache_bytes', 'gauge', 'Memory held by the loaded datasets\' frames',
+           [({}, dataset_stats['bytes'])])
+    yield ('dataset_spills_total', 'counter', 'Datasets spilled to disk to stay within the budget',
+           [({}, dataset_stats['spills'])])
+    yield ('response_cache_entries', 'gauge', 'Cached rendered responses',
+           [({}, cache_stats['entries'])])
+    yield ('response_cache_bytes', 'gauge', 'Size of the cached rendered responses',
+           [({}, cache_stats['bytes'])])
+    yield ('response_cache_requests_total', 'counter', 'Response cache lookups by result',
+           [({'result': 'hit'}, cache_stats['hits']), ({'result': 'miss'}, cache_stats['misses'])])
+    yield ('jobs', 'gauge', 'Background jobs held in the job store',
+           [({'state': 'running'}, jobs['running']),
+            ({'state': 'finished'}, jobs['jobs'] - jobs['running'])])
+    yield ('jobs_deduplicated_total', 'counter', 'Job submissions answered by an existing job',
+           [({}, jobs['deduplicated'])])
+    yield ('process_max_resident_bytes', 'gauge', 'Peak resident set size of this process',
+           [({}, max_rss)])
+    yield ('warm_start_restored', 'gauge', 'Whether this worker restored saved pipeline state at boot',
+           [({}, int(warm_start_info['restored']))])
+    images = render_cache.stats()
+    yield ('render_cache_entries', 'gauge', 'Cached chart images on disk', [({}, images['entries'])])
+    yield ('render_cache_bytes', 'gauge', 'Size of the cached chart images', [({}, images['bytes'])])
+    yield ('render_cache_requests_total', 'counter', 'Chart image cache lookups by result',
+           [({'result': 'hit'}, images['hits']), ({'result': 'miss'}, images['misses'])])
+    filters = filter_cache.stats()
+    yield ('filter_cache_entries', 'gauge', 'Cached filter clause bitmaps and filtered snapshots',
+           [({}, filters['entries'])])
+    yield ('filter_cache_bytes', 'gauge', 'Size of the cached filter results', [({}, filters['bytes'])])
+    yield ('filter_cache_requests_total', 'counter', 'Filter cache lookups by result',
+           [({'result': 'hit'}, filters['hits']), ({'result': 'miss'}, filters['misses'])])
+    if TRACE_MEMORY:
+        current, _ = tracemalloc.get_traced_memory()
+        yield ('traced_memory_bytes', 'gauge', 'Memory currently traced by tracemalloc',
+               [({}, current)])
+
+metrics.add_collector(collect_runtime_metrics)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text-format metrics"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+def request_dataset_version():
+    """Version of the data a read request will be answered from"""
+    if use_streaming():
+        return make_version('stream', source_signature(current_dataset().path))
+    snapshot = get_snapshot(request.args.get('stage'))
+    if snapshot is None:
+        return None
+    # Known without resolving the filter, so a 304 costs no row selection
+    clauses = g.get('filter_clauses')
+    return filter_version(snapshot, clauses) if clauses else snapshot.version
+
+def cached_response(view):
+    """Serve a read endpoint with a dataset-versioned ETag, 304s and a response cache.
+
+    These read endpoints are also the ones that accept ``?filter=``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = make_etag(request.path, sorted(request.args.items(multi=True)),
+                         request.headers.get('Accept', ''),
+                         request.headers.get('Accept-Encoding', ''),
+                         request_dataset_version())
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            cached = response_cache.get(etag)
+            if cached is not None:
+                body, mimetype, headers = cached
+                response = Response(body, mimetype=mimetype, headers=headers)
+            else:
+                response = view(*args, **kwargs)
+                if response.status_code == 200:
+                    headers = {name: value for name, value in response.headers.items()
+                               if name in ('Content-Encoding', 'Vary')}
+                    response_cache.put(etag, response.get_data(), response.mimetype, headers)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    wrapper.filterable = True
+    return wrapper
+
+def use_streaming():
+    """Whether to use the out-of-core path (``?mode=stream|memory``, else by file size)"""
+    if g.get('filter_clauses'):
+        return False
+    mode = request.args.get('mode')
+    if mode in ('stream', 'memory'):
+        return mode == 'stream'
+    try:
+        return os.path.getsize(current_dataset().path) > STREAM_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+def request_stream_summary():
+    """Stream summary using ``?memory_budget_mb=`` as the chunk memory budget"""
+    return get_stream_summary(
+        request.args.get('memory_budget_mb', STREAM_MEMORY_BUDGET_MB, type=int))
+
+def request_snapshot(default_stage=None):
+    """Resolve the snapshot a read endpoint should use (``?stage=`` selects one, ``?filter=`` narrows it)"""
+    snapshot = get_snapshot(request.args.get('stage') or default_stage)
+    clauses = g.get('filter_clauses')
+    if snapshot is None or not clauses:
+        return snapshot
+    return filter_snapshot(snapshot, clauses)
+
+def request_max_points(total_points):
+    """Point budget from ``?max_points=``; large payloads get the default budget"""
+    max_points = request.args.get('max_points', type=int)
+    if max_points is None and total_points > AUTO_THRESHOLD:
+        max_points = DEFAULT_MAX_POINTS
+    return max_points
+
+def request_correlation_query():
+    """Correlation query from ``?target=&k=&min_abs=&columns=&order=&matrix=``"""
+    columns = request.args.get('columns')
+    order = request.args.get('order', 'signed')
+    return {
+        'target': request.args.get('target', 'SalePrice'),
+        'k': request.args.get('k', 10, type=int),
+        'min_abs': request.args.get('min_abs', 0.0, type=float),
+        'columns': [col.strip() for col in columns.split(',') if col.strip()] if columns else None,
+        'order': order if order in CorrelationIndex.ORDERS else 'signed',
+        'include_matrix': request.args.get('matrix', '').lower() in ('1', 'true', 'full')
+    }
+
+def request_iqr_multiplier():
+    """IQR multiplier from ``?iqr_multiplier=``, defaulting to the parameters in effect"""
+    return request.args.get('iqr_multiplier', current_dataset().params['iqr_multiplier'], type=float)
+
+def parse_list(value, convert=str):
+    """Comma-separated query value as a list"""
+    return [convert(item.strip()) for item in value.split(',') if item.strip()]
+
+def drop_param(cols_to_remove):
+    """A drop list as a stage parameter: ``AUTO_SELECT`` or a plain list"""
+    return AUTO_SELECT if cols_to_remove == AUTO_SELECT else list(cols_to_remove)
+
+def request_drop_list():
+    """Drop list from ``?drop=a,b,c`` (or ``auto`` / ``original``), defaulting to the parameters in effect"""
+    drop = request.args.get('drop')
+    if not drop:
+        return current_dataset().params['cols_to_remove']
+    if drop == 'original':
+        return list(COLS_TO_REMOVE)
+    return AUTO_SELECT if drop == AUTO_SELECT else parse_list(drop)
+
+def run_outlier_stage(iqr_multiplier=None):
+    """Run (or reuse) the outlier stage on the loaded snapshot"""
+    if iqr_multiplier is None:
+        iqr_multiplier = current_dataset().params['iqr_multiplier']
+    base = get_snapshot('load') or load_and_process_data()
+    return current_pipeline().transform('outliers', base, remove_outliers,
+                                        iqr_multiplier=iqr_multiplier)
+
+def feature_remover(snapshot):
+    """``remove_features`` for a snapshot's frame, selecting from its cached correlation statistics"""
+    def remove(data, cols_to_remove=AUTO_SELECT):
+        stats = get_correlation_stats(snapshot) if cols_to_remove == AUTO_SELECT else None
+        return remove_features(data, cols_to_remove, stats=stats)
+    return remove
+
+def run_feature_stage(cols_to_remove=None, iqr_multiplier=None):
+    """Run (or reuse) the feature removal stage on the outlier-trimmed snapshot"""
+    if cols_to_remove is None:
+        cols_to_remove = current_dataset().params['cols_to_remove']
+    trimmed = get_snapshot('outliers') if iqr_multiplier is None else None
+    if trimmed is None:
+        trimmed, _ = run_outlier_stage(iqr_multiplier)
+    return current_pipeline().transform('features', trimmed, feature_remover(trimmed),
+                                        cols_to_remove=drop_param(cols_to_remove))
+
 @app.route('/api/data-summary')
+@cached_response
 def api_data_summary():
     """API endpoint for data summary"""
-    return jsonify(get_data_summary())
+    if use_streaming():
+        return jsonify(request_stream_summary().data_summary())
+    snapshot = request_snapshot()
+    if snapshot is None:
+        return jsonify({})
+    return jsonify(current_pipeline().analyze('summary', snapshot, get_data_summary))
 
 @app.route('/api/missing-data')
+@cached_response
 def api_missing_data():
     """API endpoint for missing data"""
-    return jsonify(get_missing_data())
+    if use_streaming():
+        return jsonify(request_stream_summary().missing_data())
+    snapshot = request_snapshot()
+    if snapshot is None:
+        return jsonify([])
+    if request.args.get('detail', '').lower() not in ('1', 'true', 'yes'):
+        return jsonify(get_snapshot_missing(snapshot))
+    report = current_pipeline().analyze(
+        'missing_report', snapshot,
+        lambda data, **options: missing_report(get_null_masks(snapshot), **options),
+        top=max(request.args.get('top', 10, type=int), 0),
+        include_matrix=request.args.get('matrix', '').lower() in ('1', 'true'))
+    return respond(dict(report, columns=get_snapshot_missing(snapshot)))
 
 @app.route('/api/correlation')
+@cached_response
 def api_correlation():
-    """API endpoint for correlation data"""
-    return jsonify(get_correlation_data())
+    """API endpoint for correlation data (top-k by default; ``?matrix=1`` adds the matrix)"""
+    query = request_correlation_query()
+    if use_streaming():
+        return respond(get_correlation_data(None, request_stream_summary().correlation_stats,
+                                            **query))
+    snapshot = request_snapshot()
+    if snapshot is None:
+        return jsonify({})
+    return respond(get_snapshot_correlation(snapshot, **query))
 
 @app.route('/api/price-distribution')
+@cached_response
 def api_price_distribution():
     """API endpoint for price distribution data"""
-    if data is None:
+    if use_streaming():
+        return respond(request_stream_summary().price_distribution())
+    snapshot = request_snapshot()
+    if snapshot is None:
         return jsonify({'error': 'No data available'})
     
-    prices = data['SalePrice'].values
-    
-    # Create histogram data
-    hist, bin_edges = np.histogram(prices, bins=20)
-    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
-    
-    return jsonify({
-        'prices': prices.tolist(),
-        'histogram': {
-            'counts': hist.tolist(),
-            'bins': bin_centers.tolist(),
-            'bin_edges': bin_edges.tolist()
-        },
-        'stats': {
-            'mean': float(prices.mean()),
-            'median': float(np.median(prices)),
-            'std': float(prices.std()),
-            'min': float(prices.min()),
-            'max': float(prices.max())
-        }
-    })
+    max_points = request_max_points(len(snapshot.frame))
+    return respond(current_pipeline().analyze('price_distribution', snapshot,
+                                              get_price_distribution, max_points=max_points))
 
 @app.route('/api/scatter-data')
+@cached_response
 def api_scatter_data():
     """API endpoint for scatter plot data"""
-    if data is None:
+    snapshot = request_snapshot()
+    if snapshot is None:
         return jsonify({'error': 'No data available'})
+    data = snapshot.frame
     
     feature = request.args.get('feature', 'OverallQual')
     
     if feature not in data.columns:
         return jsonify({'error': f'Feature {feature} not found'})
     
+    # Large or explicitly reduced requests are served from per-feature aggregates
+    max_points = request_max_points(len(data))
+    if max_points is not None and data[feature].dtype.kind in 'biuf':
+        lod = current_pipeline().analyze(
+            'scatter_lod', snapshot, scatter_lod, max_points=max_points,
+            resolution=request.args.get('resolution', DEFAULT_RESOLUTION, type=int))
+        return respond(dict(lod[feature], feature_name=feature))
+    
     x_data = data[feature].values
     y_data = data['SalePrice'].values
     
@@ -284,97 +1003,477 @@ def api_scatter_data():
     x_data = x_data[mask]
     y_data = y_data[mask]
     
-    return jsonify({
-        'x_data': x_data.tolist(),
-        'y_data': y_data.tolist(),
+    return respond({
+        'x_data': x_data,
+        'y_data': y_data,
         'feature_name': feature
     })
 
+@app.route('/api/groupby')
+@cached_response
+def api_groupby():
+    """Statistics of ``?value=`` (SalePrice) per group of ``?by=``, e.g. ``?stat=median,q1,q3,count``"""
+    snapshot = request_snapshot()
+    if snapshot is None:
+        return jsonify({'error': 'No data available'})
+    data = snapshot.frame
+    by = request.args.get('by', 'OverallQual')
+    value = request.args.get('value', 'SalePrice')
+    try:
+        if by not in data.columns:
+            raise ValueError(f'Feature {by} not found')
+        if value not in data.columns or data[value].dtype.kind not in 'biuf':
+            raise ValueError(f'Value {value} is not a numeric column')
+        stats = parse_stats(parse_list(request.args.get('stat', '')))
+    except ValueError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    index = get_group_index(snapshot, by)
+    values, offsets = get_group_segments(snapshot, by, value)
+    return respond({
+        'by': by,
+        'value': value,
+        'groups': index.labels,
+        'missing_rows': index.missing,
+        'stats': segment_stats(values, offsets, stats)
+    })
+
+@app.route('/api/market-trends')
+@cached_response
+def api_market_trends():
+    """Rolling ``?stat=`` (median,mean,count) of SalePrice by ``?freq=month|quarter`` over ``?window=`` periods, optionally ``?by=`` a column"""
+    snapshot = request_snapshot('load')
+    if snapshot is None:
+        return jsonify({'error': 'No data available'})
+    data = snapshot.frame
+    by = request.args.get('by') or None
+    value = request.args.get('value', 'SalePrice')
+    freq = request.args.get('freq', 'month')
+    window = request.args.get('window', 1, type=int)
+    try:
+        if YEAR not in data.columns or MONTH not in data.columns:
+            raise ValueError(f'{YEAR} and {MONTH} are needed; use a stage before feature removal')
+        if by is not None and by not in data.columns:
+            raise ValueError(f'Feature {by} not found')
+        if value not in data.columns or data[value].dtype.kind not in 'biuf':
+            raise ValueError(f'Value {value} is not a numeric column')
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {freq}; use {', '.join(FREQUENCIES)}")
+        if window < 1:
+            raise ValueError('window must be at least 1')
+        stats = parse_trend_stats(parse_list(request.args.get('stat', '')))
+    except ValueError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    index = get_sale_index(snapshot, value, by)
+    periods, results = index.rolling(freq, window, stats)
+    if by is None:
+        results = {name: values[0] for name, values in results.items()}
+    return respond({
+        'value': value,
+        'freq': freq,
+        'window': window,
+        'by': by,
+        'groups': index.labels if by is not None else None,
+        'periods': periods,
+        'stats': results
+    })
+
 @app.route('/api/outlier-analysis')
 def api_outlier_analysis():
     """API endpoint for outlier analysis"""
-    return jsonify(remove_outliers())
+    trimmed, outlier_info = run_outlier_stage(request_iqr_multiplier())
+    publish_shared_dataset(trimmed)
+    return jsonify(outlier_info)
 
 @app.route('/api/feature-engineering')
 def api_feature_engineering():
     """API endpoint for feature engineering"""
-    return jsonify(remove_features())
+    iqr_multiplier = request_iqr_multiplier() if 'iqr_multiplier' in request.args else None
+    reduced, feature_info = run_feature_stage(request_drop_list(), iqr_multiplier)
+    publish_shared_dataset(reduced)
+    return jsonify(feature_info)
 
 @app.route('/api/box-plot-data')
+@cached_response
 def api_box_plot_data():
     """API endpoint for box plot data"""
-    if data is None:
+    if use_streaming():
+        return respond(request_stream_summary().price_box_plot())
+    
+    snapshot = request_snapshot()
+    if snapshot is None:
         return jsonify({'error': 'No data available'})
     
-    prices = data['SalePrice'].values
+    prices = snapshot.frame['SalePrice'].values
     
-    # Calculate quartiles
-    q1 = np.percentile(prices, 25)
-    q2 = np.percentile(prices, 50)  # median
-    q3 = np.percentile(prices, 75)
-    iqr = q3 - q1
+    # Quartiles, 1.5*IQR boundaries and whiskers (exact for small data, the snapshot's
+    # cached KLL sketch at scale; whiskers are exact either way)
+    sketch = None
+    if len(prices) > EXACT_MAX_ROWS:
+        sketch = get_sketches(snapshot, ('SalePrice',))['SalePrice']
+    stats = box_plot_stats(prices, sketch=sketch)
     
-    # Calculate outlier boundaries
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
+    # Find outliers (none when a filter leaves no prices)
+    if stats['q1'] is None:
+        outliers = prices[:0]
+    else:
+        outliers = prices[(prices < stats['lower_bound']) | (prices > stats['upper_bound'])]
     
-    # Find outliers
-    outliers = prices[(prices < lower_bound) | (prices > upper_bound)]
+    return respond(dict(stats, outliers=outliers))
+
+def request_chart_options(chart):
+    """Chart options from the query string, parsed to the type of each default"""
+    options = {}
+    for name, default in CHART_OPTIONS[chart].items():
+        value = request.args.get(name)
+        if value is None:
+            options[name] = default
+        elif isinstance(default, tuple):
+            options[name] = tuple(parse_list(value))
+        else:
+            options[name] = type(default)(value)
+    return options
+
+def reset_render_pool(broken):
+    """Replace a render pool that a crashed worker broke (once, however many requests saw it)"""
+    global render_executor
+    with render_pool_lock:
+        if render_executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            render_executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+
+def render_image(chart, snapshot, options, fmt):
+    """Chart image bytes from the disk cache, or drawn on the render pool.
+
+    Raises ``concurrent.futures.TimeoutError`` after ``RENDER_TIMEOUT``
+    seconds and ``BrokenProcessPool`` when a worker died; the pool is
+    recreated for the next request in that case.
+    """
+    key = f"{make_version('render', chart, options, fmt, snapshot.version)}.{fmt}"
+    body = render_cache.get(key)
+    if body is None:
+        data = current_pipeline().analyze(
+            'chart_data', snapshot,
+            lambda frame, chart, **options: prepare_chart(
+                chart, frame, get_correlation_index(snapshot), **options),
+            chart=chart, **options)
+        pool = render_executor
+        try:
+            body, seconds = timed_call(lambda: pool.submit(
+                render_chart, chart, data, fmt).result(timeout=RENDER_TIMEOUT))
+        except BrokenProcessPool:
+            reset_render_pool(pool)
+            raise
+        render_seconds.observe(seconds, chart=chart)
+        profile = current_profile()
+        if profile is not None:
+            profile.add('render', seconds, chart)
+        render_cache.put(key, body)
+    return body
+
+@app.route('/api/render/<chart>')
+@cached_response
+def api_render(chart):
+    """Notebook chart rendered on the server (``?format=png|svg``; options per chart)"""
+    if chart not in CHART_OPTIONS:
+        response = jsonify({'error': f'Unknown chart {chart}', 'charts': list(CHART_OPTIONS)})
+        response.status_code = 404
+        return response
+    fmt = request.args.get('format', 'png')
+    snapshot = request_snapshot() or load_and_process_data()
+    try:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported format {fmt}; use one of {', '.join(IMAGE_FORMATS)}")
+        body = render_image(chart, snapshot, request_chart_options(chart), fmt)
+    except ValueError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    except FutureTimeoutError:
+        response = jsonify({'error': f'Rendering {chart} took longer than {RENDER_TIMEOUT:g} s'})
+        response.status_code = 504
+        return response
+    except BrokenProcessPool:
+        response = jsonify({'error': 'A render worker stopped unexpectedly; try again'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    return Response(body, mimetype=IMAGE_FORMATS[fmt])
+
+@app.route('/api/memory-report')
+@cached_response
+def api_memory_report():
+    """Bytes per column at the compact dtypes versus the ``read_csv`` defaults"""
+    snapshot = request_snapshot()
+    if snapshot is None:
+        return jsonify({'error': 'No data available'})
+    return jsonify(current_pipeline().analyze('memory_report', snapshot, memory_report))
+
+@app.route('/api/predict', methods=['GET', 'POST'])
+def api_predict():
+    """Batch price predictions (POST rows or columns); GET describes the model"""
+    snapshot = get_snapshot('features') or run_feature_stage()[0]
+    model = get_price_model(snapshot)
+    if request.method == 'GET':
+        return jsonify(dict(model.info(), coefficients=model.coefficients()))
     
-    return jsonify({
-        'q1': float(q1),
-        'q2': float(q2),
-        'q3': float(q3),
-        'iqr': float(iqr),
-        'lower_bound': float(lower_bound),
-        'upper_bound': float(upper_bound),
-        'outliers': outliers.tolist(),
-        'whiskers': {
-            'lower': float(np.min(prices[prices >= lower_bound])),
-            'upper': float(np.max(prices[prices <= upper_bound]))
+    try:
+        columns, rows = prediction_columns(request.get_json(force=True, silent=True),
+                                           model.features)
+        predictions = model.predict(columns, rows)
+    except (ValueError, TypeError) as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    
+    return respond({
+        'predictions': predictions,
+        'count': int(len(predictions)),
+        'imputed_features': [name for name in model.features if name not in columns],
+        'model_version': model.version
+    })
+
+@app.route('/api/sales', methods=['POST'])
+def api_sales():
+    """Append sales (POST rows or columns) to the loaded data as a new load snapshot"""
+    base = get_snapshot('load') or load_and_process_data()
+    try:
+        columns, rows = prediction_columns(request.get_json(force=True, silent=True),
+                                           list(base.frame.columns))
+        missing = [name for name in (YEAR, MONTH, 'SalePrice') if name not in columns]
+        if missing:
+            raise ValueError(f"Sales need {', '.join(missing)}")
+        if not rows:
+            raise ValueError('No sales given')
+        snapshot, info = current_pipeline().transform('load', base, append_sales,
+                                                      columns=columns, rows=rows)
+    except (ValueError, TypeError) as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    publish_shared_dataset(snapshot)
+    return jsonify(dict(info, version=snapshot.version))
+
+def run_model_search(iqr_multipliers, drop_lists, alphas, folds, apply_best=True, progress=None):
+    """Cross-validate the (IQR multiplier x drop list x alpha) grid on the loaded data.
+
+    With ``apply_best`` the winning configuration becomes the dataset's
+    default and the outlier and feature stages are rerun with it.
+    """
+    loaded = get_snapshot('load') or load_and_process_data()
+    drop_lists = {name: removed_columns(select_features(loaded.frame, **FEATURE_THRESHOLDS)[0])
+                  if drop == AUTO_SELECT else drop for name, drop in drop_lists.items()}
+    search = run_search(loaded.frame, iqr_multipliers, drop_lists, alphas, folds,
+                        workers=PIPELINE_WORKERS, cache_path=search_cache_path(loaded.version),
+                        progress=progress)
+    best = search['best']
+    params = current_dataset().params
+    if apply_best and best is not None:
+        params.update(iqr_multiplier=best['iqr_multiplier'],
+                      cols_to_remove=(AUTO_SELECT if best['drop'] == 'selected'
+                                      else list(best['cols_to_remove'])),
+                      alpha=best['alpha'], source=f"model-search:{best['label']}")
+        reduced, _ = run_feature_stage(iqr_multiplier=best['iqr_multiplier'])
+        publish_shared_dataset(reduced)
+    return dict(search, applied=bool(apply_best and best is not None),
+                pipeline_params=dict(params))
+
+@app.route('/api/model-search', methods=['GET', 'POST'])
+def api_model_search():
+    """POST starts a cross-validated parameter search as a job; GET shows the parameters in effect.
+
+    Query parameters: ``iqr_multipliers=1.5,3``, ``alphas=0.1,1,10``,
+    ``drop=a,b`` (an extra candidate drop list), ``folds=5`` and ``apply=0``
+    to report the best configuration without adopting it.
+    """
+    if request.method == 'GET':
+        return jsonify(current_dataset().params)
+    
+    try:
+        iqr_multipliers = parse_list(request.args.get('iqr_multipliers', ''), float) \
+            or list(SEARCH_IQR_MULTIPLIERS)
+        alphas = parse_list(request.args.get('alphas', ''), float) or list(SEARCH_ALPHAS)
+    except ValueError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        return response
+    drop_lists = {'selected': AUTO_SELECT, 'original': list(COLS_TO_REMOVE), 'none': []}
+    if request.args.get('drop'):
+        drop_lists['custom'] = parse_list(request.args['drop'])
+    folds = max(2, request.args.get('folds', 5, type=int))
+    apply_best = request.args.get('apply', '1') not in ('0', 'false')
+    
+    params = {'iqr_multipliers': iqr_multipliers, 'drop_lists': drop_lists, 'alphas': alphas,
+              'folds': folds, 'apply_best': apply_best}
+    # Searches run on the load snapshot, so appended sales make a new job
+    key = make_version('model-search', current_dataset().name, params, current_load_version())
+    job, created = job_store.submit(
+        key, bind_dataset(lambda job: run_model_search(progress=job.progress, **params)))
+    response = jsonify(dict(job.to_dict(), deduplicated=not created,
+                            status_url=f"/api/jobs/{job.id}",
+                            events_url=f"/api/jobs/{job.id}/events"))
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response
+
+# Stage names reported by a process-all run, in order
+PROCESS_ALL_STAGES = ('load', 'initial_summary', 'missing_data', 'correlation_data',
+                      'outlier_info', 'feature_info', 'final_summary')
+STREAM_STAGES = ('stream',)
+
+def run_process_all(iqr_multiplier=None, cols_to_remove=None,
+                    streaming=False, memory_budget_mb=STREAM_MEMORY_BUDGET_MB, progress=None):
+    """Run the complete analysis pipeline and return the combined payload.
+
+    ``progress``, if given, is called as ``progress(stage, 'running')`` and
+    ``progress(stage, 'done', seconds)`` for every stage.
+    """
+    if iqr_multiplier is None:
+        iqr_multiplier = current_dataset().params['iqr_multiplier']
+    if cols_to_remove is None:
+        cols_to_remove = current_dataset().params['cols_to_remove']
+    started = time.perf_counter()
+    timings = {}
+    
+    def step(name, func, *args, **kwargs):
+        if progress is not None:
+            progress(name, 'running')
+        result, seconds = timed_call(func, *args, **kwargs)
+        timings[name] = round(seconds, 6)
+        if progress is not None:
+            progress(name, 'done', seconds)
+        return result
+    
+    if streaming:
+        # Out-of-core mode: one chunked pass; row-level stages need the in-memory path
+        summary = step('stream', get_stream_summary, memory_budget_mb)
+        return {
+            'success': True,
+            'mode': 'streaming',
+            'initial_summary': summary.data_summary(),
+            'missing_data': summary.missing_data(),
+            'correlation_data': get_correlation_data(None, summary.correlation_stats),
+            'price_distribution': summary.price_distribution(),
+            'stream_info': summary.info(),
+            'timings': dict(timings, total=round(time.perf_counter() - started, 6))
         }
+    
+    # Step 1: Load data (re-read only when the file changed)
+    pipeline = current_pipeline()
+    loaded = step('load', load_and_process_data)
+    
+    # Steps 2-4: initial summary, missing data and correlation all read the
+    # loaded snapshot and are independent, so they run concurrently
+    analyses, stage_timings = run_stages({
+        'initial_summary': lambda: pipeline.analyze('summary', loaded, get_data_summary),
+        'missing_data': lambda: get_snapshot_missing(loaded),
+        'correlation_data': lambda: get_snapshot_correlation(loaded)
+    }, stage_executor, progress)
+    timings.update(stage_timings)
+    
+    # Step 5: Remove outliers
+    trimmed, outlier_info = step('outlier_info', pipeline.transform, 'outliers', loaded,
+                                 remove_outliers, iqr_multiplier=iqr_multiplier)
+    
+    # Step 6: Feature engineering
+    reduced, feature_info = step('feature_info', pipeline.transform, 'features', trimmed,
+                                 feature_remover(trimmed),
+                                 cols_to_remove=drop_param(cols_to_remove))
+    
+    # Step 7: Final summary
+    final_summary = step('final_summary', pipeline.analyze, 'summary', reduced, get_data_summary)
+    publish_shared_dataset(reduced)
+    if WARM_START:
+        stage_executor.submit(bind_dataset(save_warm_start))
+    timings['total'] = round(time.perf_counter() - started, 6)
+    
+    return dict(
+        analyses,
+        success=True,
+        outlier_info=outlier_info,
+        feature_info=feature_info,
+        final_summary=final_summary,
+        versions=reduced.lineage(),
+        load_info=current_dataset().load_info,
+        timings=timings
+    )
+
+def request_process_all_params():
+    """Pipeline parameters for a process-all run, read from the query string"""
+    return {
+        'iqr_multiplier': request_iqr_multiplier(),
+        'cols_to_remove': drop_param(request_drop_list()),
+        'streaming': use_streaming(),
+        'memory_budget_mb': request.args.get('memory_budget_mb', STREAM_MEMORY_BUDGET_MB, type=int)
+    }
+
+@app.route('/api/datasets')
+def api_datasets():
+    """Registered datasets with their load state and memory, and the cache budget"""
+    return jsonify({
+        'default': datasets.default_name,
+        'datasets': [dataset.info() for dataset in datasets],
+        'cache': datasets.stats()
     })
 
 @app.route('/api/process-all')
 def api_process_all():
     """API endpoint to run the complete analysis pipeline"""
     try:
-        # Step 1: Load data
-        load_success = load_and_process_data()
-        if not load_success:
-            return jsonify({'error': 'Failed to load data'})
-        
-        # Step 2: Get initial summary
-        initial_summary = get_data_summary()
-        
-        # Step 3: Analyze missing data
-        missing_data = get_missing_data()
-        
-        # Step 4: Get correlation analysis
-        correlation_data = get_correlation_data()
-        
-        # Step 5: Remove outliers
-        outlier_info = remove_outliers()
-        
-        # Step 6: Feature engineering
-        feature_info = remove_features()
-        
-        # Step 7: Final summary
-        final_summary = get_data_summary()
-        
-        return jsonify({
-            'success': True,
-            'initial_summary': initial_summary,
-            'missing_data': missing_data,
-            'correlation_data': correlation_data,
-            'outlier_info': outlier_info,
-            'feature_info': feature_info,
-            'final_summary': final_summary
-        })
-        
+        return respond(run_process_all(**request_process_all_params()))
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Start a process-all run in the background and return its job ID straight away.
+
+    An identical submission (same parameters, same data) returns the
+    in-flight or finished job instead of starting a new run.
+    """
+    params = request_process_all_params()
+    dataset = current_dataset()
+    # Streaming runs read the file; the others start from the load snapshot, appended sales included
+    data_version = (dataset.source_version() if params['streaming']
+                    else current_load_version())
+    key = make_version('process-all', dataset.name, params, data_version)
+    stages = STREAM_STAGES if params['streaming'] else PROCESS_ALL_STAGES
+    job, created = job_store.submit(
+        key, bind_dataset(lambda job: run_process_all(progress=job.progress, **params)), stages)
+    response = jsonify(dict(job.to_dict(), deduplicated=not created,
+                            status_url=f"/api/jobs/{job.id}",
+                            events_url=f"/api/jobs/{job.id}/events"))
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Job status and per-stage progress; includes the result once the job is done"""
+    job = job_store.get(job_id)
+    if job is None:
+        response = jsonify({'error': 'Unknown or expired job'})
+        response.status_code = 404
+        return response
+    return respond(job.to_dict(include_result=True))
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """Server-Sent Events stream of a job's progress, ending with 'done' or 'failed'"""
+    job = job_store.get(job_id)
+    if job is None:
+        response = jsonify({'error': 'Unknown or expired job'})
+        response.status_code = 404
+        return response
+    return Response(job.events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+if WARM_START:
+    restore_warm_start()
+
 # Create the HTML template
 template_html = '''
 <!DOCTYPE html>
@@ -710,8 +1809,27 @@ template_html = '''
             try {
                 showStatus('Running complete analysis pipeline...', 'info');
                 
-                const response = await fetch('/api/process-all');
-                const result = await response.json();
+                const submitted = await (await fetch('/api/jobs', {method: 'POST'})).json();
+                await new Promise((resolve, reject) => {
+                    const events = new EventSource(submitted.events_url);
+                    events.addEventListener('progress', event => {
+                        const job = JSON.parse(event.data);
+                        const running = Object.keys(job.stages).filter(name => job.stages[name].status === 'running');
+                        btn.textContent = `⏳ Processing... ${Math.round(job.progress * 100)}%` +
+                            (running.length ? ` (${running.join(', ')})` : '');
+                    });
+                    events.addEventListener('done', () => { events.close(); resolve(); });
+                    events.addEventListener('failed', event => {
+                        events.close();
+                        reject(new Error(JSON.parse(event.data).error));
+                    });
+                    events.onerror = () => { events.close(); resolve(); };
+                });
+                const job = await (await fetch(submitted.status_url)).json();
+                if (job.status !== 'done') {
+                    throw new Error(job.error || 'Analysis did not finish');
+                }
+                const result = job.result;
                 
                 if (result.error) {
                     throw new Error(result.error);
@@ -779,4 +1897,147 @@ template_html = '''
             let html = '<div style="display: grid; gap: 10px;">';
             correlationData.top_features.slice(0, 8).forEach(feature => {
                 const width = Math.abs(feature.correlation) * 100;
-                html += `
\ No newline at end of file
+                html += `
+                    <div style="padding: 10px; background: #f8f9fa; border-radius: 8px;">
+                        <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                            <strong>${feature.name}</strong>
+                            <span>${feature.correlation.toFixed(3)}</span>
+                        </div>
+                        <div style="height: 8px; background: #e9ecef; border-radius: 4px;">
+                            <div style="height: 8px; width: ${width}%; background: ${feature.correlation >= 0 ? '#667eea' : '#dc3545'}; border-radius: 4px;"></div>
+                        </div>
+                    </div>
+                `;
+            });
+            html += '</div>';
+            container.innerHTML = html;
+        }
+
+        function infoItems(items) {
+            return '<div class="data-info">' + items.map(([label, value]) => `
+                <div class="info-item">
+                    <span class="info-label">${label}</span>
+                    <span class="info-value">${value}</span>
+                </div>
+            `).join('') + '</div>';
+        }
+
+        function updateOutlierAnalysis(outlierInfo) {
+            document.getElementById('outlierAnalysis').innerHTML = infoItems([
+                ['Original Count', outlierInfo.original_count],
+                ['Outliers Removed', outlierInfo.outliers_removed],
+                ['Final Count', outlierInfo.final_count],
+                ['Q1', outlierInfo.q1],
+                ['Q3', outlierInfo.q3],
+                ['IQR', outlierInfo.iqr],
+                ['Upper Boundary', outlierInfo.boundary]
+            ]);
+        }
+
+        function updateFeatureEngineering(featureInfo) {
+            const categories = featureInfo.categories || {};
+            const labels = {
+                multicollinear: 'Multicollinear features',
+                high_missing: 'High missing values (>20%)',
+                low_correlation: 'Low correlation features'
+            };
+            let html = infoItems([
+                ['Original Features', featureInfo.original_features],
+                ['Removed Features', featureInfo.removed_features],
+                ['Final Features', featureInfo.final_features]
+            ]);
+            Object.keys(labels).forEach(category => {
+                const columns = categories[category] || [];
+                if (columns.length) {
+                    html += `<p style="margin-top: 15px;"><strong>${labels[category]} (${columns.length}):</strong> ${columns.join(', ')}</p>`;
+                }
+            });
+            if (!featureInfo.categories && featureInfo.removed_list) {
+                html += `<p style="margin-top: 15px;"><strong>Removed:</strong> ${featureInfo.removed_list.join(', ')}</p>`;
+            }
+            document.getElementById('featureEngineering').innerHTML = html;
+        }
+
+        function drawChart(id, config) {
+            if (charts[id]) {
+                charts[id].destroy();
+            }
+            charts[id] = new Chart(document.getElementById(id), config);
+        }
+
+        async function loadPriceDistribution() {
+            const data = await (await fetch('/api/price-distribution')).json();
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            drawChart('priceDistribution', {
+                type: 'bar',
+                data: {
+                    labels: data.histogram.bins.map(edge => `$${Math.round(edge / 1000)}k`),
+                    datasets: [{label: 'Houses', data: data.histogram.counts,
+                                backgroundColor: 'rgba(102, 126, 234, 0.7)'}]
+                },
+                options: {responsive: true, maintainAspectRatio: false,
+                          plugins: {legend: {display: false}}}
+            });
+        }
+
+        async function loadBoxPlot() {
+            const data = await (await fetch('/api/box-plot-data')).json();
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            const values = [data.whiskers.lower, data.q1, data.q2, data.q3, data.whiskers.upper];
+            drawChart('boxPlot', {
+                type: 'bar',
+                data: {
+                    labels: ['Lower Whisker', 'Q1', 'Median', 'Q3', 'Upper Whisker'],
+                    datasets: [{label: 'Sale Price', data: values,
+                                backgroundColor: ['#adb5bd', '#667eea', '#764ba2', '#667eea', '#adb5bd']}]
+                },
+                options: {responsive: true, maintainAspectRatio: false,
+                          plugins: {legend: {display: false},
+                                    title: {display: true, text: `${data.outliers.length} outliers above $${Math.round(data.upper_bound).toLocaleString()}`}}}
+            });
+        }
+
+        async function updateScatterPlot() {
+            const feature = document.getElementById('featureSelect').value;
+            const data = await (await fetch(`/api/scatter-data?feature=${encodeURIComponent(feature)}`)).json();
+            if (data.error) {
+                showStatus(`Error loading scatter plot: ${data.error}`, 'error');
+                return;
+            }
+            const points = data.x_data.map((x, i) => ({x: x, y: data.y_data[i]}));
+            drawChart('scatterPlot', {
+                type: 'scatter',
+                data: {datasets: [{label: `${data.feature_name} vs SalePrice`, data: points,
+                                   backgroundColor: 'rgba(118, 75, 162, 0.5)', pointRadius: 3}]},
+                options: {responsive: true, maintainAspectRatio: false,
+                          scales: {x: {title: {display: true, text: data.feature_name}},
+                                   y: {title: {display: true, text: 'SalePrice'}}}}
+            });
+        }
+    </script>
+</body>
+</html>
+'''
+
+# Save the template next to the app, where render_template looks for it
+template_dir = os.path.join(app.root_path, 'templates')
+template_path = os.path.join(template_dir, 'dashboard.html')
+try:
+    with open(template_path, encoding='utf-8') as handle:
+        template_current = handle.read() == template_html
+except OSError:
+    template_current = False
+if not template_current:
+    # Written atomically, since several workers may import the app at once
+    os.makedirs(template_dir, exist_ok=True)
+    template_tmp = f"{template_path}.{os.getpid()}.tmp"
+    with open(template_tmp, 'w', encoding='utf-8') as handle:
+        handle.write(template_html)
+    os.replace(template_tmp, template_path)
+
+if __name__ == '__main__':
+    app.run(debug=True)
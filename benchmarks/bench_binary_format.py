@@ -0,0 +1,81 @@
+"""Compare bytes on the wire and serialization time of JSON and columnar binary.
+
+    python benchmarks/bench_binary_format.py --points 1000 100000 1000000
+
+Builds the payloads of /api/price-distribution, /api/scatter-data and
+/api/correlation at several sizes and reports, for each format, the
+encoded size and the time to serialize (and for binary, to decode).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from binary_format import Matrix, decode, encode, to_jsonable  # noqa: E402
+
+
+def payloads(points, columns, seed):
+    rng = np.random.default_rng(seed)
+    prices = np.abs(rng.normal(180000, 50000, points))
+    living_area = np.abs(rng.normal(1500, 500, points))
+    counts, edges = np.histogram(prices, bins=20)
+    frame = pd.DataFrame(rng.normal(size=(min(points, 5000), columns)),
+                         columns=[f"feature_{i}" for i in range(columns)])
+    return {
+        'price-distribution': {
+            'prices': prices,
+            'histogram': {'counts': counts, 'bins': (edges[:-1] + edges[1:]) / 2, 'bin_edges': edges},
+            'stats': {'mean': float(prices.mean()), 'median': float(np.median(prices))},
+        },
+        'scatter-data': {'x_data': living_area, 'y_data': prices, 'feature_name': 'GrLivArea'},
+        'correlation': {'correlation_matrix': Matrix.from_frame(frame.corr().round(3))},
+    }
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 100_000, 1_000_000])
+    parser.add_argument('--columns', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    formats = {
+        'json': lambda payload: json.dumps(to_jsonable(payload)).encode('utf-8'),
+        'binary f64': lambda payload: encode(payload, '<f8'),
+        'binary f32': lambda payload: encode(payload, '<f4'),
+        'binary f32 gzip': lambda payload: encode(payload, '<f4', compress=True),
+    }
+    print(f"{'endpoint':20s} {'points':>9s} {'format':16s} {'bytes':>12s} {'ratio':>6s}"
+          f" {'encode ms':>10s} {'decode ms':>10s}")
+    for points in args.points:
+        for endpoint, payload in payloads(points, args.columns, args.seed).items():
+            baseline = None
+            for name, serialize in formats.items():
+                body, encode_seconds = timed(lambda: serialize(payload), args.repeat)
+                if name == 'json':
+                    _, decode_seconds = timed(lambda: json.loads(body), args.repeat)
+                    baseline = len(body)
+                else:
+                    _, decode_seconds = timed(lambda: decode(body), args.repeat)
+                print(f"{endpoint:20s} {points:9d} {name:16s} {len(body):12d} {baseline / len(body):6.2f}"
+                      f" {encode_seconds * 1000:10.2f} {decode_seconds * 1000:10.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
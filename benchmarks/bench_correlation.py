@@ -0,0 +1,100 @@
+"""Check and time the sufficient-statistics correlation engine against pandas.
+
+    python benchmarks/bench_correlation.py --rows 100000 --cols 40
+
+Builds a synthetic frame with missing values, then compares
+``CorrelationStats`` with ``DataFrame.corr()`` for the full frame, after
+removing IQR outliers (downdate) and after appending new rows, and times
+top-k queries against the ``CorrelationIndex``. Exits non-zero if any
+entry differs by more than ``--tolerance``.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from correlation import CorrelationIndex, CorrelationStats  # noqa: E402
+
+
+def make_frame(rows, cols, missing_rate, seed):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, 1))
+    values = base * rng.uniform(0.1, 1.0, cols) + rng.normal(size=(rows, cols))
+    values = values * rng.uniform(1, 1e5, cols) + rng.uniform(0, 1e6, cols)
+    values[rng.random((rows, cols)) < missing_rate] = np.nan
+    frame = pd.DataFrame(values, columns=[f"f{i}" for i in range(cols)])
+    frame['SalePrice'] = np.abs(180000 + 50000 * base[:, 0] + rng.normal(0, 20000, rows))
+    return frame
+
+
+def max_error(expected, actual):
+    diff = np.abs(expected.to_numpy() - actual.reindex_like(expected).to_numpy())
+    both_nan = np.isnan(expected.to_numpy()) & np.isnan(actual.reindex_like(expected).to_numpy())
+    return float(np.nanmax(np.where(both_nan, 0.0, diff)))
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--cols', type=int, default=30)
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    parser.add_argument('--append-rows', type=int, default=1000)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows + args.append_rows, args.cols, args.missing_rate, args.seed)
+    initial, extra = frame.iloc[:args.rows], frame.iloc[args.rows:]
+
+    expected, pandas_seconds = timed(initial.corr)
+    stats, build_seconds = timed(lambda: CorrelationStats.from_frame(initial))
+    errors = {'full': max_error(expected, stats.corr())}
+
+    prices = initial['SalePrice']
+    q1, q3 = prices.quantile(0.25), prices.quantile(0.75)
+    outliers = initial[prices > q3 + 1.5 * (q3 - q1)]
+    trimmed = initial.drop(outliers.index)
+    downdated, remove_seconds = timed(lambda: stats.copy().remove(outliers))
+    errors['downdate'] = max_error(trimmed.corr(), downdated.corr())
+
+    appended, append_seconds = timed(lambda: stats.copy().append(extra))
+    errors['append'] = max_error(frame.corr(), appended.corr())
+
+    index, index_seconds = timed(lambda: CorrelationIndex.from_stats(stats))
+    _, query_seconds = timed(lambda: [index.top('SalePrice', 8) for _ in range(args.queries)])
+    # The index stores float32, so compare its matrix at float32 precision
+    errors['index'] = max_error(stats.corr(), pd.DataFrame(index.matrix(), index=index.columns,
+                                                          columns=index.columns))
+
+    print(f"rows={args.rows} cols={args.cols + 1} outliers={len(outliers)} appended={len(extra)}")
+    print(f"pandas corr():        {pandas_seconds * 1000:9.2f} ms")
+    print(f"build statistics:     {build_seconds * 1000:9.2f} ms")
+    print(f"remove outliers:      {remove_seconds * 1000:9.2f} ms")
+    print(f"append rows:          {append_seconds * 1000:9.2f} ms")
+    print(f"build index:          {index_seconds * 1000:9.2f} ms ({index.nbytes} bytes)")
+    print(f"top-8 query:          {query_seconds / args.queries * 1000:9.4f} ms")
+    for name, error in errors.items():
+        print(f"max |error| {name:9s} {error:.3e}")
+
+    tolerances = {'index': max(args.tolerance, 1e-6)}
+    failed = [name for name, error in errors.items()
+              if error > tolerances.get(name, args.tolerance)]
+    if failed:
+        print(f"FAILED: error above tolerance {args.tolerance} for {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Time data-driven feature selection on wide frames and check the VIF elimination.
+
+    python benchmarks/bench_feature_selection.py --rows 5000 --cols 2000 --ames "data (1).csv"
+
+Builds a synthetic frame whose columns share a few latent factors (so
+some are collinear), adds sparse and irrelevant columns, runs
+``select_features`` and reports the time and the removals per reason.
+The downdating VIF elimination is compared with re-inverting the
+correlation matrix after every removal, on a smaller synthetic problem
+and on the numeric columns of the Ames data (pairwise, complete-row
+and median-filled correlations, the last two near-singular because
+GrLivArea and TotalBsmtSF are exact sums of other columns). The script
+exits non-zero if any of them disagree.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from feature_selection import RIDGE, eliminate_by_vif, select_features  # noqa: E402
+
+
+def make_frame(rows, cols, seed):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(rows, 8))
+    loadings = rng.normal(size=(8, cols)) * (rng.random(cols) < 0.5)
+    values = factors @ loadings + rng.normal(size=(rows, cols))
+    values[:, :cols // 20][rng.random((rows, cols // 20)) < 0.5] = np.nan
+    frame = pd.DataFrame(values, columns=[f"f{i}" for i in range(cols)])
+    frame['SalePrice'] = np.exp(12 + 0.2 * factors[:, 0] + 0.1 * rng.normal(size=rows))
+    return frame
+
+
+def naive_vif_elimination(corr, max_vif):
+    active = list(range(len(corr)))
+    dropped = []
+    while len(active) > 1:
+        sub = corr[np.ix_(active, active)] + RIDGE * np.eye(len(active))
+        vif = np.diagonal(np.linalg.inv(sub))
+        worst = int(np.argmax(vif))
+        if vif[worst] <= max_vif:
+            break
+        dropped.append(active.pop(worst))
+    return dropped
+
+
+def ames_matrices(path):
+    """Correlation matrices of the Ames numeric columns (without SalePrice)"""
+    numeric = pd.read_csv(path).select_dtypes(include=[np.number]).drop(columns='SalePrice')
+    frames = {'pairwise': numeric, 'complete rows': numeric.dropna(),
+              'median filled': numeric.fillna(numeric.median())}
+    return {name: (np.nan_to_num(frame.corr().to_numpy()), list(frame.columns))
+            for name, frame in frames.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--cols', type=int, default=1000)
+    parser.add_argument('--check-cols', type=int, default=120)
+    parser.add_argument('--max-vif', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ames', default=os.path.join(ROOT, 'data (1).csv'),
+                        help='Ames CSV for the near-singular check (skipped if missing)')
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows, args.cols, args.seed)
+    started = time.perf_counter()
+    categories, _ = select_features(frame, min_target_corr=0.05, max_vif=args.max_vif)
+    seconds = time.perf_counter() - started
+    print(f"rows={args.rows} cols={args.cols} select_features: {seconds:.2f} s")
+    for category, columns in categories.items():
+        print(f"  {category:16s} {len(columns)}")
+
+    check = make_frame(args.rows, args.check_cols, args.seed + 1).drop(columns='SalePrice')
+    corr = check.corr().to_numpy()
+    started = time.perf_counter()
+    fast, _ = eliminate_by_vif(corr, args.max_vif)
+    fast_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    naive = naive_vif_elimination(corr, args.max_vif)
+    naive_seconds = time.perf_counter() - started
+    print(f"VIF elimination on {args.check_cols} cols: one inversion {fast_seconds * 1000:.1f} ms, "
+          f"re-inverting {naive_seconds * 1000:.1f} ms, {len(fast)} removed")
+
+    failed = fast != naive
+    if failed:
+        print('FAILED: downdating VIF elimination differs from re-inverting on synthetic data')
+
+    if os.path.exists(args.ames):
+        for name, (corr, columns) in ames_matrices(args.ames).items():
+            for max_vif in (10.0, args.max_vif, 2.5):
+                fast, _ = eliminate_by_vif(corr, max_vif)
+                naive = naive_vif_elimination(corr, max_vif)
+                print(f"Ames {name:14s} cond {np.linalg.cond(corr):9.2e} max_vif {max_vif:4.1f}: "
+                      f"{', '.join(columns[i] for i in fast) or '-'}")
+                if fast != naive:
+                    print(f"FAILED: differs from re-inverting, which drops "
+                          f"{', '.join(columns[i] for i in naive) or '-'}")
+                    failed = True
+    else:
+        print(f"{args.ames} not found; skipping the Ames check")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
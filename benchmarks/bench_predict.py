@@ -0,0 +1,89 @@
+"""Throughput of the batch price model for batch sizes from 1 to 100k rows.
+
+    python benchmarks/bench_predict.py --data "data (1).csv"
+
+Fits ``PriceModel`` on the numeric columns of the CSV (or a synthetic
+frame when no file is given), saves and reloads it, then scores batches
+of increasing size drawn from the training rows and reports rows/second.
+Exits non-zero if the reloaded model's predictions differ from the
+fitted one's.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from price_model import PriceModel  # noqa: E402
+
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'OverallQual': rng.integers(1, 11, rows),
+        'GrLivArea': rng.normal(1500, 500, rows),
+        'GarageArea': rng.normal(500, 200, rows),
+        'TotalBsmtSF': rng.normal(1000, 300, rows),
+        'YearBuilt': rng.integers(1900, 2010, rows),
+        'TotRmsAbvGrd': rng.integers(4, 12, rows),
+    })
+    log_price = (10.5 + 0.1 * frame['OverallQual'] + 0.0003 * frame['GrLivArea']
+                 + 0.002 * (frame['YearBuilt'] - 1900) + rng.normal(0, 0.15, rows))
+    frame['SalePrice'] = np.exp(log_price)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', help='CSV to fit on (default: synthetic data)')
+    parser.add_argument('--rows', type=int, default=1460, help='synthetic training rows')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    frame = pd.read_csv(args.data) if args.data else make_frame(args.rows, args.seed)
+    started = time.perf_counter()
+    model = PriceModel.fit(frame)
+    fit_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = model.save(os.path.join(directory, 'model.npz'))
+        started = time.perf_counter()
+        reloaded = PriceModel.load(path)
+        load_seconds = time.perf_counter() - started
+
+    numeric = frame[model.features]
+    rng = np.random.default_rng(args.seed)
+    print(f"features={len(model.features)} training rows={model.metrics['rows']} "
+          f"r2_log={model.metrics['r2_log']:.4f}")
+    print(f"fit: {fit_seconds * 1000:.2f} ms   reload from disk: {load_seconds * 1000:.2f} ms")
+    print(f"{'batch':>8} {'ms/batch':>10} {'rows/s':>14}")
+
+    mismatch = False
+    for size in BATCH_SIZES:
+        batch = numeric.iloc[rng.integers(0, len(numeric), size)]
+        columns = {col: batch[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                   for col in model.features}
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            predictions = reloaded.predict(columns)
+            timings.append(time.perf_counter() - started)
+        mismatch |= not np.allclose(predictions, model.predict(columns), rtol=0, atol=1e-6)
+        best = min(timings)
+        print(f"{size:>8} {best * 1000:>10.3f} {size / best:>14,.0f}")
+
+    if mismatch:
+        print('FAILED: reloaded model predictions differ from the fitted model')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Check and time the KLL quantile sketches against exact NumPy quantiles.
+
+    python benchmarks/bench_sketches.py --rows 5000000 --eps 0.01
+
+Sketches several distributions in parallel chunks, merges them and checks
+that the normalised rank error of every percentile (and of the box-plot
+quartiles) stays within ``--eps``. Exits non-zero when it does not.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sketches import box_plot_stats, sketch_values  # noqa: E402
+
+
+def distributions(rows, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        'normal prices': np.abs(rng.normal(180000, 50000, rows)),
+        'lognormal prices': rng.lognormal(12, 0.4, rows),
+        'quality codes': rng.integers(1, 11, rows).astype(np.float64),
+        'sorted input': np.sort(rng.normal(size=rows)),
+    }
+
+
+def rank_error(sorted_values, estimates, qs):
+    """Distance from each target quantile to the rank interval of its estimate"""
+    n = len(sorted_values)
+    low = np.searchsorted(sorted_values, estimates, side='left') / n
+    high = np.searchsorted(sorted_values, estimates, side='right') / n
+    return float(np.max(np.maximum(0.0, np.maximum(low - qs, qs - high))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--eps', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--chunk-rows', type=int, default=250_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    qs = np.linspace(0.01, 0.99, 99)
+    failed = []
+    print(f"rows={args.rows} eps={args.eps} workers={args.workers} chunk_rows={args.chunk_rows}")
+    for name, values in distributions(args.rows, args.seed).items():
+        started = time.perf_counter()
+        exact = np.percentile(values, [25, 50, 75])
+        exact_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sketch = sketch_values(values, args.eps, args.workers, args.chunk_rows)
+        sketch_seconds = time.perf_counter() - started
+
+        ordered = np.sort(values)
+        error = rank_error(ordered, sketch.quantiles(qs), qs)
+        stats = box_plot_stats(sketch=sketch)
+        quartile_error = rank_error(ordered, np.array([stats['q1'], stats['q2'], stats['q3']]),
+                                    np.array([0.25, 0.5, 0.75]))
+        retained = sum(len(level) for level in sketch.levels)
+        print(f"{name:18s} exact {exact_seconds * 1000:8.1f} ms  sketch {sketch_seconds * 1000:8.1f} ms"
+              f"  retained {retained:6d}  rank error {error:.5f}  quartiles {quartile_error:.5f}"
+              f"  q2 exact {exact[1]:.1f} sketch {stats['q2']:.1f}")
+        if max(error, quartile_error) > args.eps:
+            failed.append(name)
+
+    if failed:
+        print(f"FAILED: rank error above {args.eps} for {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Time a worker's cold start and first request, with and without warm start.
+
+    python benchmarks/bench_startup.py --runs 3 --path /api/process-all --output startup.json
+
+Every run starts a fresh interpreter in the repository root that imports
+``app`` and serves ``--path`` twice through the test client. It reports
+the import time, the first and second request latencies and which heavy
+plotting modules were imported. The ``cold`` scenario runs with warm
+start disabled. The ``warm`` scenario first runs ``/api/process-all`` in
+one process to save a state file, then starts fresh processes with
+``WARM_START=1``, which should answer the first request at the latency
+of the second.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('matplotlib', 'matplotlib.pyplot', 'seaborn')
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+latencies = []
+for _ in range(2):
+    request_started = time.perf_counter()
+    response = client.get(sys.argv[1])
+    latencies.append(time.perf_counter() - request_started)
+    assert response.status_code == 200, response.status_code
+app.stage_executor.shutdown(wait=True)  # let a warm-start save finish
+print(json.dumps({
+    'import_seconds': imported - started,
+    'first_request_seconds': latencies[0],
+    'second_request_seconds': latencies[1],
+    'restored': app.warm_start_info['restored'],
+    'heavy_modules': [name for name in %r if name in sys.modules]
+}))
+''' % (HEAVY_MODULES,)
+
+
+def start_worker(path, env):
+    output = subprocess.run([sys.executable, '-c', CHILD, path], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(name, runs):
+    median_ms = {key: statistics.median(run[key] for run in runs) * 1000
+                 for key in ('import_seconds', 'first_request_seconds', 'second_request_seconds')}
+    modules = sorted({module for run in runs for module in run['heavy_modules']})
+    print(f"{name:5s} import {median_ms['import_seconds']:8.1f} ms   "
+          f"first request {median_ms['first_request_seconds']:8.1f} ms   "
+          f"second request {median_ms['second_request_seconds']:8.1f} ms   "
+          f"restored {sum(run['restored'] for run in runs)}/{len(runs)}   "
+          f"plotting modules: {', '.join(modules) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--path', default='/api/process-all')
+    parser.add_argument('--output', help='write the runs as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        state_path = os.path.join(directory, 'warm_start.pkl')
+        cold_env = dict(os.environ, WARM_START='0')
+        warm_env = dict(os.environ, WARM_START='1', WARM_START_PATH=state_path)
+
+        scenarios = {'cold': [], 'warm': []}
+        for _ in range(args.runs):
+            scenarios['cold'].append(start_worker(args.path, cold_env))
+        start_worker('/api/process-all', warm_env)  # process-all saves the state file
+        for _ in range(args.runs):
+            scenarios['warm'].append(start_worker(args.path, warm_env))
+
+    for name, runs in scenarios.items():
+        summarize(name, runs)
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'args': {'runs': args.runs, 'path': args.path}
+            },
+            'scenarios': scenarios
+        }
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    warm_restored = all(run['restored'] for run in scenarios['warm'])
+    return 0 if warm_restored else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Time and memory-profile the analysis functions and endpoints at scaled data sizes.
+
+    python benchmarks/bench_suite.py --scales 1,10,100,1000 --output run.json
+    python benchmarks/bench_suite.py --output new.json --baseline run.json
+
+Generates the synthetic Ames-shaped dataset at each multiple of its
+1,460 rows (``--extra-columns`` and ``--missing-rate`` widen and thin it).
+It then times the analysis functions and the payload building of every
+read endpoint, and measures their peak traced memory. Results are
+written as JSON. With ``--baseline`` each result is compared with an
+earlier run, and the script exits non-zero when any median time grew by
+more than ``--threshold`` (and by at least ``--min-seconds``).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+from compact_dtypes import compact_frame  # noqa: E402
+from sample_data import BASE_ROWS, make_sample_data  # noqa: E402
+
+ENDPOINTS = (
+    '/api/data-summary',
+    '/api/missing-data',
+    '/api/correlation',
+    '/api/price-distribution',
+    '/api/scatter-data?feature=GrLivArea',
+    '/api/box-plot-data',
+    '/api/outlier-analysis',
+    '/api/feature-engineering',
+    '/api/process-all',
+)
+
+
+def functions(data):
+    """Analysis functions to measure, as zero-argument callables over ``data``"""
+    return {
+        'get_data_summary': lambda: app.get_data_summary(data),
+        'get_missing_data': lambda: app.get_missing_data(data),
+        'get_correlation_data': lambda: app.get_correlation_data(data),
+        'remove_outliers': lambda: app.remove_outliers(data, app.IQR_MULTIPLIER),
+        'remove_features': lambda: app.remove_features(data),
+        'remove_features[original]': lambda: app.remove_features(data, app.COLS_TO_REMOVE),
+    }
+
+
+def endpoint_call(client, data, scale, path):
+    """Callable that serves ``path`` from a cold pipeline loaded with ``data``"""
+    runs = iter(range(1_000_000))
+
+    def call():
+        # A fresh source each time so no stage result or response is reused
+        app.datasets.default.path = os.path.join('.bench-missing', f"x{scale}-{next(runs)}.csv")
+        app.datasets.default.pipeline.clear()
+        app.response_cache.clear()
+        app.load_and_process_data()
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        return response.get_data()
+    return call
+
+
+def measure(func, repeat):
+    """Wall-clock seconds of ``repeat`` calls, then the traced peak of one more"""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds_min': min(seconds), 'seconds_median': statistics.median(seconds),
+            'peak_bytes': peak}
+
+
+def run(args):
+    results = []
+    client = app.app.test_client()
+    original_read_data, original_path = app.read_data, app.datasets.default.path
+    try:
+        for scale in args.scales:
+            # At the compact dtypes the loader gives the app
+            data = compact_frame(make_sample_data(BASE_ROWS * scale, args.extra_columns,
+                                                  args.missing_rate, args.seed))
+            app.read_data = lambda dataset: data
+            cases = dict(functions(data))
+            if not args.skip_endpoints:
+                cases.update({path: endpoint_call(client, data, scale, path) for path in ENDPOINTS})
+            for name, func in cases.items():
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                result = dict(name=name, scale=scale, rows=len(data), columns=len(data.columns),
+                              **measure(func, args.repeat))
+                results.append(result)
+                print(f"{name:38s} x{scale:<5d} {result['seconds_median'] * 1000:10.2f} ms "
+                      f"{result['peak_bytes'] / 2 ** 20:9.1f} MiB", flush=True)
+    finally:
+        app.read_data, app.datasets.default.path = original_read_data, original_path
+        app.datasets.default.pipeline.clear()
+        app.response_cache.clear()
+    return results
+
+
+def result_key(result):
+    return result['name'], result['scale'], result['rows'], result['columns']
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """Results slower than the baseline by more than ``threshold`` (ratio of medians)"""
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result['seconds_median'] / max(old['seconds_median'], 1e-12)
+        result['baseline_seconds_median'] = old['seconds_median']
+        result['ratio'] = round(ratio, 4)
+        if ratio > threshold and result['seconds_median'] - old['seconds_median'] >= min_seconds:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='1,10,100,1000',
+                        help='multiples of the 1,460-row dataset (comma separated)')
+    parser.add_argument('--extra-columns', type=int, default=0)
+    parser.add_argument('--missing-rate', type=float, default=0.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', default='', help='only run cases whose name contains one of these')
+    parser.add_argument('--skip-endpoints', action='store_true')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='flag results whose median time grew by more than this factor')
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help='ignore slowdowns smaller than this many seconds')
+    args = parser.parse_args()
+    args.scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    args.only = [part for part in args.only.split(',') if part]
+
+    results = run(args)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items()
+                     if key not in ('output', 'baseline')}
+        },
+        'results': results
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare(results, json.load(handle), args.threshold, args.min_seconds)
+        report['regressions'] = [result_key(result) for result in regressions]
+        for result in regressions:
+            print(f"REGRESSION {result['name']} x{result['scale']}: "
+                  f"{result['baseline_seconds_median'] * 1000:.2f} ms -> "
+                  f"{result['seconds_median'] * 1000:.2f} ms ({result['ratio']:.2f}x)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Columnar binary encoding for numeric API payloads.
+
+Layout (all integers little-endian)::
+
+    b'HPCF'  u8 version  3 bytes reserved  u32 header length
+    header   UTF-8 JSON: {"meta": <payload>, "columns": [...]}
+    padding  to an 8-byte boundary, then each column buffer (8-byte aligned)
+
+Integer arrays are narrowed to the smallest width that holds their range
+and float arrays are sent as float64 or, on request, float32.
+
+Every NumPy array (and ``Matrix``) in the payload is replaced in ``meta``
+by ``{"$column": i}``; ``columns[i]`` gives its dtype, shape, offset and
+byte length, so a client can view each buffer as a typed array without
+parsing. Everything else in the payload stays as JSON in the header.
+
+NaN and infinities have no JSON form: they become null in JSON payloads
+and in the header (float buffers keep them).
+"""
+import gzip
+import json
+import math
+import struct
+
+import numpy as np
+
+MEDIA_TYPE = 'application/x-columnar'
+MAGIC = b'HPCF'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sB3xI')
+ALIGNMENT = 8
+FLOAT_DTYPES = {'float32': '<f4', 'float64': '<f8'}
+
+
+class Matrix:
+    """Labelled square matrix; JSON as nested dicts, binary as one 2D buffer"""
+
+    def __init__(self, columns, values):
+        self.columns = list(columns)
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls(frame.columns, frame.to_numpy(dtype=np.float64))
+
+    def to_json(self):
+        """Same shape as ``DataFrame.to_dict()``: {column: {row: value}}"""
+        return {col: dict(zip(self.columns, self.values[:, j].tolist()))
+                for j, col in enumerate(self.columns)}
+
+
+def is_nonfinite(value):
+    """Whether a scalar is a NaN or infinite float (null in JSON)"""
+    return isinstance(value, (float, np.floating)) and not math.isfinite(value)
+
+
+def to_jsonable(payload):
+    """Turn arrays and matrices in a payload into plain JSON values (non-finite floats as None)"""
+    if isinstance(payload, np.ndarray):
+        if payload.dtype.kind == 'f' and not np.isfinite(payload).all():
+            payload = np.where(np.isfinite(payload), payload, None)
+        return payload.tolist()
+    if isinstance(payload, Matrix):
+        return to_jsonable(payload.to_json())
+    if isinstance(payload, dict):
+        return {key: to_jsonable(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [to_jsonable(value) for value in payload]
+    if is_nonfinite(payload):
+        return None
+    return payload
+
+
+def smallest_int_dtype(array):
+    """Narrowest little-endian integer dtype that holds every value losslessly"""
+    if not array.size:
+        return '<i4'
+    low, high = int(array.min()), int(array.max())
+    for dtype in ('<i1', '<i2', '<i4', '<i8'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return '<u8'
+
+
+def negotiate(accept_header):
+    """Return the float dtype for a binary response, or None for JSON.
+
+    ``Accept: application/x-columnar`` selects float64 buffers and
+    ``Accept: application/x-columnar; dtype=float32`` halves them.
+    """
+    for media_range in (accept_header or '').split(','):
+        parts = [part.strip() for part in media_range.split(';')]
+        if parts[0] != MEDIA_TYPE:
+            continue
+        params = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+        if params.get('q', '1').strip() in ('0', '0.0'):
+            return None
+        return FLOAT_DTYPES.get(params.get('dtype', 'float64').strip(), FLOAT_DTYPES['float64'])
+    return None
+
+
+def encode(payload, float_dtype='<f8', compress=False):
+    """Encode a payload; float arrays are cast to ``float_dtype``"""
+    buffers = []
+    columns = []
+    offset = 0
+
+    def extract(value):
+        nonlocal offset
+        if isinstance(value, Matrix):
+            return {'$matrix': value.columns, 'values': extract(value.values)}
+        if isinstance(value, np.ndarray):
+            array = value
+            if array.dtype.kind == 'f':
+                array = array.astype(float_dtype, copy=False)
+            elif array.dtype.kind in 'iu':
+                array = array.astype(smallest_int_dtype(array), copy=False)
+            elif array.dtype.kind == 'b':
+                array = array.astype('|u1')
+            else:
+                return extract(value.tolist())
+            data = np.ascontiguousarray(array).tobytes()
+            padding = -len(data) % ALIGNMENT
+            columns.append({'dtype': array.dtype.str, 'shape': list(array.shape),
+                            'offset': offset, 'length': len(data)})
+            buffers.append(data + b'\0' * padding)
+            offset += len(data) + padding
+            return {'$column': len(columns) - 1}
+        if isinstance(value, dict):
+            return {key: extract(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract(item) for item in value]
+        if is_nonfinite(value):
+            return None
+        return value
+
+    meta = extract(payload)
+    header = json.dumps({'meta': meta, 'columns': columns}, separators=(',', ':'),
+                        default=_json_default).encode('utf-8')
+    header += b' ' * (-(PREAMBLE.size + len(header)) % ALIGNMENT)
+    body = b''.join([PREAMBLE.pack(MAGIC, VERSION, len(header)), header] + buffers)
+    return gzip.compress(body, compresslevel=5) if compress else body
+
+
+def decode(body):
+    """Decode an encoded payload back into dicts of NumPy arrays"""
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    magic, version, header_length = PREAMBLE.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a columnar payload')
+    header = json.loads(body[PREAMBLE.size:PREAMBLE.size + header_length])
+    start = PREAMBLE.size + header_length
+    columns = [np.frombuffer(body, dtype=column['dtype'], count=int(np.prod(column['shape'])),
+                             offset=start + column['offset']).reshape(column['shape'])
+               for column in header['columns']]
+
+    def restore(value):
+        if isinstance(value, dict):
+            if set(value) == {'$column'}:
+                return columns[value['$column']]
+            if '$matrix' in value:
+                return Matrix(value['$matrix'], restore(value['values']))
+            return {key: restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore(item) for item in value]
+        return value
+
+    return restore(header['meta'])
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
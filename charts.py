@@ -0,0 +1,220 @@
+"""Server-side rendering of the notebook's heavy charts.
+
+A chart is drawn in two steps. ``prepare_chart`` runs in the web process
+and reduces a snapshot to the few arrays the chart needs: a correlation
+(sub-)matrix from the correlation index, a point sample with a fitted
+line, or per-group box statistics. The work sent to a render process is
+therefore small however large the dataset is. ``render_chart`` runs in a
+process pool, so matplotlib's GIL-bound drawing never blocks request
+threads. It draws on a bare ``Figure`` (no pyplot state) and returns the
+encoded PNG or SVG bytes. matplotlib is imported on first use.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from sketches import box_plot_stats
+
+IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+TARGET = 'SalePrice'
+# The notebook's regression grid, less any feature the snapshot no longer has
+REGPLOT_FEATURES = ('OverallQual', 'GrLivArea', 'GarageArea', 'FullBath', 'YearBuilt',
+                    'WoodDeckSF')
+# Options per chart with their defaults; query values are parsed to the default's type
+CHART_OPTIONS = {
+    'heatmap': {'columns': (), 'vmax': 0.8},
+    'top-heatmap': {'k': 11, 'target': TARGET, 'vmax': 0.8},
+    'regplot': {'features': (), 'target': TARGET, 'max_points': 2000, 'ncols': 2},
+    'boxplot': {'by': 'OverallQual', 'target': TARGET, 'ymax': 800000.0, 'max_fliers': 500},
+}
+# Wider heatmaps are drawn without per-column tick labels
+MAX_LABELLED_COLUMNS = 80
+DPI = 100
+
+
+def _require(frame, columns, numeric=True):
+    missing = [col for col in columns if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}")
+    if numeric:
+        other = [col for col in columns if frame[col].dtype.kind not in 'biuf']
+        if other:
+            raise ValueError(f"Not numeric: {', '.join(other)}")
+
+
+def heatmap_data(frame, index, columns=(), vmax=0.8):
+    """Correlation matrix of ``columns`` (all numeric columns by default)"""
+    columns = list(columns) or index.columns
+    unknown = [col for col in columns if col not in index.positions]
+    if unknown:
+        raise ValueError(f"Unknown or non-numeric columns: {', '.join(unknown)}")
+    return {'columns': columns, 'matrix': index.matrix(columns), 'vmax': vmax,
+            'title': 'Correlation of Numeric Features with Sale Price'}
+
+
+def top_heatmap_data(frame, index, k=11, target=TARGET, vmax=0.8):
+    """Annotated correlation matrix of ``target`` and its ``k - 1`` strongest positive correlates"""
+    if target not in index.positions:
+        raise ValueError(f"Unknown or non-numeric column: {target}")
+    columns = [target] + [name for name, _ in index.top(target, max(k - 1, 0))]
+    return {'columns': columns, 'matrix': index.matrix(columns), 'vmax': vmax,
+            'annotate': True, 'cmap': 'viridis'}
+
+
+def regression_line(x, y, points=100):
+    """Least-squares line over the x range with its 95% confidence band"""
+    n = len(x)
+    grid = np.linspace(x.min(), x.max(), points) if n else np.zeros(0)
+    if n < 3 or np.ptp(x) == 0:
+        return {'x': grid, 'y': np.full(len(grid), y.mean() if n else np.nan), 'band': None}
+    x_mean = x.mean()
+    sxx = np.sum((x - x_mean) ** 2)
+    slope = np.sum((x - x_mean) * (y - y.mean())) / sxx
+    intercept = y.mean() - slope * x_mean
+    residual = np.sqrt(np.sum((y - intercept - slope * x) ** 2) / (n - 2))
+    fitted = intercept + slope * grid
+    band = 1.96 * residual * np.sqrt(1.0 / n + (grid - x_mean) ** 2 / sxx)
+    return {'x': grid, 'y': fitted, 'band': band}
+
+
+def regplot_data(frame, index, features=(), target=TARGET, max_points=2000, ncols=2):
+    """Per feature: a point sample and the line fitted to every row"""
+    features = list(features) or [col for col in REGPLOT_FEATURES if col in frame.columns]
+    _require(frame, features + [target])
+    y_all = frame[target].to_numpy(dtype=np.float64, na_value=np.nan)
+    panels = []
+    for feature in features:
+        x = frame[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~(np.isnan(x) | np.isnan(y_all))
+        x, y = x[valid], y_all[valid]
+        sample = np.arange(len(x))
+        if len(x) > max_points:
+            sample = np.sort(np.random.default_rng(0).choice(len(x), max_points, replace=False))
+        panels.append({'feature': feature, 'x': x[sample], 'y': y[sample],
+                       'rows': int(len(x)), 'line': regression_line(x, y)})
+    return {'panels': panels, 'target': target, 'ncols': max(int(ncols), 1)}
+
+
+def boxplot_data(frame, index, by='OverallQual', target=TARGET, ymax=800000.0, max_fliers=500):
+    """Box statistics of ``target`` per value of ``by`` (in category order for categoricals)"""
+    _require(frame, [by], numeric=False)
+    _require(frame, [target])
+    codes, labels = pd.factorize(frame[by], sort=True)
+    values = frame[target].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+    boxes = []
+    for g, label in enumerate(labels):
+        group = values[order[bounds[g]:bounds[g + 1]]]
+        if not len(group):
+            continue
+        stats = box_plot_stats(group)
+        fliers = group[(group < stats['whiskers']['lower']) | (group > stats['whiskers']['upper'])]
+        if len(fliers) > max_fliers:
+            fliers = np.sort(fliers)[np.linspace(0, len(fliers) - 1, max_fliers).astype(np.int64)]
+        boxes.append({'label': str(label), 'med': stats['q2'], 'q1': stats['q1'],
+                      'q3': stats['q3'], 'whislo': stats['whiskers']['lower'],
+                      'whishi': stats['whiskers']['upper'], 'fliers': fliers})
+    return {'boxes': boxes, 'by': by, 'target': target, 'ymax': ymax or None,
+            'rotate': isinstance(frame[by].dtype, pd.CategoricalDtype) or frame[by].dtype == object}
+
+
+PREPARE = {
+    'heatmap': heatmap_data,
+    'top-heatmap': top_heatmap_data,
+    'regplot': regplot_data,
+    'boxplot': boxplot_data,
+}
+
+
+def prepare_chart(chart, frame, index, **options):
+    """Reduce a frame (and its correlation index) to what ``render_chart`` draws"""
+    return PREPARE[chart](frame, index, **options)
+
+
+def _figure(figsize):
+    # savefig picks the canvas for the output format, so no pyplot or backend switch is needed
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize, dpi=DPI)
+
+
+def _draw_heatmap(data):
+    columns, matrix = data['columns'], data['matrix']
+    fig = _figure((14, 12))
+    ax = fig.add_subplot()
+    finite = matrix[np.isfinite(matrix)]
+    image = ax.imshow(matrix, cmap=data.get('cmap', 'magma'), vmax=data['vmax'],
+                      vmin=finite.min() if len(finite) else None, interpolation='nearest')
+    fig.colorbar(image, ax=ax)
+    if len(columns) <= MAX_LABELLED_COLUMNS:
+        size = 12 if data.get('annotate') else max(5, min(10, 600 // max(len(columns), 1)))
+        ax.set_xticks(range(len(columns)), columns, rotation=90, fontsize=size)
+        ax.set_yticks(range(len(columns)), columns, fontsize=size)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlabel(f"{len(columns)} columns")
+    if data.get('annotate'):
+        for i in range(len(columns)):
+            for j in range(len(columns)):
+                value = matrix[i, j]
+                if np.isfinite(value):
+                    ax.text(j, i, f"{value:.2f}", ha='center', va='center', fontsize=12,
+                            color='black' if value > 0.5 else 'white')
+    if data.get('title'):
+        ax.set_title(data['title'], size=16)
+    return fig
+
+
+def _draw_regplot(data):
+    panels, ncols = data['panels'], data['ncols']
+    nrows = max(-(-len(panels) // ncols), 1)
+    fig = _figure((7 * ncols, 10 * nrows / 3))
+    for position, panel in enumerate(panels, start=1):
+        ax = fig.add_subplot(nrows, ncols, position)
+        ax.scatter(panel['x'], panel['y'], s=12, alpha=0.8, color='C0')
+        line = panel['line']
+        ax.plot(line['x'], line['y'], color='C0')
+        if line['band'] is not None:
+            ax.fill_between(line['x'], line['y'] - line['band'], line['y'] + line['band'],
+                            color='C0', alpha=0.15)
+        ax.set_xlabel(panel['feature'])
+        ax.set_ylabel(data['target'])
+    fig.tight_layout()
+    return fig
+
+
+def _draw_boxplot(data):
+    boxes = data['boxes']
+    fig = _figure((16, 10) if data['rotate'] else (12, 8))
+    ax = fig.add_subplot()
+    if boxes:
+        ax.bxp(boxes, showfliers=True, patch_artist=True,
+               boxprops={'facecolor': 'C0', 'alpha': 0.6},
+               medianprops={'color': 'black'})
+    if data['ymax'] is not None:
+        ax.set_ylim(0, data['ymax'])
+    ax.set_xlabel(data['by'])
+    ax.set_ylabel(data['target'])
+    if data['rotate']:
+        ax.tick_params(axis='x', labelrotation=45)
+    return fig
+
+
+DRAW = {
+    'heatmap': _draw_heatmap,
+    'top-heatmap': _draw_heatmap,
+    'regplot': _draw_regplot,
+    'boxplot': _draw_boxplot,
+}
+
+
+def render_chart(chart, data, fmt='png'):
+    """Draw prepared chart data and return the encoded image (runs in a render process)"""
+    fig = DRAW[chart](data)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches='tight')
+    return buffer.getvalue()
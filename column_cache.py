@@ -0,0 +1,181 @@
+"""Binary columnar cache for CSV datasets.
+
+The first load of a CSV parses it once and writes every column as a typed
+``.npy`` file next to a ``schema.json`` sidecar. Later loads memory-map
+those files, so building the DataFrame does not copy or re-parse anything.
+Columns are stored at compact dtypes (``compact_dtypes.py``): narrow
+integers, float64 floats, and text dictionary-encoded as narrow codes
+plus the category list in the schema, coming back as pandas categoricals
+(ordered ones for ordinal scales such as the quality codes).
+
+The cache is keyed by the source path. It is rebuilt when the file size
+changes, and when the mtime changes and the SHA-256 of the content no
+longer matches (a touched but unchanged file keeps its cache).
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from compact_dtypes import compact_numeric, encode_categories
+
+CACHE_DIR = '.data_cache'
+FORMAT_VERSION = 3
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(path, cache_dir=CACHE_DIR):
+    """Directory holding the cached columns for a source file"""
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{key}")
+
+
+def read_schema(directory):
+    try:
+        with open(os.path.join(directory, 'schema.json'), encoding='utf-8') as handle:
+            schema = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if schema.get('format_version') != FORMAT_VERSION:
+        return None
+    return schema
+
+
+def _write_schema(directory, schema):
+    tmp_path = os.path.join(directory, 'schema.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(schema, handle, indent=1)
+    os.replace(tmp_path, os.path.join(directory, 'schema.json'))
+
+
+def validate_cache(path, schema, verify_hash=False):
+    """Check a cached schema against the source file.
+
+    Returns ``'hit'`` when the cache is current, ``'touched'`` when only the
+    mtime moved but the content hash still matches, and None when stale.
+    """
+    if schema is None:
+        return None
+    stat = os.stat(path)
+    source = schema['source']
+    if source['size'] != stat.st_size:
+        return None
+    if source['mtime_ns'] == stat.st_mtime_ns and not verify_hash:
+        return 'hit'
+    if file_sha256(path) != source['sha256']:
+        return None
+    return 'hit' if source['mtime_ns'] == stat.st_mtime_ns else 'touched'
+
+
+def write_columns(frame, directory, **schema_fields):
+    """Write a frame as typed column files plus a schema sidecar.
+
+    The directory is built under a temporary name and renamed into place,
+    so readers never see a half-written dataset.
+    """
+    tmp_dir = directory + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for position, name in enumerate(frame.columns):
+        series = frame[name]
+        file_name = f"{position}.npy"
+        entry = {'name': name, 'file': file_name}
+        if series.dtype.kind in 'biuf':
+            values = compact_numeric(series.to_numpy())
+            entry['kind'] = 'numeric'
+            entry['dtype'] = values.dtype.str
+        else:
+            values, categories, ordered = encode_categories(series)
+            entry['kind'] = 'category'
+            entry['dtype'] = values.dtype.str
+            entry['categories'] = categories
+            entry['ordered'] = ordered
+        np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(values))
+        columns.append(entry)
+
+    schema = dict(schema_fields, format_version=FORMAT_VERSION, rows=len(frame), columns=columns)
+    # Row labels matter downstream (e.g. correlation downdates), so keep non-default ones
+    if not frame.index.equals(pd.RangeIndex(len(frame))):
+        np.save(os.path.join(tmp_dir, 'index.npy'), frame.index.to_numpy())
+        schema['index'] = 'index.npy'
+    _write_schema(tmp_dir, schema)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+    return schema
+
+
+def write_cache(frame, path, directory):
+    """Write a frame parsed from ``path`` into the cache, recording the source identity"""
+    stat = os.stat(path)
+    return write_columns(frame, directory, source={
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(path),
+    })
+
+
+def map_cache(directory, schema):
+    """Build a DataFrame over memory-mapped column files without copying"""
+    columns = {}
+    for entry in schema['columns']:
+        values = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=entry['categories'],
+                                               ordered=entry.get('ordered', False))
+        columns[entry['name']] = values
+    index = None
+    if 'index' in schema:
+        index = pd.Index(np.load(os.path.join(directory, schema['index']), mmap_mode='r'))
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def load_csv(path, cache_dir=CACHE_DIR, verify_hash=False, **read_csv_kwargs):
+    """Load a CSV through the columnar cache.
+
+    Returns ``(frame, info)`` where ``info`` reports whether the cache was
+    hit, how long the load took and where the cache lives.
+    """
+    started = time.perf_counter()
+    directory = cache_path(path, cache_dir)
+    schema = read_schema(directory)
+    state = validate_cache(path, schema, verify_hash)
+
+    if state is not None:
+        if state == 'touched':
+            schema['source']['mtime_ns'] = os.stat(path).st_mtime_ns
+            _write_schema(directory, schema)
+        frame = map_cache(directory, schema)
+        cache_hit = True
+    else:
+        parsed = pd.read_csv(path, **read_csv_kwargs)
+        os.makedirs(cache_dir, exist_ok=True)
+        schema = write_cache(parsed, path, directory)
+        frame = map_cache(directory, schema)
+        cache_hit = False
+
+    return frame, {
+        'source': 'cache' if cache_hit else 'csv',
+        'path': path,
+        'cache_hit': cache_hit,
+        'cache_dir': directory,
+        'rows': schema['rows'],
+        'columns': len(schema['columns']),
+        'load_seconds': round(time.perf_counter() - started, 6),
+    }
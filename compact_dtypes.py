@@ -0,0 +1,166 @@
+"""Compact dtypes for loaded datasets, chosen without changing any value.
+
+``pd.read_csv`` gives every integer column int64, every float column
+float64 and every text column Python ``object`` strings. Each column is
+narrowed only as far as a lossless round trip allows:
+
+* integers take the narrowest signed width that holds their range
+* floats stay float64. Narrowing them to float32 would keep every value
+  but not every statistic: pandas and NumPy reductions accumulate a
+  float32 column in float32, so means and standard deviations drift
+* text becomes a categorical with the narrowest code width. Columns whose
+  values all belong to a known ordinal scale (Ex/Gd/TA/Fa/Po quality
+  codes, basement exposure, finish types, ...) become ordered
+  categoricals in scale order, so the codes are the ordinal encoding
+
+Reductions over the narrowed integer columns accumulate in int64 or
+float64, so statistics match the default dtypes exactly.
+"""
+import numpy as np
+import pandas as pd
+
+from binary_format import smallest_int_dtype
+
+# Ordinal scales from the Ames data dictionary, lowest first
+ORDINAL_SCALES = (
+    ('Po', 'Fa', 'TA', 'Gd', 'Ex'),
+    ('No', 'Mn', 'Av', 'Gd'),
+    ('Unf', 'LwQ', 'Rec', 'BLQ', 'ALQ', 'GLQ'),
+    ('Unf', 'RFn', 'Fin'),
+    ('Sal', 'Sev', 'Maj2', 'Maj1', 'Mod', 'Min2', 'Min1', 'Typ'),
+    ('MnWw', 'GdWo', 'MnPrv', 'GdPrv'),
+)
+
+
+def compact_numeric(values):
+    """Narrowest integer dtype copy of an integer array; floats are returned as they are"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.astype(smallest_int_dtype(values), copy=False)
+    return values
+
+
+def ordinal_scale(categories):
+    """The first known ordinal scale containing every category, or None"""
+    present = set(categories)
+    if not present:
+        return None
+    for scale in ORDINAL_SCALES:
+        if present <= set(scale):
+            return list(scale)
+    return None
+
+
+def encode_categories(series):
+    """``(codes, categories, ordered)`` for a text column, codes at the narrowest width"""
+    categorical = pd.Categorical(series.astype(object).where(series.notna(), None))
+    categories = [str(value) for value in categorical.categories]
+    scale = ordinal_scale(categories)
+    if scale is not None:
+        categorical = categorical.set_categories(scale, ordered=True)
+        categories = scale
+    codes = categorical.codes
+    width = smallest_int_dtype(np.array([-1, len(categories)]))
+    return codes.astype(width), categories, scale is not None
+
+
+def compact_series(series):
+    """A series with the compact dtype for its values"""
+    if series.dtype.kind in 'iuf':
+        return pd.Series(compact_numeric(series.to_numpy()), index=series.index, name=series.name)
+    if series.dtype.kind == 'b':
+        return series
+    codes, categories, ordered = encode_categories(series)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories, ordered=ordered),
+                     index=series.index, name=series.name)
+
+
+def compact_frame(frame):
+    """Copy of a frame with every column at its compact dtype"""
+    return pd.DataFrame({name: compact_series(frame[name]) for name in frame.columns},
+                        index=frame.index)
+
+
+def default_dtype(series):
+    """The dtype ``pd.read_csv`` would have given a compacted column"""
+    kind = series.dtype.kind
+    if kind in 'iu':
+        return np.dtype(np.int64)
+    if kind == 'f':
+        return np.dtype(np.float64)
+    if kind == 'b':
+        return series.dtype
+    return np.dtype(object)
+
+
+def memory_report(frame):
+    """Bytes per column at the compact dtypes and at the ``read_csv`` defaults"""
+    columns = []
+    for name in frame.columns:
+        series = frame[name]
+        dtype = default_dtype(series)
+        if dtype == object:
+            default_bytes = int(series.astype(object).memory_usage(index=False, deep=True))
+        else:
+            default_bytes = len(series) * dtype.itemsize
+        entry = {
+            'column': name,
+            'dtype': str(series.dtype),
+            'bytes': int(series.memory_usage(index=False, deep=True)),
+            'default_dtype': str(dtype),
+            'default_bytes': default_bytes
+        }
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry['categories'] = len(series.dtype.categories)
+            entry['ordered'] = bool(series.dtype.ordered)
+        columns.append(entry)
+    total = sum(entry['bytes'] for entry in columns)
+    default_total = sum(entry['default_bytes'] for entry in columns)
+    return {
+        'rows': len(frame),
+        'total_bytes': total,
+        'default_total_bytes': default_total,
+        'saved_bytes': default_total - total,
+        'ratio': round(total / default_total, 4) if default_total else None,
+        'columns': sorted(columns, key=lambda entry: entry['default_bytes'] - entry['bytes'],
+                          reverse=True)
+    }
+
+
+def append_rows(frame, rows):
+    """``frame`` with ``rows`` appended, every column kept at a compact dtype.
+
+    ``rows`` may lack columns (they are missing in the new rows). Text
+    values a categorical has not seen become new categories, except for
+    ordinal scales, where they are an error. Integer columns stay integer
+    unless a new value is missing or fractional.
+    """
+    columns = {}
+    for name in frame.columns:
+        old = frame[name]
+        new = rows[name] if name in rows.columns else pd.Series([None] * len(rows), dtype=object)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            new = new.astype(object).where(new.notna(), None)
+            known = set(old.cat.categories)
+            extra = sorted({str(value) for value in new.dropna()} - known)
+            if extra and old.dtype.ordered:
+                raise ValueError(f"Unknown {name} values: {', '.join(extra)}")
+            categories = list(old.cat.categories) + extra
+            added = pd.Categorical(new.map(lambda value: None if value is None else str(value)),
+                                   categories=categories).codes
+            codes = np.concatenate([old.cat.codes.to_numpy().astype(np.int64), added])
+            width = smallest_int_dtype(np.array([-1, len(categories)]))
+            columns[name] = pd.Categorical.from_codes(codes.astype(width), categories=categories,
+                                                      ordered=old.dtype.ordered)
+        elif old.dtype.kind in 'iuf':
+            added = pd.to_numeric(new, errors='raise').to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.concatenate([old.to_numpy(dtype=np.float64), added])
+            if old.dtype.kind in 'iu' and not np.isnan(added).any() \
+                    and np.array_equal(added, np.round(added)):
+                values = values.astype(np.int64)
+            columns[name] = compact_numeric(values)
+        else:
+            columns[name] = np.concatenate([old.to_numpy(dtype=object), new.to_numpy(dtype=object)])
+    start = int(frame.index.max()) + 1 if len(frame) else 0
+    index = frame.index.append(pd.RangeIndex(start, start + len(rows)))
+    return pd.DataFrame(columns, index=index)
@@ -0,0 +1,235 @@
+"""Pearson correlation from pairwise sufficient statistics.
+
+For every pair of columns (i, j) the engine keeps, over the rows where
+both values are present: the count, the sum and sum of squares of
+column i, and the cross-product sum. That is exactly what pandas'
+pairwise ``DataFrame.corr()`` needs, so rows can be appended or removed
+in O(k^2) each without rescanning the frame.
+
+Values are shifted by a fixed per-column reference (the mean of the
+first batch) before accumulating, which keeps the sums small and avoids
+cancellation in the variance terms. Correlation is shift invariant, so
+the result is unaffected.
+
+With a process pool, the row mask and shifted values are written to
+shared memory once per accumulation, and each block task carries only
+its column bounds.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from shared_arrays import SharedArrays, attach
+
+# Columns per block when the k x k products are split across workers
+DEFAULT_BLOCK_COLUMNS = 16
+
+
+def block_products(mask, shifted, start, stop):
+    """Products for output columns [start, stop): one independent block of the k x k stats"""
+    block_mask = mask[:, start:stop]
+    return (start, stop, mask.T @ block_mask, shifted.T @ block_mask,
+            (shifted * shifted).T @ block_mask, shifted.T @ shifted[:, start:stop])
+
+
+def shared_block_products(spec, start, stop):
+    """``block_products`` over a mask and shifted values in shared memory (runs in a pool worker)"""
+    blocks, arrays = attach(spec)
+    try:
+        return block_products(arrays['mask'], arrays['shifted'], start, stop)
+    finally:
+        # The views must go before their blocks can be closed
+        arrays.clear()
+        for block in blocks:
+            block.close()
+
+
+class CorrelationStats:
+    """Pairwise-complete sufficient statistics for a set of numeric columns"""
+
+    def __init__(self, columns, shift=None):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = np.zeros(k) if shift is None else np.asarray(shift, dtype=np.float64)
+        self.count = np.zeros((k, k))
+        self.sum = np.zeros((k, k))
+        self.sum_sq = np.zeros((k, k))
+        self.cross = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, frame, executor=None, block_columns=DEFAULT_BLOCK_COLUMNS):
+        """Accumulate statistics for every column of a numeric frame.
+
+        With an ``executor`` the k x k products are computed in column
+        blocks of ``block_columns`` on its workers.
+        """
+        values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=0)
+        totals = np.where(valid, values, 0.0).sum(axis=0)
+        shift = np.divide(totals, counts, out=np.zeros(values.shape[1]), where=counts > 0)
+        stats = cls(frame.columns, shift)
+        stats._accumulate(values, 1.0, executor, block_columns)
+        return stats
+
+    def copy(self):
+        other = CorrelationStats(self.columns, self.shift.copy())
+        other.count = self.count.copy()
+        other.sum = self.sum.copy()
+        other.sum_sq = self.sum_sq.copy()
+        other.cross = self.cross.copy()
+        return other
+
+    def _matrix(self, frame):
+        """Rows of ``frame`` as a float matrix in this engine's column order"""
+        return frame.reindex(columns=self.columns).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _accumulate(self, values, sign, executor=None, block_columns=DEFAULT_BLOCK_COLUMNS):
+        valid = ~np.isnan(values)
+        mask = valid.astype(np.float64)
+        shifted = np.where(valid, values - self.shift, 0.0)
+        k = values.shape[1]
+        bounds = [(start, min(start + block_columns, k)) for start in range(0, k, block_columns)]
+        if executor is None or k <= block_columns:
+            blocks = [block_products(mask, shifted, 0, k)]
+        elif isinstance(executor, ProcessPoolExecutor):
+            with SharedArrays({'mask': mask, 'shifted': shifted}) as shared:
+                futures = [executor.submit(shared_block_products, shared.spec, start, stop)
+                           for start, stop in bounds]
+                blocks = [future.result() for future in futures]
+        else:
+            futures = [executor.submit(block_products, mask, shifted, start, stop)
+                       for start, stop in bounds]
+            blocks = [future.result() for future in futures]
+        for start, stop, count, total, total_sq, cross in blocks:
+            self.count[:, start:stop] += sign * count
+            self.sum[:, start:stop] += sign * total
+            self.sum_sq[:, start:stop] += sign * total_sq
+            self.cross[:, start:stop] += sign * cross
+
+    def append(self, frame):
+        """Add rows (e.g. new sales) to the statistics"""
+        self._accumulate(self._matrix(frame), 1.0)
+        return self
+
+    def remove(self, frame):
+        """Remove rows that were previously added (e.g. IQR outliers)"""
+        self._accumulate(self._matrix(frame), -1.0)
+        return self
+
+    def subset(self, columns):
+        """Statistics restricted to a subset of the columns, without a rescan"""
+        positions = [self.columns.index(col) for col in columns]
+        grid = np.ix_(positions, positions)
+        other = CorrelationStats([self.columns[p] for p in positions], self.shift[positions])
+        other.count = self.count[grid].copy()
+        other.sum = self.sum[grid].copy()
+        other.sum_sq = self.sum_sq[grid].copy()
+        other.cross = self.cross[grid].copy()
+        return other
+
+    def matrix(self, min_periods=1):
+        """Pairwise Pearson correlation as a NumPy array"""
+        n = self.count
+        sx = self.sum
+        sy = self.sum.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * self.cross - sx * sy
+            var_x = n * self.sum_sq - sx * sx
+            var_y = n * self.sum_sq.T - sy * sy
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(n < max(min_periods, 2)) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return corr
+
+    def corr(self, min_periods=1):
+        """Pairwise Pearson correlation as a DataFrame, like ``DataFrame.corr()``"""
+        return pd.DataFrame(self.matrix(min_periods), index=self.columns, columns=self.columns)
+
+
+class CorrelationIndex:
+    """Query-ready correlation matrix: a float32 upper triangle plus sorted neighbour lists.
+
+    Row ``i`` of ``neighbours[order]`` lists every other column by
+    descending correlation with column ``i`` ('signed') or by descending
+    absolute correlation ('abs'); columns whose correlation is undefined
+    come last.
+    """
+
+    ORDERS = ('signed', 'abs')
+
+    def __init__(self, columns, matrix):
+        self.columns = list(columns)
+        self.positions = {col: i for i, col in enumerate(self.columns)}
+        k = len(self.columns)
+        matrix = np.asarray(matrix, dtype=np.float64)
+        self.diagonal = np.diagonal(matrix).astype(np.float32)
+        self.upper = matrix[np.triu_indices(k, 1)].astype(np.float32)
+
+        others = np.array([[j for j in range(k) if j != i] for i in range(k)],
+                          dtype=np.int32).reshape(k, max(k - 1, 0))
+        values = np.take_along_axis(matrix, others, axis=1) if k else matrix
+        self.neighbours = {}
+        for order in self.ORDERS:
+            keys = values if order == 'signed' else np.abs(values)
+            keys = np.where(np.isnan(keys), -np.inf, keys)
+            ranked = np.argsort(-keys, axis=1, kind='stable')
+            self.neighbours[order] = np.take_along_axis(others, ranked, axis=1)
+
+    @classmethod
+    def from_stats(cls, stats, min_periods=1):
+        return cls(stats.columns, stats.matrix(min_periods))
+
+    @property
+    def nbytes(self):
+        return (self.upper.nbytes + self.diagonal.nbytes
+                + sum(order.nbytes for order in self.neighbours.values()))
+
+    def _flat(self, rows, cols):
+        """Positions in ``upper`` of the (row, col) pairs, row != col"""
+        i, j = np.minimum(rows, cols), np.maximum(rows, cols)
+        k = len(self.columns)
+        return i * (2 * k - i - 1) // 2 + (j - i - 1)
+
+    def values(self, row, cols):
+        """Correlations of column position ``row`` with the column positions ``cols``"""
+        cols = np.asarray(cols, dtype=np.int64)
+        result = np.empty(len(cols), dtype=np.float64)
+        off = cols != row
+        result[off] = self.upper[self._flat(row, cols[off])]
+        result[~off] = self.diagonal[row]
+        return result
+
+    def top(self, target, k=None, min_abs=0.0, columns=None, order='signed'):
+        """Up to ``k`` (name, correlation) pairs for ``target`` from its neighbour list.
+
+        ``columns`` restricts the candidates and ``min_abs`` drops weaker
+        correlations; undefined correlations are never returned.
+        """
+        row = self.positions[target]
+        candidates = self.neighbours[order][row]
+        if columns is not None:
+            allowed = np.zeros(len(self.columns), dtype=bool)
+            allowed[[self.positions[col] for col in columns]] = True
+            candidates = candidates[allowed[candidates]]
+        values = self.values(row, candidates)
+        keep = ~np.isnan(values) & (np.abs(values) >= min_abs)
+        candidates, values = candidates[keep], values[keep]
+        if k is not None:
+            candidates, values = candidates[:k], values[:k]
+        return [(self.columns[j], float(value)) for j, value in zip(candidates, values)]
+
+    def matrix(self, columns=None):
+        """Dense (sub-)matrix for the given columns (all columns by default)"""
+        positions = np.array([self.positions[col] for col in (columns or self.columns)],
+                             dtype=np.int64)
+        rows, cols = np.meshgrid(positions, positions, indexing='ij')
+        result = np.empty(rows.shape, dtype=np.float64)
+        off = rows != cols
+        result[off] = self.upper[self._flat(rows[off], cols[off])]
+        on = np.flatnonzero(~off.ravel())
+        result.ravel()[on] = self.diagonal[rows.ravel()[on]]
+        return result
@@ -0,0 +1,183 @@
+"""Named datasets, each with its own pipeline, kept under a memory budget.
+
+A ``Dataset`` is one data file with the state that used to be global:
+its pipeline (snapshots and cached results), its load info and the
+analysis parameters in effect. The ``DatasetRegistry`` keeps datasets in
+least-recently-used order and measures the frames their pipelines hold.
+When the total goes over the budget, the least recently used datasets
+are spilled: their pipeline state is saved to a pickle (the warm-start
+format), and the memory is released. The next request for a spilled
+dataset restores that file, unless the data file has changed since.
+
+A first request loads a dataset under its load lock, so concurrent
+first requests share one read of the file.
+
+The dataset a request works on is a context variable, set for the
+request and carried onto pool threads with the rest of the context.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from pipeline import make_version, source_signature
+
+_current = contextvars.ContextVar('dataset', default=None)
+
+
+def use_dataset(dataset):
+    """Make ``dataset`` the current one; returns a token for ``release_dataset``"""
+    return _current.set(dataset)
+
+
+def release_dataset(token):
+    _current.reset(token)
+
+
+def active_dataset():
+    """The dataset set for this context, or None"""
+    return _current.get()
+
+
+class Dataset:
+    """One data file with its own pipeline, parameters in effect and load info"""
+
+    def __init__(self, name, path, pipeline, params, state_path, shared_store=None):
+        self.name = name
+        self.path = path
+        self.pipeline = pipeline
+        self.params = dict(params)
+        self.state_path = state_path
+        self.shared_store = shared_store
+        self.load_info = {}
+        self.load_lock = threading.Lock()
+        self.spilled = False
+        self.nbytes = 0
+        self.last_used = None
+
+    def source_version(self):
+        """Version of the load snapshot the current data file gives"""
+        return make_version('load', source_signature(self.path))
+
+    def save(self):
+        """Write the pipeline state, load info and parameters; returns the file size"""
+        return self.pipeline.save(self.state_path, load_info=self.load_info,
+                                  pipeline_params=self.params)
+
+    def restore(self):
+        """Adopt the saved pipeline state if it was built from the current data file"""
+        metadata = self.pipeline.restore(self.state_path)
+        if metadata is None:
+            return False
+        loaded = self.pipeline.snapshot('load')
+        # Appended sales give load snapshots whose lineage starts at the file's
+        if loaded is None or loaded.lineage()[0]['version'] != self.source_version():
+            # The data file changed since the state was saved
+            self.pipeline.clear()
+            return False
+        self.load_info.update(metadata['load_info'])
+        self.params.update(metadata['pipeline_params'])
+        return True
+
+    def spill(self):
+        """Save the pipeline state to disk and drop it from memory"""
+        with self.load_lock:
+            if self.pipeline.snapshot('load') is None:
+                return
+            self.save()
+            self.pipeline.clear()
+            self.spilled = True
+            self.nbytes = 0
+
+    def unspill(self):
+        """Bring a spilled dataset back (a changed data file is simply reloaded later)"""
+        with self.load_lock:
+            if self.spilled:
+                self.spilled = False
+                self.restore()
+
+    def info(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'loaded': self.pipeline.snapshot('load') is not None,
+            'spilled': self.spilled,
+            'bytes': self.nbytes,
+            'last_used': self.last_used,
+            'params': dict(self.params),
+        }
+
+
+class DatasetRegistry:
+    """Datasets by name, in least-recently-used order, under a total memory budget"""
+
+    def __init__(self, default, max_bytes):
+        self.default_name = default.name
+        self.max_bytes = max_bytes
+        self._datasets = OrderedDict([(default.name, default)])
+        self._lock = threading.Lock()
+        self.spills = 0
+
+    @property
+    def default(self):
+        return self._datasets[self.default_name]
+
+    def add(self, dataset):
+        with self._lock:
+            self._datasets[dataset.name] = dataset
+            self._datasets.move_to_end(dataset.name, last=False)
+
+    def get(self, name=None):
+        """Dataset by name (the default for None), or None when unknown"""
+        return self._datasets.get(name or self.default_name)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._datasets.values()))
+
+    def touch(self, dataset):
+        """Mark a dataset most recently used, restoring it if it was spilled"""
+        with self._lock:
+            self._datasets.move_to_end(dataset.name)
+        dataset.last_used = time.time()
+        if dataset.spilled:
+            dataset.unspill()
+            self.enforce_budget(keep=dataset)
+
+    def enforce_budget(self, keep=None):
+        """Spill least recently used datasets (never ``keep``) until the frames fit the budget"""
+        with self._lock:
+            datasets = list(self._datasets.values())
+        for dataset in datasets:
+            dataset.nbytes = 0 if dataset.spilled else dataset.pipeline.frame_bytes()
+        total = sum(dataset.nbytes for dataset in datasets)
+        for dataset in datasets:
+            if total <= self.max_bytes:
+                break
+            if dataset is keep or not dataset.nbytes:
+                continue
+            total -= dataset.nbytes
+            dataset.spill()
+            self.spills += 1
+        return total
+
+    def stats(self):
+        datasets = list(self)
+        return {
+            'datasets': len(datasets),
+            'loaded': sum(dataset.nbytes > 0 for dataset in datasets),
+            'bytes': sum(dataset.nbytes for dataset in datasets),
+            'max_bytes': self.max_bytes,
+            'spills': self.spills,
+        }
+
+
+def parse_datasets(value):
+    """``{name: path}`` from ``name=path;name=path`` (DATASETS)"""
+    datasets = {}
+    for entry in (value or '').split(';'):
+        name, separator, path = entry.partition('=')
+        if separator and name.strip() and path.strip():
+            datasets[name.strip()] = os.path.expanduser(path.strip())
+    return datasets
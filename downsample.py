@@ -0,0 +1,108 @@
+"""Level-of-detail reductions for the scatter and distribution endpoints.
+
+Large point sets are replaced by two things the browser can draw quickly:
+
+* binned counts (a ``resolution`` x ``resolution`` grid for scatter plots,
+  the histogram for prices) that preserve the density exactly, and
+* a stratified sample of at most ``max_points`` points, drawn
+  proportionally from each bin and always including the extremes.
+"""
+import numpy as np
+
+DEFAULT_MAX_POINTS = 5000
+DEFAULT_RESOLUTION = 64
+# Payloads with more points than this are reduced even without ?max_points=
+AUTO_THRESHOLD = 50_000
+
+
+def bin_index(values, edges):
+    """Bin number of each value for the given edges (last bin closed, like np.histogram)"""
+    index = np.searchsorted(edges, values, side='right') - 1
+    return np.clip(index, 0, len(edges) - 2)
+
+
+def extreme_indices(*columns):
+    """Positions of the minimum and maximum of each column"""
+    picks = set()
+    for values in columns:
+        if len(values):
+            picks.update((int(np.argmin(values)), int(np.argmax(values))))
+    return np.array(sorted(picks), dtype=np.int64)
+
+
+def stratified_sample(bins, max_points, keep=(), seed=0):
+    """Indices of a sample drawn proportionally from each bin.
+
+    ``keep`` indices are always included. The remaining budget is split
+    by bin size; bins too small for a proportional share get one point
+    each, largest first, while the budget lasts.
+    """
+    n = len(bins)
+    keep = np.unique(np.asarray(keep, dtype=np.int64))
+    if n <= max_points:
+        return np.arange(n)
+    budget = max(max_points - len(keep), 0)
+
+    rng = np.random.default_rng(seed)
+    # Sorting bin + U(0, 1) groups rows by bin in a random order within each bin
+    order = np.argsort(bins + rng.random(n))
+    sorted_bins = bins[order]
+    _, starts, counts = np.unique(sorted_bins, return_index=True, return_counts=True)
+
+    quota = np.floor(counts * budget / n).astype(np.int64)
+    spare = budget - int(quota.sum())
+    if spare > 0:
+        empty = np.flatnonzero(quota == 0)
+        quota[empty[np.argsort(-counts[empty], kind='stable')[:spare]]] = 1
+
+    rank = np.arange(n) - np.repeat(starts, counts)
+    chosen = order[rank < np.repeat(quota, counts)]
+    return np.union1d(chosen, keep)
+
+
+def reduce_scatter(x, y, max_points=DEFAULT_MAX_POINTS, resolution=DEFAULT_RESOLUTION, seed=0):
+    """Binned 2D counts plus a stratified sample of (x, y)"""
+    x_edges = np.histogram_bin_edges(x, bins=resolution)
+    y_edges = np.histogram_bin_edges(y, bins=resolution)
+    cells = bin_index(x, x_edges) * resolution + bin_index(y, y_edges)
+
+    counts = np.bincount(cells, minlength=resolution * resolution)
+    occupied = np.flatnonzero(counts)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    sample = stratified_sample(cells, max_points, extreme_indices(x, y), seed)
+    return {
+        'x_data': x[sample],
+        'y_data': y[sample],
+        'total_points': int(len(x)),
+        'downsampled': bool(len(sample) < len(x)),
+        'bins': {
+            'resolution': resolution,
+            'x_edges': x_edges,
+            'y_edges': y_edges,
+            'x': x_centers[occupied // resolution],
+            'y': y_centers[occupied % resolution],
+            'counts': counts[occupied]
+        }
+    }
+
+
+def reduce_values(values, bin_edges, max_points=DEFAULT_MAX_POINTS, seed=0):
+    """Stratified sample of a 1D array using existing histogram edges"""
+    sample = stratified_sample(bin_index(values, bin_edges), max_points,
+                               extreme_indices(values), seed)
+    return values[sample]
+
+
+def scatter_lod(data, target='SalePrice', max_points=DEFAULT_MAX_POINTS,
+                resolution=DEFAULT_RESOLUTION):
+    """Precompute the scatter reduction against ``target`` for every numeric feature"""
+    numeric = data.select_dtypes(include=[np.number])
+    y_all = numeric[target].to_numpy(dtype=np.float64, na_value=np.nan)
+    lod = {}
+    for feature in numeric.columns:
+        x = numeric[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask = ~(np.isnan(x) | np.isnan(y_all))
+        lod[feature] = reduce_scatter(x[mask], y_all[mask], max_points, resolution)
+    return lod
@@ -0,0 +1,154 @@
+"""Data-driven feature selection for the feature engineering stage.
+
+Every column is scored in one vectorised pass: its missing-value ratio,
+its correlation with the target (from one set of pairwise correlation
+statistics) and, for the numeric survivors, its variance inflation
+factor. Columns are removed for one of three reasons, matching the
+breakdown the dashboard shows:
+
+* ``high_missing``: more than ``max_missing`` of the values are missing
+* ``low_correlation``: numeric, with ``|r| < min_target_corr`` to the target
+* ``multicollinear``: part of a pair with ``|r| >= max_pair_corr`` and the
+  member with the weaker target correlation, or left with a VIF above
+  ``max_vif``
+
+The VIF elimination inverts the correlation matrix once and updates
+the inverse with a rank-one downdate after each removal, so thousands
+of columns cost O(k^2) per removed column rather than O(k^3) per step.
+A downdate divides by the removed column's VIF, and when that VIF is
+huge (a near-exact linear combination, such as GrLivArea in Ames) the
+updated inverse is dominated by rounding error. Removing such a column
+therefore re-inverts the remaining submatrix instead.
+"""
+import numpy as np
+
+from correlation import CorrelationStats
+
+TARGET = 'SalePrice'
+DEFAULT_THRESHOLDS = {
+    'max_missing': 0.2,
+    'min_target_corr': 0.4,
+    'max_pair_corr': 0.8,
+    'max_vif': 10.0
+}
+CATEGORIES = ('multicollinear', 'high_missing', 'low_correlation')
+# Keeps the inverse finite when columns are exactly collinear
+RIDGE = 1e-9
+# Removing a column with a larger VIF re-inverts instead of downdating
+REINVERT_VIF = 1e6
+
+
+def drop_from_inverse(inverse, position, active):
+    """Remove ``position`` from an inverse in place (rank-one downdate over ``active``)"""
+    column = inverse[:, position] * active
+    inverse -= np.outer(column, column / inverse[position, position])
+    inverse[position, :] = 0.0
+    inverse[:, position] = 0.0
+    active[position] = False
+
+
+def invert_active(corr, active):
+    """Inverse of the ``active`` submatrix (ridged), in place in a k x k matrix of zeros"""
+    positions = np.flatnonzero(active)
+    grid = np.ix_(positions, positions)
+    sub = corr[grid] + RIDGE * np.eye(len(positions))
+    try:
+        inner = np.linalg.inv(sub)
+    except np.linalg.LinAlgError:
+        inner = np.linalg.pinv(sub)
+    inverse = np.zeros(corr.shape)
+    inverse[grid] = inner
+    return inverse
+
+
+def eliminate_by_vif(corr, max_vif):
+    """Positions to drop, highest VIF first, until every remaining VIF is <= ``max_vif``.
+
+    Returns the dropped positions and the final VIF of every position
+    (the VIF at the moment of removal for dropped ones).
+    """
+    k = len(corr)
+    if k < 2:
+        return [], np.ones(k)
+    active = np.ones(k, dtype=bool)
+    inverse = invert_active(corr, active)
+    vif = np.diagonal(inverse).copy()
+    dropped = []
+    while active.sum() > 1:
+        current = np.where(active, np.diagonal(inverse), -np.inf)
+        worst = int(np.argmax(current))
+        vif[active] = current[active]
+        if current[worst] <= max_vif:
+            break
+        dropped.append(worst)
+        if current[worst] > REINVERT_VIF:
+            active[worst] = False
+            inverse = invert_active(corr, active)
+        else:
+            drop_from_inverse(inverse, worst, active)
+    if active.sum() == 1:
+        vif[active] = 1.0
+    return dropped, vif
+
+
+def select_features(data, target=TARGET, stats=None, **thresholds):
+    """Decide which columns to remove and why.
+
+    ``stats`` may be precomputed ``CorrelationStats`` for the numeric
+    columns of ``data``. Returns ``(categories, scores)``: the removed
+    columns per reason, and per-column missing ratio, target correlation
+    and VIF.
+    """
+    limits = dict(DEFAULT_THRESHOLDS, **{key: value for key, value in thresholds.items()
+                                         if value is not None})
+    columns = [col for col in data.columns if col != target]
+    categories = {category: [] for category in CATEGORIES}
+
+    missing_ratio = data[columns].isna().to_numpy().mean(axis=0) if len(data) else \
+        np.zeros(len(columns))
+    missing = dict(zip(columns, missing_ratio.tolist()))
+    categories['high_missing'] = [col for col in columns if missing[col] > limits['max_missing']]
+
+    if stats is None:
+        stats = CorrelationStats.from_frame(data.select_dtypes(include=[np.number]))
+    numeric = [col for col in stats.columns
+               if col != target and col in missing and missing[col] <= limits['max_missing']]
+    target_corr = {}
+    if target in stats.columns and numeric:
+        sub = stats.subset(numeric + [target])
+        matrix = np.nan_to_num(sub.matrix(), nan=0.0)
+        target_r = matrix[:-1, -1]
+        target_corr = dict(zip(numeric, np.round(target_r, 6).tolist()))
+        weak = np.abs(target_r) < limits['min_target_corr']
+        categories['low_correlation'] = [col for col, flag in zip(numeric, weak) if flag]
+
+        # Strongly correlated pairs: drop the member less correlated with the target
+        strong = np.flatnonzero(~weak)
+        pairwise = np.abs(matrix[np.ix_(strong, strong)])
+        rows, cols = np.nonzero(np.triu(pairwise >= limits['max_pair_corr'], k=1))
+        removed = set()
+        for p in np.argsort(-pairwise[rows, cols], kind='stable'):
+            i, j = strong[rows[p]], strong[cols[p]]
+            if i in removed or j in removed:
+                continue
+            removed.add(i if abs(target_r[i]) < abs(target_r[j]) else j)
+
+        survivors = np.array([i for i in strong if i not in removed], dtype=np.int64)
+        vif_dropped, vif = eliminate_by_vif(matrix[np.ix_(survivors, survivors)],
+                                            limits['max_vif'])
+        removed.update(int(survivors[p]) for p in vif_dropped)
+        categories['multicollinear'] = [numeric[i] for i in sorted(removed)]
+        vif_by_column = {numeric[i]: round(float(value), 4) for i, value in zip(survivors, vif)}
+    else:
+        vif_by_column = {}
+
+    scores = {col: {'missing_ratio': round(missing[col], 6),
+                    'target_correlation': target_corr.get(col),
+                    'vif': vif_by_column.get(col)}
+              for col in columns}
+    return categories, scores
+
+
+def removed_columns(categories):
+    """Flat list of removed columns, in category order"""
+    return [col for category in CATEGORIES for col in categories.get(category, [])]
@@ -0,0 +1,287 @@
+"""Cross-filters: row selections resolved from per-column indexes.
+
+A filter is a list of clauses that must all hold, given in the query
+string as repeated ``?filter=`` values or separated by ``;``::
+
+    ?filter=YearBuilt:1990..2005&filter=Neighborhood=NAmes,CollgCr&filter=OverallQual>=7
+
+Clauses are ``col:lo..hi`` (inclusive, either bound may be left out),
+``col>=v``, ``col>v``, ``col<=v``, ``col<v``, ``col=a,b`` (any of the
+values) and ``col!=a,b`` (none of them). ``null`` as a value stands for
+a missing value. Ranges work on numeric columns and on ordered
+categoricals (``KitchenQual>=Gd``).
+
+No clause scans the frame. Each column gets an index, built once per
+snapshot: a numeric column keeps its row numbers sorted by value, so a
+range is two binary searches and a slice; a categorical column keeps
+one packed row bitmap per category, so a membership test is an OR of
+bitmaps. Every clause resolves to a row bitmap (uint64 words, bit ``r``
+set for row ``r``, as in ``null_masks``), and the clauses are combined
+with AND. Clause bitmaps and whole selections are kept in a
+byte-bounded LRU, so changing one clause of a cross-filter reuses the
+bitmaps of the others.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from null_masks import WORD_BITS, pack_columns
+
+CLAUSE = re.compile(r'^\s*([^<>=!:;]+?)\s*(>=|<=|!=|=|>|<|:)\s*(.*?)\s*$')
+NULL = 'null'
+# Categories packed per comparison while building a categorical index
+BUILD_CATEGORIES = 64
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class FilterError(ValueError):
+    """A filter that cannot be parsed or does not fit the data"""
+
+
+def parse_filter(values):
+    """Normalised clauses ``(column, op, operands)`` from ``?filter=`` values.
+
+    ``op`` is ``range`` with operands ``(lo, hi, include_lo, include_hi)``
+    or ``in`` / ``not_in`` with a sorted tuple of values. Operands stay
+    strings until the clause meets its column.
+    """
+    clauses = set()
+    for value in values:
+        for text in value.split(';'):
+            if not text.strip():
+                continue
+            match = CLAUSE.match(text)
+            if match is None or not match.group(3):
+                raise FilterError(f"Cannot parse filter clause {text!r}")
+            column, op, operand = match.groups()
+            if op == ':':
+                lo, separator, hi = operand.partition('..')
+                if not separator:
+                    raise FilterError(f"Range {text!r} must look like col:lo..hi")
+                clauses.add((column, 'range', (lo.strip() or None, hi.strip() or None, True, True)))
+            elif op in ('>=', '>'):
+                clauses.add((column, 'range', (operand, None, op == '>=', True)))
+            elif op in ('<=', '<'):
+                clauses.add((column, 'range', (None, operand, True, op == '<=')))
+            else:
+                members = tuple(sorted({item.strip() for item in operand.split(',') if item.strip()}))
+                clauses.add((column, 'in' if op == '=' else 'not_in', members))
+    return tuple(sorted(clauses, key=repr))
+
+
+def describe(clauses):
+    """Canonical text of parsed clauses (equal filters give equal text)"""
+    parts = []
+    for column, op, operands in clauses:
+        if op == 'range':
+            lo, hi, include_lo, include_hi = operands
+            if lo is not None and hi is not None and include_lo and include_hi:
+                parts.append(f"{column}:{lo}..{hi}")
+                continue
+            if lo is not None:
+                parts.append(f"{column}{'>=' if include_lo else '>'}{lo}")
+            if hi is not None:
+                parts.append(f"{column}{'<=' if include_hi else '<'}{hi}")
+        else:
+            parts.append(f"{column}{'=' if op == 'in' else '!='}{','.join(operands)}")
+    return ';'.join(parts)
+
+
+def word_count(rows):
+    return -(-rows // WORD_BITS)
+
+
+def rows_to_bits(rows, n):
+    """Row bitmap with the given row numbers set"""
+    mask = np.zeros(n, dtype=bool)
+    mask[rows] = True
+    return pack_columns(mask[:, None])[0]
+
+
+def bits_to_rows(bits, n):
+    """Row numbers whose bit is set, ascending"""
+    return np.flatnonzero(np.unpackbits(bits.view(np.uint8), count=n, bitorder='little'))
+
+
+def all_rows(n):
+    """Row bitmap with every one of ``n`` rows set (padding bits clear)"""
+    bits = np.full(word_count(n), np.iinfo(np.uint64).max, dtype=np.uint64)
+    if n % WORD_BITS:
+        bits[-1] = np.uint64((1 << (n % WORD_BITS)) - 1)
+    return bits
+
+
+class SortedIndex:
+    """Row numbers of a numeric column sorted by value (missing values last)"""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.rows = len(values)
+        self.order = np.argsort(values, kind='stable')
+        self.valid = int(np.count_nonzero(~np.isnan(values)))
+        self.values = values[self.order[:self.valid]]
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + self.values.nbytes
+
+    def _number(self, column, text):
+        try:
+            return float(text)
+        except ValueError:
+            raise FilterError(f"{column} is numeric; {text!r} is not a number") from None
+
+    def select(self, column, op, operands):
+        if op == 'range':
+            lo, hi, include_lo, include_hi = operands
+            start = 0 if lo is None else np.searchsorted(
+                self.values, self._number(column, lo), side='left' if include_lo else 'right')
+            stop = self.valid if hi is None else np.searchsorted(
+                self.values, self._number(column, hi), side='right' if include_hi else 'left')
+            return rows_to_bits(self.order[start:max(start, stop)], self.rows)
+        slices = []
+        for operand in operands:
+            if operand == NULL:
+                slices.append(self.order[self.valid:])
+                continue
+            value = self._number(column, operand)
+            slices.append(self.order[np.searchsorted(self.values, value, side='left'):
+                                     np.searchsorted(self.values, value, side='right')])
+        bits = rows_to_bits(np.concatenate(slices) if slices else np.zeros(0, np.int64), self.rows)
+        return bits if op == 'in' else ~bits & all_rows(self.rows)
+
+
+class CategoryIndex:
+    """One packed row bitmap per category of a text or categorical column"""
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            categories = [str(value) for value in series.cat.categories]
+            self.ordered = bool(series.dtype.ordered)
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            categories = [str(value) for value in uniques]
+            self.ordered = False
+        self.rows = len(codes)
+        self.categories = categories
+        self.positions = {name: i for i, name in enumerate(categories)}
+        self.bits = np.zeros((len(categories), word_count(self.rows)), dtype=np.uint64)
+        for start in range(0, len(categories), BUILD_CATEGORIES):
+            stop = min(start + BUILD_CATEGORIES, len(categories))
+            self.bits[start:stop] = pack_columns(codes[:, None] == np.arange(start, stop))
+        self.missing = pack_columns((codes < 0)[:, None])[0]
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes + self.missing.nbytes
+
+    def _position(self, column, name):
+        if name not in self.positions:
+            raise FilterError(f"Unknown value {name!r} for {column}")
+        return self.positions[name]
+
+    def select(self, column, op, operands):
+        if op == 'range':
+            if not self.ordered:
+                raise FilterError(f"{column} is not numeric or ordinal; use {column}=a,b")
+            lo, hi, include_lo, include_hi = operands
+            start = 0 if lo is None else self._position(column, lo) + (not include_lo)
+            stop = len(self.categories) if hi is None else self._position(column, hi) + include_hi
+            if stop <= start:
+                return np.zeros(word_count(self.rows), dtype=np.uint64)
+            return np.bitwise_or.reduce(self.bits[start:stop], axis=0)
+        bits = np.zeros(word_count(self.rows), dtype=np.uint64)
+        for operand in operands:
+            bits |= self.missing if operand == NULL else self.bits[self._position(column, operand)]
+        return bits if op == 'in' else ~bits & all_rows(self.rows)
+
+
+def column_index(series):
+    """Index suited to a column: sorted values for numbers, bitmaps for categories"""
+    if series.dtype.kind in 'biuf':
+        return SortedIndex(series.to_numpy(dtype=np.float64, na_value=np.nan))
+    return CategoryIndex(series)
+
+
+class Selection:
+    """Rows chosen by a filter: the row bitmap and the row numbers"""
+
+    def __init__(self, bits, rows):
+        self.bits = bits
+        self.total = rows
+        self.positions = bits_to_rows(bits, rows)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes + self.positions.nbytes
+
+
+def resolve(clauses, frame, get_index, bitmap=None):
+    """Selection of the frame's rows matching every clause.
+
+    ``get_index(column)`` returns the column's (cached) index and
+    ``bitmap(clause, compute)`` may return a cached clause bitmap.
+    """
+    bits = all_rows(len(frame))
+    for clause in clauses:
+        column, op, operands = clause
+        if column not in frame.columns:
+            raise FilterError(f"Unknown filter column {column}")
+        def compute(column=column, op=op, operands=operands):
+            return get_index(column).select(column, op, operands)
+
+        bits = bits & (compute() if bitmap is None else bitmap(clause, compute))
+    return Selection(bits, len(frame))
+
+
+class FilterCache:
+    """LRU of clause bitmaps and filtered results, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute, size):
+        """Cached value for ``key``, or ``compute()`` stored with ``size(value)`` bytes"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        nbytes = size(value)
+        if nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,175 @@
+"""Per-group statistics from precomputed group indexes.
+
+A ``GroupIndex`` is built once per (snapshot, column). It holds the
+dictionary code of every row, the rows sorted by group and the offset
+of each group's segment in that order. For a value column,
+``sorted_segments`` sorts each segment's non-missing values once (a
+value sort, then a stable radix sort on the narrow group codes), and ``segment_stats`` then answers any mix of
+statistics with vectorised segment operations (``np.add.reduceat``,
+gathers at computed positions). No step loops over the groups in
+Python, so hundreds of thousands of rows and hundreds of groups take
+milliseconds.
+
+Quantiles use linear interpolation like ``np.percentile``. Whiskers and
+outliers follow ``sketches.box_plot_stats``: 1.5 IQR bounds, with each
+whisker at the most extreme value inside its bound.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from binary_format import smallest_int_dtype
+
+STATS = ('count', 'sum', 'mean', 'std', 'min', 'max', 'median', 'q1', 'q3', 'iqr',
+         'whisker_low', 'whisker_high', 'outliers')
+DEFAULT_STATS = ('count', 'median', 'q1', 'q3')
+QUANTILES = {'median': 0.5, 'q1': 0.25, 'q3': 0.75}
+PERCENTILE = re.compile(r'^p(\d+(?:\.\d+)?)$')
+WHISKER = 1.5
+
+
+class GroupIndex:
+    """Rows grouped by one column: codes, rows in group order and segment offsets"""
+
+    def __init__(self, codes, labels):
+        codes = np.asarray(codes, dtype=np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        if len(counts) and not counts.all():
+            # Drop groups with no rows (unused categories) and renumber the rest
+            used = counts > 0
+            remap = np.where(used, np.cumsum(used) - 1, -1)
+            codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+            labels = [label for label, keep in zip(labels, used) if keep]
+            counts = counts[used]
+        self.codes = codes
+        self.labels = list(labels)
+        self.missing = int(np.count_nonzero(codes < 0))
+        self.order = np.argsort(codes, kind='stable')[self.missing:]
+        self.counts = counts
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    @classmethod
+    def from_series(cls, series):
+        """Group index of a column; categoricals keep their category (ordinal) order"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return cls(series.cat.codes.to_numpy(), series.cat.categories.tolist())
+        codes, labels = pd.factorize(series, sort=True)
+        return cls(codes, pd.Index(labels).tolist())
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.order.nbytes + self.offsets.nbytes
+
+    def sorted_segments(self, values):
+        """``(sorted values, offsets)``: each group's non-missing values, ascending"""
+        values = np.asarray(values, dtype=np.float64)[self.order]
+        segment = np.repeat(np.arange(len(self.labels)), self.counts)
+        keep = ~np.isnan(values)
+        values, segment = values[keep], segment[keep]
+        # Sort by value, then stably by group: a radix sort for narrow group codes
+        by_value = np.argsort(values)
+        width = smallest_int_dtype(np.array([0, len(self.labels)]))
+        by_group = np.argsort(segment[by_value].astype(width), kind='stable')
+        valid = np.bincount(segment, minlength=len(self.labels))
+        return values[by_value][by_group], np.concatenate([[0], np.cumsum(valid)]).astype(np.int64)
+
+
+def parse_stats(names):
+    """Validate statistic names (``STATS`` plus percentiles such as ``p90``)"""
+    names = list(names) or list(DEFAULT_STATS)
+    for name in names:
+        match = PERCENTILE.match(name)
+        if name not in STATS and not (match and 0 <= float(match.group(1)) <= 100):
+            raise ValueError(f"Unknown statistic {name}; use {', '.join(STATS)} or pNN")
+    return names
+
+
+def segment_quantile(values, offsets, q):
+    """Linearly interpolated quantile ``q`` of every sorted segment (NaN when empty)"""
+    starts, counts = offsets[:-1], np.diff(offsets)
+    result = np.full(len(counts), np.nan)
+    present = counts > 0
+    position = starts[present] + q * (counts[present] - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, offsets[1:][present] - 1)
+    fraction = position - low
+    result[present] = values[low] + (values[high] - values[low]) * fraction
+    return result
+
+
+def _reduce(ufunc, values, offsets, fill):
+    """``ufunc`` over every segment; empty segments get ``fill``"""
+    counts = np.diff(offsets)
+    result = np.full(len(counts), fill, dtype=np.float64)
+    present = counts > 0
+    if present.any():
+        result[present] = ufunc.reduceat(values, offsets[:-1][present])
+    return result
+
+
+def segment_stats(values, offsets, stats=DEFAULT_STATS):
+    """Requested statistics of every sorted segment, as arrays keyed by name.
+
+    Undefined statistics are NaN (null in JSON): the std of a one-row
+    segment, and min, max and quantiles of an empty one.
+    """
+    counts = np.diff(offsets)
+    per_row = np.repeat(np.arange(len(counts)), counts)
+    cache = {}
+
+    def quantile(name, q):
+        if name not in cache:
+            cache[name] = segment_quantile(values, offsets, q)
+        return cache[name]
+
+    def sums():
+        if 'sum' not in cache:
+            cache['sum'] = _reduce(np.add, values, offsets, 0.0)
+        return cache['sum']
+
+    def bounds():
+        q1, q3 = quantile('q1', 0.25), quantile('q3', 0.75)
+        return q1 - WHISKER * (q3 - q1), q3 + WHISKER * (q3 - q1)
+
+    result = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name in stats:
+            if name == 'count':
+                result[name] = counts.copy()
+            elif name == 'sum':
+                result[name] = sums()
+            elif name == 'mean':
+                result[name] = sums() / counts
+            elif name == 'std':
+                deviation = values - (sums() / counts)[per_row]
+                squares = _reduce(np.add, deviation * deviation, offsets, 0.0)
+                result[name] = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+            elif name == 'min':
+                result[name] = _reduce(np.minimum, values, offsets, np.nan)
+            elif name == 'max':
+                result[name] = _reduce(np.maximum, values, offsets, np.nan)
+            elif name in QUANTILES:
+                result[name] = quantile(name, QUANTILES[name])
+            elif name == 'iqr':
+                result[name] = quantile('q3', 0.75) - quantile('q1', 0.25)
+            elif name in ('whisker_low', 'whisker_high', 'outliers'):
+                lower, upper = bounds()
+                low, high = lower[per_row], upper[per_row]
+                if name == 'whisker_low':
+                    result[name] = _reduce(np.minimum, np.where(values >= low, values, np.inf),
+                                           offsets, np.nan)
+                elif name == 'whisker_high':
+                    result[name] = _reduce(np.maximum, np.where(values <= high, values, -np.inf),
+                                           offsets, np.nan)
+                else:
+                    outside = ((values < low) | (values > high)).astype(np.int64)
+                    result[name] = np.bincount(per_row, weights=outside,
+                                               minlength=len(counts)).astype(np.int64)
+            else:
+                q = float(PERCENTILE.match(name).group(1)) / 100
+                result[name] = quantile(name, q)
+    return result
@@ -0,0 +1,143 @@
+"""Dataset-version-aware HTTP caching for the read endpoints.
+
+Each response gets a strong ETag derived from the dataset version it was
+computed from plus everything that shapes the body (path, query string,
+negotiated format). A matching ``If-None-Match`` is answered with 304
+before any work is done, and rendered bodies are kept in a byte-bounded
+LRU under the same key. A new dataset version means a new key, so stale
+entries are never served; they simply age out of the LRU.
+
+``DiskCache`` is the same idea for bodies that are expensive to rebuild
+(rendered chart images): one file per key in a directory, bounded by
+total size and evicted least recently used first. It survives restarts
+and is shared by worker processes using the same directory.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_etag(*parts):
+    """Strong entity tag (unquoted) for the given key parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """LRU of rendered response bodies, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype, headers=None):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[key] = (body, mimetype, dict(headers or {}))
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+class DiskCache:
+    """Directory of cached bodies, one file per key, bounded by total size (LRU by mtime)"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        try:
+            files = [entry for entry in os.scandir(directory)
+                     if entry.is_file() and not entry.name.endswith('.tmp')]
+        except OSError:
+            files = []
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime_ns):
+            self._entries[entry.name] = entry.stat().st_size
+            self.size += entry.stat().st_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as handle:
+                body = handle.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                if key in self._entries:
+                    self.size -= self._entries.pop(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            if key not in self._entries:
+                # Written by another process sharing the directory
+                self._entries[key] = len(body)
+                self.size += len(body)
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            handle.write(body)
+        os.replace(tmp_path, self._path(key))
+        evicted = []
+        with self._lock:
+            self.size += len(body) - self._entries.pop(key, 0)
+            self._entries[key] = len(body)
+            while self.size > self.max_bytes:
+                old_key, old_size = self._entries.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
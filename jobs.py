@@ -0,0 +1,154 @@
+"""Background jobs for long pipeline runs.
+
+``JobStore.submit`` returns a ``Job`` straight away and runs the work on
+an executor. The work reports per-stage progress on the job. Clients
+either poll ``Job.to_dict`` or follow ``Job.events`` as Server-Sent
+Events. Jobs are keyed by their inputs, so resubmitting an identical
+run returns the in-flight or finished job rather than starting another.
+Finished jobs are kept in a bounded LRU. Failed jobs are never reused.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+DEFAULT_MAX_JOBS = 32
+HEARTBEAT_SECONDS = 15
+
+
+class Job:
+    """One background run: status, per-stage progress and, once finished, the result"""
+
+    def __init__(self, key, stages=()):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = 'queued'
+        self.stages = OrderedDict((name, {'status': 'pending'}) for name in stages)
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.sequence = 0
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.sequence += 1
+            self._changed.notify_all()
+
+    def progress(self, stage, status, seconds=None):
+        """Record a stage transition; usable as a ``run_stages`` progress callback"""
+        with self._changed:
+            entry = self.stages.setdefault(stage, {})
+            entry['status'] = status
+            if seconds is not None:
+                entry['seconds'] = round(seconds, 6)
+            self.sequence += 1
+            self._changed.notify_all()
+
+    def to_dict(self, include_result=False):
+        with self._changed:
+            completed = sum(1 for entry in self.stages.values() if entry['status'] == 'done')
+            state = {
+                'job_id': self.id,
+                'status': self.status,
+                'stages': {name: dict(entry) for name, entry in self.stages.items()},
+                'progress': round(completed / len(self.stages), 4) if self.stages else None,
+                'created': self.created,
+                'finished': self.finished,
+                'sequence': self.sequence
+            }
+            if self.error is not None:
+                state['error'] = self.error
+            if include_result and self.status == 'done':
+                state['result'] = self.result
+            return state
+
+    def wait(self, sequence, timeout=None):
+        """Block until the job moves past ``sequence`` (or finishes); returns the new sequence"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.sequence > sequence or self.done, timeout)
+            return self.sequence
+
+    def events(self, heartbeat=HEARTBEAT_SECONDS):
+        """Server-Sent Events: a 'progress' event per change, then 'done' or 'failed'"""
+        sequence = -1
+        while True:
+            current = self.wait(sequence, heartbeat)
+            if current == sequence and not self.done:
+                yield ': keep-alive\n\n'
+                continue
+            sequence = current
+            state = self.to_dict()
+            event = state['status'] if state['status'] in ('done', 'failed') else 'progress'
+            yield f"id: {state['sequence']}\nevent: {event}\ndata: {json.dumps(state)}\n\n"
+            if event != 'progress':
+                return
+
+
+class JobStore:
+    """Deduplicating job registry with a bounded store of finished jobs"""
+
+    def __init__(self, executor, max_jobs=DEFAULT_MAX_JOBS):
+        self.executor = executor
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self.deduplicated = 0
+
+    def submit(self, key, func, stages=()):
+        """Run ``func(job)`` in the background unless an identical job exists.
+
+        Returns ``(job, created)``; ``created`` is False when an in-flight
+        or finished job with the same key was reused.
+        """
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.status != 'failed':
+                self._jobs.move_to_end(job.id)
+                self.deduplicated += 1
+                return job, False
+            job = Job(key, stages)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._evict()
+        self.executor.submit(self._run, job, func)
+        return job, True
+
+    def _run(self, job, func):
+        job._update(status='running')
+        try:
+            result = func(job)
+        except Exception as e:
+            job._update(status='failed', error=str(e), finished=time.time())
+        else:
+            job._update(status='done', result=result, finished=time.time())
+
+    def _evict(self):
+        # Only finished jobs are dropped; in-flight jobs always stay reachable
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+            return job
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.done)
+            return {'jobs': len(self._jobs), 'running': running,
+                    'max_jobs': self.max_jobs, 'deduplicated': self.deduplicated}
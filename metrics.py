@@ -0,0 +1,188 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms live in a ``Registry``, and
+``Registry.render()`` serves them in text format 0.0.4, so a Prometheus
+server can scrape ``/metrics`` without a client library. Collectors
+registered with ``add_collector`` are called at render time for values
+that are cheaper to read than to track, such as cache sizes.
+
+A ``Profile`` collects the stage timings of one request. It is kept in a
+context variable, so stages that run on pool threads (submitted with a
+copied context) report into the request that started them. Its
+``server_timing()`` renders a ``Server-Timing`` header value.
+"""
+import contextvars
+import math
+import threading
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+BYTE_BUCKETS = tuple(1024 * 4 ** power for power in range(10))  # 1 KiB .. 256 MiB
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, labels, value) triples for rendering"""
+        with self._lock:
+            return [('', key, value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, count, total = self._values.get(key, ([0] * len(self.buckets), 0, 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, count + 1, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), count, total)
+                     for key, (counts, count, total) in self._values.items()]
+        rows = []
+        for key, counts, count, total in items:
+            for bound, cumulative in zip(self.buckets, counts):
+                rows.append(('_bucket', key + (('le', _format_value(float(bound))),), cumulative))
+            rows.append(('_bucket', key + (('le', '+Inf'),), count))
+            rows.append(('_sum', key, total))
+            rows.append(('_count', key, count))
+        return rows
+
+
+class Registry:
+    """Named metrics plus render-time collectors"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """``collect()`` yields ``(name, kind, help, [(labels dict, value), ...])`` at render time"""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} "
+                                 f"{_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class Profile:
+    """Stage timings collected for one request"""
+
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, description=None):
+        with self._lock:
+            self.entries.append((name, seconds, description))
+
+    def server_timing(self):
+        """``Server-Timing`` header value, durations in milliseconds"""
+        with self._lock:
+            entries = list(self.entries)
+        parts = []
+        for name, seconds, description in entries:
+            token = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+            part = f"{token};dur={seconds * 1000:.3f}"
+            if description:
+                part += f';desc="{_escape(description)}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+def start_profile():
+    """Begin collecting stage timings in the current context; returns a reset token"""
+    return _profile.set(Profile())
+
+
+def current_profile():
+    return _profile.get()
+
+
+def end_profile(token):
+    _profile.reset(token)
@@ -0,0 +1,160 @@
+"""Cross-validated search over the outlier, feature and regularisation settings.
+
+A configuration is an (IQR multiplier, drop list, ridge alpha) triple,
+and each (configuration, fold) pair is an independent task on a process
+pool. The numeric design matrix, log prices, fold ids and per-multiplier
+outlier masks are written to shared memory once. Workers attach to them
+when they start, so a task carries only a few indices; the data itself
+is never pickled.
+
+Each fold trains on the rows that its outlier rule keeps, but it is
+scored on all of its held-out rows (RMSE of log price). A stricter rule
+therefore cannot win just by removing hard cases from validation.
+Finished configurations are cached in a JSON file per dataset version,
+so an interrupted or repeated search only evaluates what is missing.
+"""
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from column_cache import CACHE_DIR
+from pipeline import make_version
+from price_model import TARGET, fit_ridge
+from shared_arrays import SharedArrays, attach
+from sketches import quartiles
+
+SEARCH_DIR = os.path.join(CACHE_DIR, 'search')
+DEFAULT_FOLDS = 5
+
+
+_worker = {}
+
+
+def _init_worker(spec):
+    _worker['blocks'], _worker['arrays'] = attach(spec)
+
+
+def evaluate_fold(columns, mask_index, alpha, fold):
+    """Held-out RMSE of log price for one configuration and fold (runs in a pool worker)"""
+    arrays = _worker['arrays']
+    folds = arrays['folds']
+    train = (folds != fold) & arrays['keep'][mask_index]
+    test = folds == fold
+    X = arrays['X'][:, columns]
+    log_y = arrays['log_y']
+
+    medians, mean, scale, coef, intercept = fit_ridge(X[train], log_y[train], alpha)
+    held_out = np.where(np.isnan(X[test]), medians, X[test])
+    predicted = ((held_out - mean) / scale) @ coef + intercept
+    return float(np.sqrt(np.mean((log_y[test] - predicted) ** 2)))
+
+
+def read_results(path):
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_results(path, results):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle)
+    os.replace(tmp_path, path)
+
+
+def config_label(iqr_multiplier, drop_name, alpha):
+    return f"iqr={iqr_multiplier:g} drop={drop_name} alpha={alpha:g}"
+
+
+def run_search(frame, iqr_multipliers, drop_lists, alphas, folds=DEFAULT_FOLDS, seed=0,
+               workers=None, cache_path=None, progress=None):
+    """Cross-validate every configuration on a process pool.
+
+    ``drop_lists`` maps a name to the columns to remove. Returns the
+    results sorted by mean held-out RMSE (best first) with the counts of
+    cached and newly evaluated configurations.
+    """
+    started = time.perf_counter()
+    numeric = frame.select_dtypes(include=[np.number])
+    prices = numeric[TARGET].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(prices) & (prices > 0)
+    numeric, prices = numeric[valid], prices[valid]
+    features = [col for col in numeric.columns if col != TARGET and numeric[col].notna().any()]
+
+    # Same rule as remove_outliers(): drop prices above Q3 + multiplier * IQR
+    q1, _, q3 = quartiles(prices)
+    keep = np.array([prices <= q3 + multiplier * (q3 - q1) for multiplier in iqr_multipliers],
+                    dtype=bool).reshape(len(iqr_multipliers), len(prices))
+    fold_ids = (np.random.default_rng(seed).permutation(len(prices)) % folds).astype(np.int32)
+
+    configs = {}
+    for (m, multiplier), (drop_name, drop), alpha in itertools.product(
+            enumerate(iqr_multipliers), drop_lists.items(), alphas):
+        dropped = set(drop)
+        columns = [j for j, col in enumerate(features) if col not in dropped]
+        key = make_version('cv', multiplier, sorted(drop), alpha, folds, seed)
+        configs[key] = {
+            'label': config_label(multiplier, drop_name, alpha),
+            'iqr_multiplier': multiplier,
+            'drop': drop_name,
+            'cols_to_remove': list(drop),
+            'alpha': alpha,
+            'features': len(columns),
+            'train_rows': int(keep[m].sum()),
+            '_task': (columns, m, alpha)
+        }
+
+    cached = read_results(cache_path) if cache_path else {}
+    pending = [key for key in configs if key not in cached]
+    for key in configs:
+        if key in cached and progress is not None:
+            progress(configs[key]['label'], 'done')
+
+    if pending:
+        scores = {key: {} for key in pending}
+        with SharedArrays({'X': numeric[features].to_numpy(dtype=np.float64, na_value=np.nan),
+                           'log_y': np.log(prices), 'folds': fold_ids, 'keep': keep}) as shared, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(shared.spec,)) as pool:
+            futures = {}
+            for key in pending:
+                if progress is not None:
+                    progress(configs[key]['label'], 'running')
+                for fold in range(folds):
+                    futures[pool.submit(evaluate_fold, *configs[key]['_task'], fold)] = (key, fold)
+            for future in as_completed(futures):
+                key, fold = futures[future]
+                scores[key][fold] = future.result()
+                if len(scores[key]) < folds:
+                    continue
+                fold_rmse = [scores[key][f] for f in range(folds)]
+                result = {name: value for name, value in configs[key].items() if name != '_task'}
+                result.update(fold_rmse=fold_rmse, rmse_log=float(np.mean(fold_rmse)),
+                              rmse_std=float(np.std(fold_rmse)))
+                cached[key] = result
+                if cache_path:
+                    _write_results(cache_path, cached)
+                if progress is not None:
+                    progress(result['label'], 'done')
+
+    results = sorted((cached[key] for key in configs), key=lambda result: result['rmse_log'])
+    return {
+        'results': results,
+        'best': results[0] if results else None,
+        'folds': folds,
+        'rows': int(len(prices)),
+        'cached': len(configs) - len(pending),
+        'evaluated': len(pending),
+        'seconds': round(time.perf_counter() - started, 6)
+    }
+
+
+def search_cache_path(dataset_version, directory=SEARCH_DIR):
+    return os.path.join(directory, f"{dataset_version}.json")
@@ -0,0 +1,183 @@
+"""Bit-packed missing-value masks and co-missingness analysis.
+
+``NullMaskIndex`` keeps one bitmap per column: bit ``r`` of column ``c``
+is set when row ``r`` is missing. The bitmaps are stored as uint64 words
+(``bits[c]``), i.e. n/64 words per column instead of n bytes for a
+boolean mask. From them:
+
+* per-column missing counts are a popcount over the column's words
+* pairwise co-missing counts are ``popcount(bits[i] & bits[j])``,
+  computed in blocks of columns so memory stays bounded on wide data
+* the most frequent missingness patterns (which columns are missing in
+  the same row) come from the per-row bit patterns over the columns
+  that have gaps, counted in blocks of rows
+* columns with identical bitmaps (e.g. every Garage* column) form
+  groups that always go missing together
+"""
+import numpy as np
+
+from binary_format import Matrix
+
+WORD_BITS = 64
+# Columns packed per isna() call while building, and words per co-missing block
+BUILD_COLUMNS = 64
+BLOCK_WORDS = 1 << 22
+PATTERN_ROWS = 1 << 16
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        """Set bits per element"""
+        return np.bitwise_count(words)
+else:  # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Set bits per element"""
+        words = np.ascontiguousarray(words)
+        counts = _BYTE_COUNTS[words.view(np.uint8)]
+        return counts.reshape(words.shape + (words.itemsize,)).sum(axis=-1)
+
+
+def pack_columns(mask):
+    """Pack a (rows, columns) boolean mask into (columns, words) uint64 bitmaps"""
+    rows, columns = mask.shape
+    packed = np.packbits(mask, axis=0, bitorder='little')
+    words = -(-rows // WORD_BITS)
+    padded = np.zeros((words * 8, columns), dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return np.ascontiguousarray(padded.T).view(np.uint64)
+
+
+class NullMaskIndex:
+    """One packed missing-value bitmap per column"""
+
+    def __init__(self, columns, bits, rows):
+        self.columns = list(columns)
+        self.positions = {col: i for i, col in enumerate(self.columns)}
+        self.bits = bits
+        self.rows = rows
+        self.counts = popcount(bits).sum(axis=1).astype(np.int64) if len(bits) else \
+            np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, frame):
+        words = -(-len(frame) // WORD_BITS)
+        bits = np.zeros((len(frame.columns), words), dtype=np.uint64)
+        for start in range(0, len(frame.columns), BUILD_COLUMNS):
+            block = frame.iloc[:, start:start + BUILD_COLUMNS].isna().to_numpy()
+            bits[start:start + block.shape[1]] = pack_columns(block)
+        return cls(frame.columns, bits, len(frame))
+
+    def subset(self, columns):
+        """Index restricted to ``columns`` (no rescan)"""
+        positions = [self.positions[col] for col in columns]
+        return NullMaskIndex(columns, self.bits[positions], self.rows)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def missing_counts(self):
+        return dict(zip(self.columns, self.counts.tolist()))
+
+    def incomplete(self):
+        """Positions of the columns with at least one missing value"""
+        return np.flatnonzero(self.counts)
+
+    def complete_rows(self):
+        """Rows with no missing value in any column"""
+        if not len(self.bits):
+            return self.rows
+        return self.rows - int(popcount(np.bitwise_or.reduce(self.bits, axis=0)).sum())
+
+    def co_missing(self, positions=None):
+        """Rows missing in both columns, for every pair of ``positions`` (all columns by default)"""
+        bits = self.bits if positions is None else self.bits[positions]
+        m, words = bits.shape
+        result = np.empty((m, m), dtype=np.int64)
+        block = max(1, BLOCK_WORDS // max(m * words, 1))
+        for start in range(0, m, block):
+            # Upper triangle only (columns from ``start`` on), mirrored below the diagonal
+            chunk = bits[start:start + block]
+            counts = popcount(chunk[:, None, :] & bits[None, start:, :]).sum(axis=2)
+            result[start:start + len(chunk), start:] = counts
+            result[start:, start:start + len(chunk)] = counts.T
+        return result
+
+    def patterns(self, positions=None, top=None):
+        """``(patterns, distinct)``: the ``top`` most frequent row missingness patterns
+        (all by default) as ``(positions tuple, rows)`` pairs, ``()`` being complete rows"""
+        positions = self.incomplete() if positions is None else np.asarray(positions)
+        if not self.rows:
+            return [], 0
+        if not len(positions):
+            return [((), self.rows)], 1
+        bits = self.bits[positions]
+        step = PATTERN_ROWS // WORD_BITS
+        keys, counts = [], []
+        for start in range(0, bits.shape[1], step):
+            chunk = np.ascontiguousarray(bits[:, start:start + step]).view(np.uint8)
+            count = min(self.rows - start * WORD_BITS, chunk.shape[1] * 8)
+            masks = np.unpackbits(chunk, axis=1, count=count, bitorder='little')
+            rows = np.ascontiguousarray(np.packbits(masks.T, axis=1))
+            # Each row's packed bits as one fixed-width byte string, so np.unique compares memcmp-style
+            unique, frequency = np.unique(rows.view(np.dtype((np.void, rows.shape[1]))).ravel(),
+                                          return_counts=True)
+            keys.append(unique)
+            counts.append(frequency)
+        keys, counts = np.concatenate(keys), np.concatenate(counts)
+        if bits.shape[1] > step:  # merge the per-block counts
+            keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+        ranked = np.argsort(-counts, kind='stable')[:top]
+        packed = keys[ranked].view(np.uint8).reshape(len(ranked), -1)
+        members = np.unpackbits(packed, axis=1, count=len(positions)).astype(bool)
+        return [(tuple(positions[row].tolist()), int(counts[r]))
+                for row, r in zip(members, ranked)], len(counts)
+
+    def identical_groups(self, positions=None):
+        """Groups (lists of positions) of columns whose bitmaps are identical"""
+        positions = self.incomplete() if positions is None else np.asarray(positions)
+        if not len(positions):
+            return []
+        bits = np.ascontiguousarray(self.bits[positions])
+        keys = bits.view(np.dtype((np.void, bits.shape[1] * 8))).ravel()
+        _, inverse, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        groups = [positions[inverse == g].tolist() for g in np.flatnonzero(sizes > 1)]
+        return sorted(groups, key=lambda group: (-len(group), group))
+
+
+def missing_report(index, top=10, include_matrix=False):
+    """Co-missing pairs, frequent patterns and identical groups over the incomplete columns"""
+    positions = index.incomplete()
+    names = [index.columns[p] for p in positions]
+    co = index.co_missing(positions)
+    counts = index.counts[positions]
+
+    i, j = np.triu_indices(len(positions), 1)
+    together = co[i, j]
+    union = counts[i] + counts[j] - together
+    ranked = np.lexsort((-together / np.maximum(union, 1), -together))
+    ranked = ranked[together[ranked] > 0][:top]
+    pairs = [{'features': [names[i[r]], names[j[r]]], 'rows': int(together[r]),
+              'jaccard': round(float(together[r] / union[r]), 4)} for r in ranked]
+
+    patterns, distinct = index.patterns(positions, top=top + 1)
+    complete = index.complete_rows()
+    frequent = [{'features': [index.columns[p] for p in pattern], 'rows': count,
+                 'percentage': round(count / index.rows * 100, 1) if index.rows else 0.0}
+                for pattern, count in patterns if pattern][:top]
+
+    report = {
+        'rows': index.rows,
+        'complete_rows': complete,
+        'incomplete_columns': len(positions),
+        'distinct_patterns': distinct - (complete > 0),
+        'co_missing': pairs,
+        'patterns': frequent,
+        'identical': [[index.columns[p] for p in group]
+                      for group in index.identical_groups(positions)]
+    }
+    if include_matrix:
+        report['matrix'] = Matrix(names, co)
+    return report
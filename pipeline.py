@@ -0,0 +1,304 @@
+"""Versioned, memoized snapshots for the house price analysis pipeline"""
+import contextvars
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+
+def make_version(*parts):
+    """Build a short, deterministic version string from arbitrary parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def source_signature(path):
+    """Identify a data file by path, size and modification time"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {'path': path, 'missing': True}
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def timed_call(func, *args, **kwargs):
+    """Call ``func`` and return ``(result, wall-clock seconds)``"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_stages(stages, executor=None, progress=None):
+    """Run independent stages, concurrently when an executor is given.
+
+    ``stages`` maps names to zero-argument callables. Returns the results
+    and each stage's wall-clock seconds, both keyed by name. ``progress``,
+    if given, is called as ``progress(name, 'running')`` and
+    ``progress(name, 'done', seconds)`` around each stage.
+    """
+    if progress is not None:
+        stages = {name: _reporting(name, func, progress) for name, func in stages.items()}
+    if executor is None:
+        outcomes = {name: timed_call(func) for name, func in stages.items()}
+    else:
+        # Each stage runs in a copy of the caller's context, so context variables
+        # (such as a request's profile) follow it onto the pool thread
+        futures = {name: executor.submit(contextvars.copy_context().run, timed_call, func)
+                   for name, func in stages.items()}
+        outcomes = {name: future.result() for name, future in futures.items()}
+    results = {name: outcome[0] for name, outcome in outcomes.items()}
+    timings = {name: round(outcome[1], 6) for name, outcome in outcomes.items()}
+    return results, timings
+
+
+def _reporting(name, func, progress):
+    """Wrap a stage so it reports its start and finish"""
+    def run():
+        progress(name, 'running')
+        result, seconds = timed_call(func)
+        progress(name, 'done', seconds)
+        return result
+    return run
+
+
+_MISSING = object()
+# Bump when the pickled layout of cached results changes, so old warm-start files are ignored
+STATE_VERSION = 1
+
+
+def _freeze(params):
+    """Turn a parameter dict into a hashable cache key"""
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def measured_call(func):
+    """Call ``func`` and return ``(result, seconds, peak traced bytes or None)``.
+
+    The peak is only measured while ``tracemalloc`` is tracing, and it is
+    approximate when other stages allocate at the same time.
+    """
+    if not tracemalloc.is_tracing():
+        result, seconds = timed_call(func)
+        return result, seconds, None
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result, seconds = timed_call(func)
+    return result, seconds, max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+
+def _picklable(value):
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+
+class Snapshot:
+    """Immutable view of the dataset as produced by one pipeline stage.
+
+    The frame must be treated as read-only: stages always return a new
+    frame instead of modifying the one they were given.
+    """
+
+    __slots__ = ('frame', 'stage', 'version', 'parent', 'params')
+
+    def __init__(self, frame, stage, version, parent=None, params=None):
+        object.__setattr__(self, 'frame', frame)
+        object.__setattr__(self, 'stage', stage)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'parent', parent)
+        object.__setattr__(self, 'params', dict(params or {}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Snapshot is immutable')
+
+    def __reduce__(self):
+        return Snapshot, (self.frame, self.stage, self.version, self.parent, self.params)
+
+    def lineage(self):
+        """Return the chain of (stage, version) pairs leading to this snapshot"""
+        chain = []
+        node = self
+        while node is not None:
+            chain.append({'stage': node.stage, 'version': node.version})
+            node = node.parent
+        return list(reversed(chain))
+
+    def __repr__(self):
+        return f"Snapshot(stage={self.stage!r}, version={self.version!r}, shape={self.frame.shape})"
+
+
+class Pipeline:
+    """Chain of snapshots with results cached by input version and parameters.
+
+    ``observer``, if given, is called after every cached stage lookup as
+    ``observer(stage, hit, seconds, frame, peak_bytes)``, where ``frame``
+    is the frame the stage read (or produced, for ``load``) and
+    ``peak_bytes`` is None for hits or when memory is not traced.
+    """
+
+    def __init__(self, max_results=128, observer=None):
+        self.max_results = max_results
+        self.observer = observer
+        self._results = OrderedDict()
+        self._latest = {}
+        self._head = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, stage, input_version, params, compute, frame=None):
+        key = (stage, input_version, _freeze(params))
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                value = self._results[key]
+            else:
+                value = _MISSING
+                self.misses += 1
+        if value is not _MISSING:
+            self._notify(stage, True, 0.0, frame, value, None)
+            return value
+
+        value, seconds, peak_bytes = measured_call(compute)
+        self._notify(stage, False, seconds, frame, value, peak_bytes)
+
+        with self._lock:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return value
+
+    def _notify(self, stage, hit, seconds, frame, value, peak_bytes):
+        if self.observer is None:
+            return
+        if frame is None and isinstance(value, Snapshot):
+            frame = value.frame
+        self.observer(stage, hit, seconds, frame, peak_bytes)
+
+    def load(self, loader, source):
+        """Return the base snapshot, re-running the loader only when the source changes"""
+        def compute():
+            frame = loader()
+            return Snapshot(frame, 'load', make_version('load', source))
+
+        snapshot = self._cached('load', None, source, compute)
+        self.publish(snapshot)
+        return snapshot
+
+    def transform(self, stage, snapshot, func, **params):
+        """Run a stage that produces a new dataset; returns (snapshot, info)"""
+        def compute():
+            frame, info = func(snapshot.frame, **params)
+            version = make_version(snapshot.version, stage, params)
+            return Snapshot(frame, stage, version, parent=snapshot, params=params), info
+
+        result = self._cached(stage, snapshot.version, params, compute, snapshot.frame)
+        self.publish(result[0])
+        return result
+
+    def analyze(self, stage, snapshot, func, **params):
+        """Run a read-only stage over a snapshot and cache its result"""
+        return self._cached(stage, snapshot.version, params,
+                            lambda: func(snapshot.frame, **params), snapshot.frame)
+
+    def memoize(self, stage, params, compute):
+        """Cache a result that is keyed only by its parameters, not by a snapshot"""
+        return self._cached(stage, None, params, compute)
+
+    def publish(self, snapshot):
+        """Make a snapshot the latest one for its stage and the pipeline head"""
+        with self._lock:
+            # Downstream snapshots built from an older input are no longer current
+            ancestors = {entry['version'] for entry in snapshot.lineage()}
+            for stage, latest in list(self._latest.items()):
+                if latest.version not in ancestors and snapshot.version not in {
+                        entry['version'] for entry in latest.lineage()}:
+                    del self._latest[stage]
+            self._latest[snapshot.stage] = snapshot
+            self._head = snapshot
+
+    def snapshot(self, stage=None):
+        """Return the latest snapshot for a stage, or the head when no stage is given"""
+        with self._lock:
+            if stage is None:
+                return self._head
+            return self._latest.get(stage)
+
+    def clear(self):
+        """Drop every cached result and snapshot"""
+        with self._lock:
+            self._results.clear()
+            self._latest.clear()
+            self._head = None
+
+    def save(self, path, **metadata):
+        """Write the cached results and latest snapshots to ``path`` for a later ``restore``.
+
+        The file is a pickle written atomically; it lives in the app's own
+        cache directory and must never be read from an untrusted location.
+        Results that cannot be pickled are left out.
+        """
+        with self._lock:
+            results = list(self._results.items())
+            latest = dict(self._latest)
+            head = self._head
+        state = {'version': STATE_VERSION, 'results': results, 'latest': latest, 'head': head,
+                 'metadata': metadata}
+        try:
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            state['results'] = [(key, value) for key, value in results if _picklable(value)]
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            handle.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def restore(self, path):
+        """Load results written by ``save``; returns the saved metadata, or None"""
+        try:
+            with open(path, 'rb') as handle:
+                state = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return None
+        with self._lock:
+            for key, value in state['results']:
+                self._results[key] = value
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            self._latest.update(state['latest'])
+            self._head = state['head']
+        return state['metadata']
+
+    def frame_bytes(self):
+        """Memory held by the frames of the latest and cached snapshots, each frame counted once"""
+        with self._lock:
+            values = list(self._latest.values()) + list(self._results.values())
+        frames = {}
+        for value in values:
+            snapshot = value[0] if isinstance(value, tuple) and value else value
+            if isinstance(snapshot, Snapshot):
+                frames[id(snapshot.frame)] = snapshot.frame
+        return sum(int(frame.memory_usage(index=True, deep=True).sum()) for frame in frames.values())
+
+    def stats(self):
+        """Cache statistics for diagnostics"""
+        with self._lock:
+            return {
+                'entries': len(self._results),
+                'hits': self.hits,
+                'misses': self.misses,
+                'stages': {stage: snap.version for stage, snap in self._latest.items()},
+            }
@@ -0,0 +1,162 @@
+"""Linear price model trained on the cleaned (feature-reduced) snapshot.
+
+The model is a ridge regression on standardised numeric features that
+predicts log(SalePrice). Missing inputs are imputed with the training
+medians. Fitting is a single closed-form solve. Scoring a batch is one
+gather into an (n x p) array and one matrix-vector product, so thousands
+of listings are priced per call without a Python loop over rows.
+
+Fitted models are saved as ``.npz`` files named after the snapshot
+version and the fit parameters. A restart, or another worker, then
+reloads the model instead of retraining it.
+"""
+import json
+import os
+import warnings
+
+import numpy as np
+
+from column_cache import CACHE_DIR
+
+MODEL_DIR = os.path.join(CACHE_DIR, 'models')
+DEFAULT_ALPHA = 1.0
+TARGET = 'SalePrice'
+
+
+def fit_ridge(X, log_y, alpha=DEFAULT_ALPHA):
+    """Closed-form ridge fit on a raw feature matrix.
+
+    Returns ``(medians, mean, scale, coef, intercept)``: NaNs are imputed
+    with the column medians and features standardised before solving.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns impute to 0
+        medians = np.nanmedian(X, axis=0) if len(X) else np.zeros(X.shape[1])
+    medians = np.where(np.isnan(medians), 0.0, medians)
+    X = np.where(np.isnan(X), medians, X)
+    mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+    scale = X.std(axis=0) if len(X) else np.ones(X.shape[1])
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale
+
+    intercept = float(log_y.mean()) if len(log_y) else 0.0
+    gram = Z.T @ Z + alpha * np.eye(X.shape[1])
+    coef = np.linalg.solve(gram, Z.T @ (log_y - intercept))
+    return medians, mean, scale, coef, intercept
+
+
+class PriceModel:
+    """Ridge regression of log price on numeric features"""
+
+    def __init__(self, features, medians, mean, scale, coef, intercept,
+                 alpha=DEFAULT_ALPHA, metrics=None, version=None):
+        self.features = list(features)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.alpha = alpha
+        self.metrics = metrics or {}
+        self.version = version
+
+    @classmethod
+    def fit(cls, frame, target=TARGET, alpha=DEFAULT_ALPHA, version=None, features=None):
+        """Fit on ``features`` (default: every numeric column of ``frame`` except the target)"""
+        numeric = frame.select_dtypes(include=[np.number])
+        y = numeric[target].to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = ~np.isnan(y) & (y > 0)
+        if features is None:
+            features = [col for col in numeric.columns
+                        if col != target and numeric[col].notna().any()]
+        X = numeric[features].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+        log_y = np.log(y[rows])
+
+        model = cls(features, *fit_ridge(X, log_y, alpha), alpha=alpha, version=version)
+        model.metrics = model.score(X, log_y)
+        return model
+
+    def predict_log(self, X):
+        """Predicted log prices for a raw (n x p) feature matrix; NaNs use the training medians"""
+        X = np.where(np.isnan(X), self.medians, X)
+        return ((X - self.mean) / self.scale) @ self.coef + self.intercept
+
+    def score(self, X, log_y):
+        """Fit quality on the log and the price scale for a raw feature matrix"""
+        log_pred = self.predict_log(X)
+        residual = log_y - log_pred
+        total = ((log_y - log_y.mean()) ** 2).sum() if len(log_y) else 0.0
+        prices, predicted = np.exp(log_y), np.exp(log_pred)
+        return {
+            'rows': int(len(log_y)),
+            'r2_log': float(1 - (residual ** 2).sum() / total) if total > 0 else None,
+            'rmse_log': float(np.sqrt((residual ** 2).mean())) if len(log_y) else None,
+            'mae': float(np.abs(prices - predicted).mean()) if len(log_y) else None
+        }
+
+    def design_matrix(self, columns, rows=None):
+        """(n x p) feature matrix from a mapping of column -> values; absent columns stay NaN"""
+        if rows is not None:
+            n = rows
+        elif hasattr(columns, 'to_numpy'):
+            n = len(columns)
+        else:
+            lengths = {len(values) for values in columns.values()}
+            if len(lengths) > 1:
+                raise ValueError('All input columns must have the same length')
+            n = lengths.pop() if lengths else 0
+        X = np.full((n, len(self.features)), np.nan)
+        for j, feature in enumerate(self.features):
+            if feature in columns:
+                values = columns[feature]
+                X[:, j] = (values.to_numpy(dtype=np.float64, na_value=np.nan)
+                           if hasattr(values, 'to_numpy') else np.asarray(values, dtype=np.float64))
+        return X
+
+    def predict(self, columns, rows=None):
+        """Predicted prices for every row of ``columns`` (a DataFrame or dict of arrays)"""
+        return np.exp(self.predict_log(self.design_matrix(columns, rows)))
+
+    def coefficients(self):
+        """Standardised coefficients, largest effect first"""
+        order = np.argsort(-np.abs(self.coef), kind='stable')
+        return [{'feature': self.features[j], 'coefficient': round(float(self.coef[j]), 6)}
+                for j in order]
+
+    def info(self):
+        return {'version': self.version, 'target': TARGET, 'alpha': self.alpha,
+                'features': self.features, 'metrics': self.metrics}
+
+    def save(self, path):
+        """Write the model to ``path`` atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        meta = {'features': self.features, 'intercept': self.intercept, 'alpha': self.alpha,
+                'metrics': self.metrics, 'version': self.version}
+        np.savez(tmp_path, medians=self.medians, mean=self.mean, scale=self.scale,
+                 coef=self.coef, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(str(stored['meta']))
+            return cls(meta['features'], stored['medians'], stored['mean'], stored['scale'],
+                       stored['coef'], meta['intercept'], meta['alpha'], meta['metrics'],
+                       meta['version'])
+
+
+def model_path(version, directory=MODEL_DIR):
+    return os.path.join(directory, f"{version}.npz")
+
+
+def load_or_fit(frame, version, alpha=DEFAULT_ALPHA, directory=MODEL_DIR):
+    """Reload the model saved for ``version``, or fit and save it"""
+    path = model_path(version, directory)
+    try:
+        return PriceModel.load(path), True
+    except (OSError, KeyError, ValueError):
+        model = PriceModel.fit(frame, alpha=alpha, version=version)
+        model.save(path)
+        return model, False
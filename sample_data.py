@@ -0,0 +1,86 @@
+"""Synthetic Ames-shaped house price data.
+
+Used as the demo dataset when the data file is missing and as the input
+of the benchmark suite, which scales it up. With the default arguments
+the frame is identical to the original demo data (same seed, same
+columns, same draws).
+"""
+import numpy as np
+import pandas as pd
+
+BASE_ROWS = 1460
+# Numeric columns that never get injected missing values
+COMPLETE_COLUMNS = ('SalePrice', 'Id')
+
+
+def make_sample_data(sample_size=BASE_ROWS, extra_columns=0, missing_rate=0.0, seed=42):
+    """Ames-shaped frame with ``sample_size`` rows.
+
+    ``extra_columns`` adds that many numeric noise columns and
+    ``missing_rate`` blanks that fraction of the numeric values (other
+    than SalePrice and Id), for benchmarking wider and sparser data.
+    """
+    rng = np.random.RandomState(seed)
+    
+    data = pd.DataFrame({
+        'SalePrice': rng.normal(180000, 50000, sample_size),
+        'OverallQual': rng.randint(1, 11, sample_size),
+        'GrLivArea': rng.normal(1500, 500, sample_size),
+        'GarageArea': rng.normal(500, 200, sample_size),
+        'GarageCars': rng.randint(0, 4, sample_size),
+        'TotalBsmtSF': rng.normal(1000, 300, sample_size),
+        '1stFlrSF': rng.normal(1000, 300, sample_size),
+        'FullBath': rng.randint(1, 4, sample_size),
+        'YearBuilt': rng.randint(1900, 2020, sample_size),
+        'TotRmsAbvGrd': rng.randint(4, 12, sample_size),
+        'WoodDeckSF': rng.normal(100, 150, sample_size),
+        'LotFrontage': rng.normal(70, 20, sample_size),
+        'BsmtFinSF1': rng.normal(400, 200, sample_size),
+        '2ndFlrSF': rng.normal(300, 400, sample_size),
+        'OpenPorchSF': rng.normal(50, 100, sample_size),
+        'HalfBath': rng.randint(0, 3, sample_size),
+        'LotArea': rng.normal(10000, 5000, sample_size),
+        'BsmtFullBath': rng.randint(0, 3, sample_size),
+        'BsmtUnfSF': rng.normal(500, 300, sample_size),
+        'BedroomAbvGr': rng.randint(1, 6, sample_size),
+        'ScreenPorch': rng.normal(20, 50, sample_size),
+        'PoolArea': rng.normal(10, 100, sample_size),
+        'MoSold': rng.randint(1, 13, sample_size),
+        '3SsnPorch': rng.normal(5, 20, sample_size),
+        'BsmtHalfBath': rng.randint(0, 2, sample_size),
+        'MiscVal': rng.normal(50, 200, sample_size),
+        'Id': range(1, sample_size + 1),
+        'LowQualFinSF': rng.normal(10, 50, sample_size),
+        'YrSold': rng.randint(2006, 2021, sample_size),
+        'OverallCond': rng.randint(1, 11, sample_size),
+        'MSSubClass': rng.randint(20, 200, sample_size),
+        'EnclosedPorch': rng.normal(20, 100, sample_size),
+        'KitchenAbvGr': rng.randint(1, 3, sample_size),
+    })
+    
+    # Add some categorical columns with missing values
+    data['FireplaceQu'] = rng.choice(['Ex', 'Gd', 'TA', 'Fa', 'Po', np.nan],
+                                     sample_size, p=[0.1, 0.2, 0.3, 0.2, 0.1, 0.1])
+    data['Fence'] = rng.choice(['GdPrv', 'MnPrv', 'GdWo', 'MnWw', np.nan],
+                               sample_size, p=[0.05, 0.1, 0.05, 0.1, 0.7])
+    data['Alley'] = rng.choice(['Grvl', 'Pave', np.nan],
+                               sample_size, p=[0.05, 0.05, 0.9])
+    data['MiscFeature'] = rng.choice(['Elev', 'Gar2', 'Othr', 'Shed', 'TenC', np.nan],
+                                     sample_size, p=[0.01, 0.02, 0.02, 0.03, 0.01, 0.91])
+    data['PoolQC'] = rng.choice(['Ex', 'Fa', 'Gd', np.nan],
+                                sample_size, p=[0.02, 0.02, 0.02, 0.94])
+    
+    # Make sure SalePrice is positive
+    data['SalePrice'] = np.abs(data['SalePrice'])
+    data['GrLivArea'] = np.abs(data['GrLivArea'])
+    data['GarageArea'] = np.abs(data['GarageArea'])
+    data['TotalBsmtSF'] = np.abs(data['TotalBsmtSF'])
+    
+    for i in range(extra_columns):
+        data[f"Extra{i}"] = rng.normal(0, 1, sample_size)
+    if missing_rate > 0:
+        for col in data.select_dtypes(include=[np.number]).columns:
+            if col not in COMPLETE_COLUMNS:
+                data[col] = data[col].mask(rng.random_sample(sample_size) < missing_rate)
+    
+    return data
@@ -0,0 +1,46 @@
+"""NumPy arrays in named shared-memory blocks for process-pool workers.
+
+The parent copies each array into a block once and passes the small
+``spec`` to its tasks; workers ``attach`` to the blocks by name instead
+of receiving pickled copies of the data.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArrays:
+    """NumPy arrays copied into named shared-memory blocks; ``spec`` describes them to workers"""
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(spec):
+    """Read-only views of the arrays in ``spec``, plus the blocks that keep them alive"""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+        arrays[name].flags.writeable = False
+    return blocks, arrays
@@ -0,0 +1,153 @@
+"""Copy-on-publish dataset store shared by several worker processes.
+
+One worker runs the pipeline and publishes its snapshots here: each
+snapshot is written once as memory-mappable column files under
+``versions/<version>/``, then a manifest describing the lineage is
+written and atomically renamed over ``CURRENT``. Every worker maps the
+same files read-only, so the operating system's page cache holds a
+single copy of the data however many workers there are, and a reader
+either sees the previous manifest or the new one, never a mix.
+"""
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-publisher deployments only
+    fcntl = None
+
+from column_cache import map_cache, read_schema, write_columns
+from pipeline import Snapshot
+
+KEEP_MANIFESTS = 3
+
+
+class SharedDatasetStore:
+    """Directory-backed store of published snapshot chains"""
+
+    def __init__(self, root, keep_manifests=KEEP_MANIFESTS):
+        self.root = root
+        self.keep_manifests = keep_manifests
+        self._lock = threading.Lock()
+        self._seen = None
+        self._current_stat = None
+        self._mapped = {}
+        os.makedirs(os.path.join(root, 'versions'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'manifests'), exist_ok=True)
+
+    @property
+    def current_path(self):
+        return os.path.join(self.root, 'CURRENT')
+
+    def _version_dir(self, version):
+        return os.path.join(self.root, 'versions', version)
+
+    @contextmanager
+    def _publish_lock(self):
+        """Serialise publishers across threads and processes"""
+        with self._lock, open(os.path.join(self.root, 'LOCK'), 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def read_manifest(self):
+        """The current manifest, or None when nothing has been published"""
+        try:
+            with open(self.current_path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, snapshot):
+        """Write a snapshot and its ancestors (once each), then switch CURRENT to it"""
+        chain = []
+        node = snapshot
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+
+        with self._publish_lock():
+            for node in chain:
+                if read_schema(self._version_dir(node.version)) is None:
+                    write_columns(node.frame, self._version_dir(node.version),
+                                  stage=node.stage, version=node.version, params=node.params)
+
+            previous = self.read_manifest()
+            sequence = (previous['sequence'] + 1) if previous else 1
+            manifest = {
+                'sequence': sequence,
+                'head': snapshot.version,
+                'lineage': [{'stage': node.stage, 'version': node.version, 'params': node.params}
+                            for node in chain],
+            }
+            manifest_path = os.path.join(self.root, 'manifests', f"{sequence:012d}.json")
+            with open(manifest_path, 'w', encoding='utf-8') as handle:
+                json.dump(manifest, handle)
+            tmp_path = self.current_path + f".{os.getpid()}.tmp"
+            shutil.copyfile(manifest_path, tmp_path)
+            os.replace(tmp_path, self.current_path)
+            self._seen = sequence
+            self.collect_garbage()
+        return manifest
+
+    def _map_snapshot(self, entry, parent):
+        version = entry['version']
+        if version not in self._mapped:
+            directory = self._version_dir(version)
+            frame = map_cache(directory, read_schema(directory))
+            self._mapped[version] = Snapshot(frame, entry['stage'], version, parent=parent,
+                                             params=entry['params'])
+        return self._mapped[version]
+
+    def poll(self):
+        """Map the current snapshot chain if it changed since the last call, else None"""
+        try:
+            stat = os.stat(self.current_path)
+        except OSError:
+            return None
+        current_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if current_stat == self._current_stat:
+            return None
+        self._current_stat = current_stat
+        manifest = self.read_manifest()
+        if manifest is None or manifest['sequence'] == self._seen:
+            return None
+        with self._lock:
+            parent = None
+            chain = []
+            try:
+                for entry in manifest['lineage']:
+                    parent = self._map_snapshot(entry, parent)
+                    chain.append(parent)
+            except (OSError, TypeError):
+                # Collected by a newer publish while we read; retry on the next poll
+                self._current_stat = None
+                return None
+            self._seen = manifest['sequence']
+            live = {entry['version'] for entry in manifest['lineage']}
+            self._mapped = {version: snap for version, snap in self._mapped.items() if version in live}
+        return chain
+
+    def collect_garbage(self):
+        """Delete manifests and version directories no longer referenced by recent manifests"""
+        manifest_dir = os.path.join(self.root, 'manifests')
+        names = sorted(name for name in os.listdir(manifest_dir) if name.endswith('.json'))
+        for name in names[:-self.keep_manifests]:
+            os.remove(os.path.join(manifest_dir, name))
+        referenced = set()
+        for name in names[-self.keep_manifests:]:
+            with open(os.path.join(manifest_dir, name), encoding='utf-8') as handle:
+                referenced.update(entry['version'] for entry in json.load(handle)['lineage'])
+        version_root = os.path.join(self.root, 'versions')
+        for name in os.listdir(version_root):
+            if name not in referenced and not name.endswith('.tmp'):
+                # Readers that still map the old files keep them alive until they unmap
+                shutil.rmtree(os.path.join(version_root, name), ignore_errors=True)
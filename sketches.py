@@ -0,0 +1,214 @@
+"""Mergeable KLL quantile sketches for per-column quartiles at scale.
+
+A ``KLLSketch`` keeps a few hundred weighted samples per column no matter
+how many values it has seen. Sketches built over separate chunks can be
+merged, so large frames are sketched in parallel and streamed files are
+sketched chunk by chunk. ``KLLSketch.for_error(eps)`` sizes the sketch so
+the normalised rank error stays below ``eps`` with high probability
+(checked in ``tests/test_sketches.py``; ``benchmarks/bench_sketches.py``
+checks and times it at scale).
+
+For small inputs the exact NumPy path is used instead; see ``quartiles``.
+``sketch_frame`` sketches a frame's columns; the app builds it once per
+snapshot and answers large box plots from it.
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_ERROR = 0.01
+# Below this many values the exact (sorting) quantiles are cheap enough
+EXACT_MAX_ROWS = 1_000_000
+# Empirical KLL constant: rank error ~ ERROR_CONSTANT / k at ~99% confidence
+ERROR_CONSTANT = 3.0
+CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """KLL quantile sketch over float values (NaNs are ignored)"""
+
+    def __init__(self, k=200, seed=0):
+        self.k = int(k)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, eps=DEFAULT_ERROR, seed=0):
+        """Sketch sized for a normalised rank error of ``eps``"""
+        return cls(max(8, math.ceil(ERROR_CONSTANT / eps)), seed)
+
+    @property
+    def error_bound(self):
+        return ERROR_CONSTANT / self.k
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[:len(items) % 2]
+                offset = int(self._rng.integers(2))
+                promoted = items[len(keep) + offset::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Add an array of values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level)
+                                  for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Approximate values at the given quantiles in [0, 1]"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        items, cumulative = self._weighted()
+        targets = qs * cumulative[-1]
+        index = np.clip(np.searchsorted(cumulative, targets, side='left'), 0, len(items) - 1)
+        result = items[index]
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value):
+        """Approximate fraction of values <= ``value``"""
+        if self.count == 0:
+            return np.nan
+        items, cumulative = self._weighted()
+        position = np.searchsorted(items, value, side='right')
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def smallest_at_least(self, value):
+        """Smallest retained value >= ``value`` (exact when it is the minimum)"""
+        if self.min >= value:
+            return self.min
+        items = np.concatenate(self.levels)
+        items = items[items >= value]
+        return float(items.min()) if len(items) else np.nan
+
+    def largest_at_most(self, value):
+        """Largest retained value <= ``value`` (exact when it is the maximum)"""
+        if self.max <= value:
+            return self.max
+        items = np.concatenate(self.levels)
+        items = items[items <= value]
+        return float(items.max()) if len(items) else np.nan
+
+
+def sketch_values(values, eps=DEFAULT_ERROR, workers=4, chunk_rows=250_000):
+    """Sketch one array, building per-chunk sketches in parallel and merging them"""
+    values = np.asarray(values, dtype=np.float64)
+    starts = range(0, max(len(values), 1), chunk_rows)
+
+    def build(start):
+        return KLLSketch.for_error(eps, seed=start).update(values[start:start + chunk_rows])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(build, starts))
+    sketch = parts[0]
+    for part in parts[1:]:
+        sketch.merge(part)
+    return sketch
+
+
+def sketch_frame(frame, columns=None, eps=DEFAULT_ERROR, workers=4, chunk_rows=250_000):
+    """One merged sketch per numeric column of a frame (or per column of ``columns``)"""
+    numeric = frame.select_dtypes(include=[np.number])
+    if columns is not None:
+        numeric = numeric[list(columns)]
+    return {col: sketch_values(numeric[col].to_numpy(dtype=np.float64, na_value=np.nan),
+                               eps, workers, chunk_rows)
+            for col in numeric.columns}
+
+
+def quartiles(values, sketch=None, eps=DEFAULT_ERROR, exact_max_rows=EXACT_MAX_ROWS):
+    """Q1, median and Q3 of an array.
+
+    Exact (linear interpolation, like ``np.percentile``) for inputs up to
+    ``exact_max_rows`` values; otherwise answered from ``sketch`` or from
+    a sketch built on the fly. NaN for an array without values.
+    """
+    if sketch is None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return (np.nan, np.nan, np.nan)
+        if len(values) <= exact_max_rows:
+            return tuple(float(v) for v in np.percentile(values, [25, 50, 75]))
+        sketch = sketch_values(values, eps)
+    return tuple(float(v) for v in sketch.quantiles([0.25, 0.5, 0.75]))
+
+
+def box_plot_stats(values=None, sketch=None, whisker=1.5, **kwargs):
+    """Quartiles, IQR bounds and whiskers; ``values`` may be None when a sketch is given.
+
+    Every statistic is None when ``values`` holds no (non-NaN) value.
+    """
+    if values is not None:
+        values = np.asarray(values, dtype=np.float64)
+        if np.isnan(values).all():
+            stats = dict.fromkeys(('q1', 'q2', 'q3', 'iqr', 'lower_bound', 'upper_bound'))
+            return dict(stats, whiskers={'lower': None, 'upper': None})
+    q1, q2, q3 = quartiles(values, sketch=sketch, **kwargs)
+    iqr = q3 - q1
+    lower_bound = q1 - whisker * iqr
+    upper_bound = q3 + whisker * iqr
+    if values is not None:
+        lower = float(np.min(values[values >= lower_bound]))
+        upper = float(np.max(values[values <= upper_bound]))
+    else:
+        lower = sketch.smallest_at_least(lower_bound)
+        upper = sketch.largest_at_most(upper_bound)
+    return {
+        'q1': q1,
+        'q2': q2,
+        'q3': q3,
+        'iqr': iqr,
+        'lower_bound': lower_bound,
+        'upper_bound': upper_bound,
+        'whiskers': {'lower': lower, 'upper': upper}
+    }
@@ -0,0 +1,318 @@
+"""Out-of-core, single-pass ingest for CSV files larger than memory.
+
+``stream_csv`` reads the file in chunks sized from a memory budget and, in
+one pass over the CSV, collects everything the dashboard's read endpoints
+need: row and null counts, SalePrice moments and extremes, the
+correlation sufficient statistics and a KLL quantile sketch per numeric
+column. SalePrice itself is spilled to a
+temporary memory-mapped file so the median, quartiles and the histogram
+can be computed exactly afterwards by scanning that file in bounded
+chunks, without ever holding the full column (or the CSV) in memory.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from correlation import CorrelationStats
+from sketches import DEFAULT_ERROR, EXACT_MAX_ROWS, KLLSketch
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+SAMPLE_ROWS = 1000
+# Parsed chunks need roughly this many times their final size while parsing
+PARSE_OVERHEAD = 4
+
+
+def chunk_rows_for_budget(path, memory_budget_mb, **read_csv_kwargs):
+    """Estimate how many CSV rows fit in the memory budget at once"""
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, **read_csv_kwargs)
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    budget = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget / (bytes_per_row * PARSE_OVERHEAD)))
+
+
+class SpilledColumn:
+    """Append-only float64 column backed by a temporary file.
+
+    The file is deleted with the summary that owns it, so a pickle carries
+    the values and unpickling spills them to a new temporary file.
+    """
+
+    def __init__(self, directory=None):
+        handle, self.path = tempfile.mkstemp(suffix='.f64', dir=directory)
+        os.close(handle)
+        self.length = 0
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        with open(self.path, 'ab') as handle:
+            handle.write(values.tobytes())
+        self.length += len(values)
+
+    def chunks(self, chunk_rows):
+        """Iterate over the column in bounded slices of a read-only memory map"""
+        if self.length == 0:
+            return
+        values = np.memmap(self.path, dtype=np.float64, mode='r', shape=(self.length,))
+        for start in range(0, self.length, chunk_rows):
+            yield values[start:start + chunk_rows]
+
+    def __getstate__(self):
+        return {'values': np.fromfile(self.path, dtype=np.float64, count=self.length)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.append(state['values'])
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _rank_by_distinct_values(column, rank, low, high, chunk_rows):
+    """Rank lookup inside a range that holds only a few distinct values"""
+    totals = {}
+    for chunk in column.chunks(chunk_rows):
+        values, counts = np.unique(chunk[(chunk >= low) & (chunk <= high)], return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            totals[value] = totals.get(value, 0) + count
+    seen = 0
+    for value in sorted(totals):
+        seen += totals[value]
+        if rank < seen:
+            return float(value)
+    return float(high)
+
+
+def kth_smallest(column, k, low, high, chunk_rows, bins=4096):
+    """Exact k-th smallest value (0-based) of a spilled column.
+
+    Repeatedly histograms the values inside [low, high] and narrows to the
+    bin that holds rank ``k`` until the bin is small enough to sort.
+    """
+    below = 0  # values known to be smaller than ``low``
+    while True:
+        edges = np.linspace(low, high, bins + 1)
+        counts = np.zeros(bins, dtype=np.int64)
+        for chunk in column.chunks(chunk_rows):
+            counts += np.histogram(chunk[(chunk >= low) & (chunk <= high)], bins=edges)[0]
+        cumulative = np.cumsum(counts)
+        target = int(np.searchsorted(cumulative, k - below, side='right'))
+        last = target == bins - 1
+        bin_low, bin_high = edges[target], edges[target + 1]
+        new_high = bin_high if last else np.nextafter(bin_high, -np.inf)
+        if (bin_low, new_high) == (low, high) or new_high < bin_low:
+            # The range is down to a handful of floats; count them directly
+            return _rank_by_distinct_values(column, k - below, low, high, chunk_rows)
+        below += int(cumulative[target - 1]) if target > 0 else 0
+        if counts[target] <= chunk_rows:
+            selected = []
+            for chunk in column.chunks(chunk_rows):
+                selected.append(chunk[(chunk >= bin_low) & (chunk <= new_high)])
+            values = np.sort(np.concatenate(selected))
+            return float(values[k - below])
+        low, high = bin_low, new_high
+
+
+class StreamSummary:
+    """Aggregates collected by one pass over a CSV"""
+
+    def __init__(self, columns, rows, null_counts, price, correlation_stats, sketches,
+                 chunk_rows, chunks, seconds):
+        self.columns = columns
+        self.rows = rows
+        self.null_counts = null_counts
+        self.price = price
+        self.correlation_stats = correlation_stats
+        self.sketches = sketches
+        self.chunk_rows = chunk_rows
+        self.chunks = chunks
+        self.seconds = seconds
+        self._quantiles = {}
+
+    def price_quantile(self, q):
+        """Exact linear-interpolated quantile of SalePrice, like ``np.percentile``"""
+        if q not in self._quantiles:
+            column, count = self.price['column'], self.price['count']
+            position = q * (count - 1)
+            lower, upper = int(np.floor(position)), int(np.ceil(position))
+            args = (self.price['min'], self.price['max'], self.chunk_rows)
+            low_value = kth_smallest(column, lower, *args)
+            high_value = low_value if upper == lower else kth_smallest(column, upper, *args)
+            self._quantiles[q] = low_value + (high_value - low_value) * (position - lower)
+        return self._quantiles[q]
+
+    def price_histogram(self, bins=20):
+        """Histogram of SalePrice over [min, max], like ``np.histogram``"""
+        edges = np.histogram_bin_edges([self.price['min'], self.price['max']], bins=bins)
+        counts = np.zeros(bins, dtype=np.int64)
+        for chunk in self.price['column'].chunks(self.chunk_rows):
+            counts += np.histogram(chunk, bins=edges)[0]
+        return counts, edges
+
+    def price_box_plot(self, whisker=1.5):
+        """Box-plot statistics of SalePrice, like ``/api/box-plot-data``.
+
+        Quartiles are exact up to ``EXACT_MAX_ROWS`` prices and come from the
+        KLL sketch above that; whiskers and outliers are exact either way,
+        from one scan of the spilled column.
+        """
+        if self.price['count'] <= EXACT_MAX_ROWS:
+            q1, q2, q3 = (self.price_quantile(q) for q in (0.25, 0.5, 0.75))
+        else:
+            q1, q2, q3 = (float(v) for v in self.sketches['SalePrice'].quantiles([0.25, 0.5, 0.75]))
+        iqr = q3 - q1
+        lower_bound = q1 - whisker * iqr
+        upper_bound = q3 + whisker * iqr
+        lower, upper, outliers = np.inf, -np.inf, []
+        for chunk in self.price['column'].chunks(self.chunk_rows):
+            inside = chunk[(chunk >= lower_bound) & (chunk <= upper_bound)]
+            if len(inside):
+                lower = min(lower, float(inside.min()))
+                upper = max(upper, float(inside.max()))
+            outliers.append(chunk[(chunk < lower_bound) | (chunk > upper_bound)])
+        return {
+            'q1': q1,
+            'q2': q2,
+            'q3': q3,
+            'iqr': iqr,
+            'lower_bound': lower_bound,
+            'upper_bound': upper_bound,
+            'outliers': np.concatenate(outliers) if outliers else np.empty(0),
+            'whiskers': {'lower': lower, 'upper': upper}
+        }
+
+    def price_std(self, ddof):
+        return float(np.sqrt(self.price['m2'] / (self.price['count'] - ddof)))
+
+    def data_summary(self):
+        """Same shape as ``get_data_summary()``"""
+        return {
+            'total_houses': self.rows,
+            'avg_price': f"${self.price['mean']:,.0f}",
+            'median_price': f"${self.price_quantile(0.5):,.0f}",
+            'price_std': f"${self.price_std(1):,.0f}",
+            'min_price': f"${self.price['min']:,.0f}",
+            'max_price': f"${self.price['max']:,.0f}",
+            'columns': list(self.columns),
+            'shape': (self.rows, len(self.columns))
+        }
+
+    def missing_data(self):
+        """Same shape as ``get_missing_data()``"""
+        missing_data = [
+            {
+                'feature': col,
+                'missing': int(count),
+                'percentage': round((count / self.rows) * 100, 1)
+            }
+            for col, count in self.null_counts.items() if count > 0
+        ]
+        return sorted(missing_data, key=lambda x: x['missing'], reverse=True)
+
+    def price_distribution(self, bins=20):
+        """Histogram and stats of ``/api/price-distribution``, without the raw prices"""
+        hist, bin_edges = self.price_histogram(bins)
+        bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+        return {
+            'histogram': {
+                'counts': hist,
+                'bins': bin_centers,
+                'bin_edges': bin_edges
+            },
+            'stats': {
+                'mean': float(self.price['mean']),
+                'median': float(self.price_quantile(0.5)),
+                'std': self.price_std(0),
+                'min': float(self.price['min']),
+                'max': float(self.price['max'])
+            }
+        }
+
+    def info(self):
+        return {
+            'rows': self.rows,
+            'columns': len(self.columns),
+            'chunk_rows': self.chunk_rows,
+            'chunks': self.chunks,
+            'seconds': round(self.seconds, 6)
+        }
+
+    def close(self):
+        self.price['column'].close()
+
+    def __del__(self):
+        self.close()
+
+
+def stream_csv(path, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, price_column='SalePrice',
+               spill_dir=None, sketch_error=DEFAULT_ERROR, **read_csv_kwargs):
+    """Read a CSV in budget-sized chunks and collect the dashboard aggregates in one pass"""
+    started = time.perf_counter()
+    chunk_rows = chunk_rows_for_budget(path, memory_budget_mb, **read_csv_kwargs)
+
+    columns = None
+    numeric_columns = None
+    null_counts = None
+    stats = None
+    sketches = {}
+    rows = 0
+    chunks = 0
+    price = {'column': SpilledColumn(spill_dir), 'count': 0, 'mean': 0.0, 'm2': 0.0,
+             'min': np.inf, 'max': -np.inf}
+
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, **read_csv_kwargs):
+        chunks += 1
+        rows += len(chunk)
+        nulls = chunk.isnull().sum()
+        if columns is None:
+            columns = list(chunk.columns)
+            numeric_columns = list(chunk.select_dtypes(include=[np.number]).columns)
+            null_counts = pd.Series(0, index=columns, dtype=np.int64)
+        null_counts += nulls
+
+        # A column that was all-null in the first chunk parses as float; drop it
+        # from the numeric set once a later chunk shows it holds text
+        not_numeric = [col for col in numeric_columns
+                       if chunk[col].dtype.kind not in 'biuf' and nulls[col] < len(chunk)]
+        if not_numeric:
+            numeric_columns = [col for col in numeric_columns if col not in not_numeric]
+            if stats is not None:
+                stats = stats.subset(numeric_columns)
+            for col in not_numeric:
+                sketches.pop(col, None)
+
+        numeric = chunk[numeric_columns]
+        if stats is None:
+            stats = CorrelationStats.from_frame(numeric)
+        else:
+            stats.append(numeric)
+        for col in numeric_columns:
+            if col not in sketches:
+                sketches[col] = KLLSketch.for_error(sketch_error)
+            sketches[col].update(numeric[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+        prices = numeric[price_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        prices = prices[~np.isnan(prices)]
+        if len(prices):
+            # Chan et al. parallel update of the running mean and M2
+            count = len(prices)
+            mean = prices.mean()
+            m2 = ((prices - mean) ** 2).sum()
+            total = price['count'] + count
+            delta = mean - price['mean']
+            price['m2'] += m2 + delta * delta * price['count'] * count / total
+            price['mean'] += delta * count / total
+            price['count'] = total
+            price['min'] = min(price['min'], prices.min())
+            price['max'] = max(price['max'], prices.max())
+            price['column'].append(prices)
+
+    return StreamSummary(columns or [], rows, null_counts, price, stats, sketches,
+                         chunk_rows, chunks, time.perf_counter() - started)
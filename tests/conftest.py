@@ -0,0 +1,24 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules live at the repository root, next to app.py
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """Flask test client of the dashboard after process-all, run from a scratch directory holding the Ames data"""
+    workdir = tmp_path_factory.mktemp('app')
+    shutil.copy(os.path.join(ROOT, 'data (1).csv'), workdir / 'data.csv')
+    with pytest.MonkeyPatch.context() as patch:
+        # DATA_PATH and the column cache are relative to the working directory
+        patch.chdir(workdir)
+        import app
+        with app.app.test_client() as client:
+            assert 'error' not in client.get('/api/process-all').get_json()
+            yield client
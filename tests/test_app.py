@@ -0,0 +1,95 @@
+"""Dashboard endpoints through the Flask test client (see the ``client`` fixture)"""
+import json
+
+import numpy as np
+import pytest
+
+# Above every Ames sale, so the filter keeps no rows
+NO_SALES = 'SalePrice>10000000'
+
+
+@pytest.mark.parametrize('path', ['/api/price-distribution', '/api/box-plot-data',
+                                  '/api/market-trends', '/api/market-trends?by=Neighborhood'])
+def test_empty_filter_gives_empty_stats(client, path):
+    separator = '&' if '?' in path else '?'
+    response = client.get(f'{path}{separator}filter={NO_SALES}')
+    assert response.status_code == 200
+    payload = response.get_json()
+    if path == '/api/price-distribution':
+        assert payload['histogram']['counts'] == []
+        assert set(payload['stats'].values()) == {None}
+    elif path == '/api/box-plot-data':
+        assert payload['q1'] is None and payload['whiskers'] == {'lower': None, 'upper': None}
+        assert payload['outliers'] == []
+    else:
+        assert payload['periods'] == []
+
+
+def strict_json(response):
+    """Response body parsed as standard JSON, which has no NaN or Infinity"""
+    def reject(token):
+        raise ValueError(f'{token} is not JSON')
+    return json.loads(response.data, parse_constant=reject)
+
+
+def test_market_trends_by_group_is_strict_json(client):
+    # Months without sales in a neighborhood have no mean or median
+    payload = strict_json(client.get('/api/market-trends?by=Neighborhood&stat=median,mean,count'))
+    assert None in payload['stats']['mean'][0]
+
+
+def test_groupby_single_row_group_std_is_null(client):
+    payload = strict_json(client.get('/api/groupby?by=YearBuilt&stat=std,count&stage=load'))
+    stats = payload['stats']
+    single = [std for std, count in zip(stats['std'], stats['count']) if count == 1]
+    assert single and all(std is None for std in single)
+    assert all(std is not None for std, count in zip(stats['std'], stats['count']) if count > 1)
+
+
+def test_model_search_resubmitted_after_appending_sales_is_a_new_job(client):
+    search = '/api/model-search?iqr_multipliers=3&alphas=10&folds=2&apply=0'
+    first = client.post(search).get_json()
+    assert client.post(search).get_json()['job_id'] == first['job_id']
+    sale = {'rows': [{'YrSold': 2010, 'MoSold': 12, 'SalePrice': 180000}]}
+    assert client.post('/api/sales', json=sale).status_code == 200
+    again = client.post(search).get_json()
+    assert again['job_id'] != first['job_id'] and not again['deduplicated']
+
+
+@pytest.mark.parametrize('chart', ['heatmap', 'top-heatmap', 'regplot', 'boxplot'])
+def test_chart_defaults_render_after_feature_removal(client, chart):
+    # Feature selection drops some of the notebook's regplot features (e.g. WoodDeckSF)
+    assert 'WoodDeckSF' in client.get('/api/process-all').get_json()['feature_info']['removed_list']
+    response = client.get(f'/api/render/{chart}')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+
+
+def test_box_plot_at_scale_uses_the_cached_snapshot_sketch(client, monkeypatch):
+    import app
+    # Treat the Ames prices as too many for exact quartiles
+    monkeypatch.setattr(app, 'EXACT_MAX_ROWS', 100)
+    payload = client.get('/api/box-plot-data?stage=load').get_json()
+    snapshot = app.get_snapshot('load')
+    sketch = app.get_sketches(snapshot, ('SalePrice',))['SalePrice']
+    assert app.get_sketches(snapshot, ('SalePrice',))['SalePrice'] is sketch
+    assert payload['q2'] == sketch.quantiles([0.5])[0]
+    prices = snapshot.frame['SalePrice'].to_numpy(dtype=np.float64)
+    assert abs(np.mean(prices <= payload['q2']) - 0.5) < 0.02
+
+
+def test_feature_selection_reuses_the_snapshot_correlation_stats(client, monkeypatch):
+    import app
+    import feature_selection
+    client.get('/api/process-all')
+    trimmed = app.get_snapshot('outliers')
+    _, rescanned = app.remove_features(trimmed.frame)
+    app.get_correlation_stats(trimmed)
+
+    def rescan(frame):
+        raise AssertionError('select_features rescanned the frame')
+
+    monkeypatch.setattr(feature_selection.CorrelationStats, 'from_frame', rescan)
+    _, reused = app.feature_remover(trimmed)(trimmed.frame)
+    assert reused['removed_list'] == rescanned['removed_list']
+    assert reused['scores'].keys() == rescanned['scores'].keys()
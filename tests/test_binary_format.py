@@ -0,0 +1,27 @@
+"""Columnar binary payloads and their JSON fallback"""
+import json
+
+import numpy as np
+
+from binary_format import PREAMBLE, decode, encode, to_jsonable
+
+
+def strict_loads(text):
+    def reject(token):
+        raise ValueError(f'{token} is not JSON')
+    return json.loads(text, parse_constant=reject)
+
+
+def test_nonfinite_floats_are_null_in_json():
+    payload = {'std': float('nan'), 'max': np.float32('inf'), 'values': np.array([1.0, np.nan])}
+    assert strict_loads(json.dumps(to_jsonable(payload))) == {
+        'std': None, 'max': None, 'values': [1.0, None]}
+
+
+def test_nonfinite_floats_are_null_in_binary_header():
+    body = encode({'std': float('nan'), 'values': np.array([1.0, np.nan])})
+    _, _, length = PREAMBLE.unpack_from(body)
+    assert strict_loads(body[PREAMBLE.size:PREAMBLE.size + length])['meta']['std'] is None
+    # Float buffers keep NaN
+    values = decode(body)['values']
+    assert values[0] == 1.0 and np.isnan(values[1])
@@ -0,0 +1,67 @@
+"""CorrelationStats against pandas' pairwise DataFrame.corr()"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import CorrelationStats
+
+
+def make_frame(rows, seed, missing=0.15):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    frame = pd.DataFrame({
+        'a': base * 3 + 100,
+        'b': base + rng.normal(scale=0.5, size=rows),
+        'c': rng.normal(size=rows) * 1e4,
+        'd': rng.integers(0, 5, size=rows).astype(float),
+        'e': -base + rng.normal(scale=2.0, size=rows),
+    })
+    return frame.mask(rng.random(frame.shape) < missing)
+
+
+def assert_matches(stats, frame):
+    expected = frame.corr()
+    np.testing.assert_allclose(stats.corr().to_numpy(), expected.to_numpy(),
+                               rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_full_matrix_matches_pandas():
+    frame = make_frame(200, 1)
+    assert_matches(CorrelationStats.from_frame(frame), frame)
+
+
+def test_remove_matches_pandas():
+    frame = make_frame(200, 2)
+    stats = CorrelationStats.from_frame(frame)
+    removed = frame.index[::7]
+    stats.remove(frame.loc[removed])
+    assert_matches(stats, frame.drop(index=removed))
+
+
+def test_append_matches_pandas():
+    frame = make_frame(150, 3)
+    extra = make_frame(60, 4)
+    stats = CorrelationStats.from_frame(frame).append(extra)
+    assert_matches(stats, pd.concat([frame, extra], ignore_index=True))
+
+
+def test_constant_and_sparse_columns_are_undefined():
+    frame = make_frame(50, 5)
+    frame['d'] = 1.0
+    frame.loc[frame.index[2:], 'e'] = np.nan
+    stats = CorrelationStats.from_frame(frame)
+    result = stats.corr()
+    assert result.loc['d'].isna().all()
+    assert np.isnan(result.loc['a', 'e'])
+    assert_matches(stats, frame)
+
+
+@pytest.mark.parametrize('pool', [ThreadPoolExecutor, ProcessPoolExecutor])
+@pytest.mark.parametrize('block_columns', [1, 2])
+def test_blocked_products_match(pool, block_columns):
+    frame = make_frame(120, 6)
+    with pool(2) as executor:
+        stats = CorrelationStats.from_frame(frame, executor, block_columns)
+    assert_matches(stats, frame)
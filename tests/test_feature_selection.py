@@ -0,0 +1,56 @@
+"""VIF elimination against re-inverting the correlation matrix after every removal"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_selection import RIDGE, eliminate_by_vif
+
+AMES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data (1).csv')
+
+
+def naive_vif_elimination(corr, max_vif):
+    active = list(range(len(corr)))
+    dropped = []
+    while len(active) > 1:
+        sub = corr[np.ix_(active, active)] + RIDGE * np.eye(len(active))
+        vif = np.diagonal(np.linalg.inv(sub))
+        worst = int(np.argmax(vif))
+        if vif[worst] <= max_vif:
+            break
+        dropped.append(active.pop(worst))
+    return dropped
+
+
+def ames_numeric():
+    """Numeric Ames columns, median filled: GrLivArea and TotalBsmtSF are exact sums of others"""
+    numeric = pd.read_csv(AMES).select_dtypes(include=[np.number]).drop(columns='SalePrice')
+    return numeric.fillna(numeric.median())
+
+
+@pytest.mark.parametrize('max_vif', [10.0, 5.0, 2.5])
+def test_near_singular_ames_matches_reinverting(max_vif):
+    corr = ames_numeric().corr().to_numpy()
+    assert np.linalg.cond(corr) > 1e15
+    dropped, vif = eliminate_by_vif(corr, max_vif)
+    assert dropped == naive_vif_elimination(corr, max_vif)
+    kept = np.setdiff1d(np.arange(len(corr)), dropped)
+    assert vif[kept].max() <= max_vif
+
+
+def test_exact_sums_lose_one_member_each():
+    numeric = ames_numeric()
+    dropped, _ = eliminate_by_vif(numeric.corr().to_numpy(), 10.0)
+    names = {numeric.columns[i] for i in dropped}
+    assert len(names & {'GrLivArea', '1stFlrSF', '2ndFlrSF', 'LowQualFinSF'}) == 1
+    assert len(names & {'TotalBsmtSF', 'BsmtFinSF1', 'BsmtFinSF2', 'BsmtUnfSF'}) == 1
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_well_conditioned_matches_reinverting(seed):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(2000, 5))
+    values = factors @ rng.normal(size=(5, 40)) + rng.normal(size=(2000, 40))
+    corr = np.corrcoef(values, rowvar=False)
+    assert eliminate_by_vif(corr, 5.0)[0] == naive_vif_elimination(corr, 5.0)
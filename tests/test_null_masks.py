@@ -0,0 +1,31 @@
+"""Bit-packed null masks against pandas' isna()"""
+import numpy as np
+import pandas as pd
+
+from null_masks import NullMaskIndex, missing_report
+
+
+def make_frame(rows, seed=5):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({'a': rng.normal(size=rows), 'b': rng.normal(size=rows),
+                          'c': rng.normal(size=rows)})
+    frame = frame.mask(rng.random(frame.shape) < 0.2)
+    frame['d'] = frame['a']
+    return frame
+
+
+def test_report_matches_pandas():
+    frame = make_frame(300)
+    report = missing_report(NullMaskIndex.from_frame(frame))
+    missing = frame.isna()
+    incomplete = missing.any(axis=1)
+    assert report['complete_rows'] == int((~incomplete).sum())
+    assert report['distinct_patterns'] == len(missing[incomplete].drop_duplicates())
+    assert ['a', 'd'] in report['identical']
+
+
+def test_report_of_no_rows_has_no_patterns():
+    report = missing_report(NullMaskIndex.from_frame(make_frame(0)))
+    assert report['rows'] == 0
+    assert report['distinct_patterns'] == 0
+    assert report['patterns'] == []
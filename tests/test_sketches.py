@@ -0,0 +1,72 @@
+"""KLL sketch rank error against exact quantiles"""
+import numpy as np
+import pytest
+
+from sketches import KLLSketch, quartiles, sketch_values
+
+ROWS = 200_000
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def distribution(name, rows=ROWS, seed=7):
+    rng = np.random.default_rng(seed)
+    if name == 'normal':
+        return rng.normal(180000, 50000, rows)
+    if name == 'lognormal':
+        return rng.lognormal(12, 0.4, rows)
+    if name == 'codes':
+        return rng.integers(1, 11, rows).astype(np.float64)
+    return np.sort(rng.normal(size=rows))
+
+
+def rank_error(values, estimates, qs=QS):
+    """Distance from each target quantile to the rank interval of its estimate"""
+    ordered = np.sort(values)
+    low = np.searchsorted(ordered, estimates, side='left') / len(ordered)
+    high = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return float(np.max(np.maximum(0.0, np.maximum(low - qs, qs - high))))
+
+
+@pytest.mark.parametrize('name', ['normal', 'lognormal', 'codes', 'sorted'])
+@pytest.mark.parametrize('eps', [0.01, 0.05])
+def test_single_sketch_within_bound(name, eps):
+    values = distribution(name)
+    sketch = KLLSketch.for_error(eps).update(values)
+    assert sketch.count == len(values)
+    assert rank_error(values, sketch.quantiles(QS)) <= eps
+
+
+@pytest.mark.parametrize('name', ['normal', 'lognormal', 'codes', 'sorted'])
+def test_merged_chunk_sketches_within_bound(name):
+    eps = 0.02
+    values = distribution(name)
+    sketch = sketch_values(values, eps, workers=4, chunk_rows=15_000)
+    assert sketch.count == len(values)
+    assert sketch.min == values.min() and sketch.max == values.max()
+    assert rank_error(values, sketch.quantiles(QS)) <= eps
+
+
+def test_merge_keeps_bound_when_chunks_differ():
+    eps = 0.02
+    parts = [distribution('normal', 50_000, seed=1), distribution('lognormal', 80_000, seed=2),
+             distribution('codes', 30_000, seed=3) * 1e4]
+    sketch = KLLSketch.for_error(eps)
+    for seed, part in enumerate(parts):
+        sketch.merge(KLLSketch.for_error(eps, seed=seed).update(part))
+    values = np.concatenate(parts)
+    assert rank_error(values, sketch.quantiles(QS)) <= eps
+
+
+def test_rank_within_bound():
+    eps = 0.02
+    values = distribution('lognormal')
+    sketch = KLLSketch.for_error(eps).update(values)
+    probes = np.quantile(values, QS)
+    exact = np.searchsorted(np.sort(values), probes, side='right') / len(values)
+    estimated = np.array([sketch.rank(probe) for probe in probes])
+    assert np.max(np.abs(estimated - exact)) <= eps
+
+
+def test_quartiles_exact_below_threshold():
+    values = distribution('normal', 1000)
+    assert quartiles(values) == tuple(np.percentile(values, [25, 50, 75]))
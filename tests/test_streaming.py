@@ -0,0 +1,23 @@
+"""Single-pass CSV summaries against the in-memory results"""
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from streaming import stream_csv
+
+
+def test_pickled_summary_outlives_the_spilled_file(tmp_path):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({'SalePrice': rng.lognormal(12, 0.4, 5000),
+                          'GrLivArea': rng.normal(1500, 300, 5000)})
+    frame.to_csv(tmp_path / 'sales.csv', index=False)
+    summary = stream_csv(tmp_path / 'sales.csv', memory_budget_mb=1)
+    # Warm-start saves and dataset spills pickle the cached summary
+    restored = pickle.loads(pickle.dumps(summary))
+    summary.close()
+    assert restored.price['column'].path != summary.price['column'].path
+    prices = frame['SalePrice'].to_numpy()
+    assert restored.price_quantile(0.5) == np.median(prices)
+    counts, edges = restored.price_histogram()
+    np.testing.assert_array_equal(counts, np.histogram(prices, bins=20)[0])
@@ -0,0 +1,255 @@
+"""Rolling market statistics over the sale date (YrSold/MoSold).
+
+A ``SaleIndex`` buckets the sales of a snapshot by calendar month, and
+optionally by the groups of a categorical column. Bucket ``t * G + g``
+holds the sales of month ``start + t`` in group ``g``, and its values
+are kept sorted (``values``/``offsets``, like ``groups.sorted_segments``).
+Months without sales are empty buckets, so a window of months is a
+fixed set of buckets. The index also keeps per-month prefix sums of
+count and sum for every group.
+
+A rolling window then costs:
+
+* count (volume), sum and mean: a difference of two prefix rows, for
+  every window and group at once
+* quantiles (median, q1, q3, pNN): an order-statistic search. For each
+  window it bisects over the sorted values of the whole index, and
+  counts values at or below the candidate in each of the window's
+  buckets with a per-bucket binary search. Every window and group is
+  searched at once, in about log2(rows) x log2(bucket size) vectorised
+  steps, and no window's values are ever gathered or sorted.
+
+Quantiles use linear interpolation like ``np.percentile``. ``extend``
+appends later months of sales. It sorts only the new buckets and adds
+rows to the prefix sums; the existing buckets are untouched.
+"""
+import numpy as np
+import pandas as pd
+
+from groups import PERCENTILE, QUANTILES
+
+YEAR = 'YrSold'
+MONTH = 'MoSold'
+STATS = ('count', 'sum', 'mean', 'median', 'q1', 'q3')
+DEFAULT_STATS = ('median', 'mean', 'count')
+# Months per period
+FREQUENCIES = {'month': 1, 'quarter': 3}
+
+
+def sale_months(frame):
+    """Absolute month (``year * 12 + month - 1``) of every sale; -1 where unknown"""
+    years = frame[YEAR].to_numpy(dtype=np.float64, na_value=np.nan)
+    months = frame[MONTH].to_numpy(dtype=np.float64, na_value=np.nan)
+    result = np.full(len(frame), -1, dtype=np.int64)
+    valid = ~(np.isnan(years) | np.isnan(months)) & (months >= 1) & (months <= 12)
+    result[valid] = (years[valid] * 12 + months[valid] - 1).astype(np.int64)
+    return result
+
+
+def period_label(month, freq):
+    year, offset = divmod(int(month), 12)
+    if freq == 'quarter':
+        return f"{year}Q{offset // 3 + 1}"
+    return f"{year}-{offset + 1:02d}"
+
+
+def parse_stats(names):
+    """Validate statistic names (``STATS`` plus percentiles such as ``p90``)"""
+    names = list(names) or list(DEFAULT_STATS)
+    for name in names:
+        match = PERCENTILE.match(name)
+        if name not in STATS and not (match and 0 <= float(match.group(1)) <= 100):
+            raise ValueError(f"Unknown statistic {name}; use {', '.join(STATS)} or pNN")
+    return names
+
+
+def sort_buckets(bucket, values, buckets):
+    """Values sorted within each bucket (buckets in order) and the bucket sizes"""
+    by_value = np.argsort(values, kind='stable')
+    order = by_value[np.argsort(bucket[by_value], kind='stable')]
+    return values[order], np.bincount(bucket, minlength=buckets)
+
+
+class SaleIndex:
+    """Sales bucketed by (month, group) with sorted buckets and per-month prefix sums"""
+
+    def __init__(self, value, by, labels, start, values, offsets, counts, sums, ordered):
+        self.value = value
+        self.by = by
+        self.labels = list(labels)
+        self.start = start
+        self.values = values
+        self.offsets = offsets
+        # (months + 1, groups) running totals: row t covers months before start + t
+        self.count_prefix = counts
+        self.sum_prefix = sums
+        # Every value ascending: the search domain for order statistics
+        self.ordered = ordered
+
+    @property
+    def groups(self):
+        return len(self.labels)
+
+    @property
+    def months(self):
+        return len(self.count_prefix) - 1
+
+    @property
+    def nbytes(self):
+        return (self.values.nbytes + self.offsets.nbytes + self.count_prefix.nbytes
+                + self.sum_prefix.nbytes + self.ordered.nbytes)
+
+    def _rows(self, frame):
+        """Months, values and group codes of the frame's sales with every field present.
+
+        None when a group value is not one of the index's labels.
+        """
+        months = sale_months(frame)
+        values = frame[self.value].to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.by is None:
+            codes = np.zeros(len(frame), dtype=np.int64)
+        else:
+            column = frame[self.by]
+            present = column.notna().to_numpy()
+            codes = pd.Index(self.labels, dtype=object).get_indexer(column.astype(object))
+            codes = np.where(present, codes, -1)
+            if (present & (codes < 0)).any():
+                return None
+        keep = (months >= 0) & ~np.isnan(values) & (codes >= 0)
+        return months[keep], values[keep], codes[keep]
+
+    @classmethod
+    def from_frame(cls, frame, value='SalePrice', by=None):
+        """Index of a frame's sales of ``value``, split by the groups of ``by`` if given"""
+        labels = [None]
+        if by is not None:
+            column = frame[by]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                labels = column.cat.categories.tolist()
+            else:
+                labels = pd.Index(pd.unique(column.dropna())).sort_values().tolist()
+        index = cls(value, by, labels, 0, np.zeros(0), np.zeros(1, dtype=np.int64),
+                    np.zeros((1, len(labels))), np.zeros((1, len(labels))), np.zeros(0))
+        months, values, codes = index._rows(frame)
+        if len(months):
+            index.start = int(months.min())
+        return index._append(months, values, codes)
+
+    def extend(self, frame):
+        """Index with ``frame``'s sales appended, or None if they need a rebuild.
+
+        Only sales after the last indexed month, in known groups, can be
+        appended without touching the existing buckets.
+        """
+        rows = self._rows(frame)
+        if rows is None:
+            return None
+        months, values, codes = rows
+        if not self.months:
+            return SaleIndex.from_frame(frame, self.value, self.by)
+        if len(months) and months.min() < self.start + self.months:
+            return None
+        return SaleIndex(self.value, self.by, self.labels, self.start, self.values, self.offsets,
+                         self.count_prefix, self.sum_prefix, self.ordered)._append(
+                             months, values, codes)
+
+    def _append(self, months, values, codes):
+        """Add sales of months after the indexed ones (in place; returns self)"""
+        if not len(months):
+            return self
+        added = int(months.max()) - self.start + 1 - self.months
+        bucket = (months - self.start - self.months) * self.groups + codes
+        sorted_values, sizes = sort_buckets(bucket, values, added * self.groups)
+        self.values = np.concatenate([self.values, sorted_values])
+        self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(sizes)])
+        counts = sizes.reshape(added, self.groups)
+        sums = np.bincount(bucket, weights=values, minlength=added * self.groups).reshape(
+            added, self.groups)
+        self.count_prefix = np.vstack([self.count_prefix,
+                                       self.count_prefix[-1] + np.cumsum(counts, axis=0)])
+        self.sum_prefix = np.vstack([self.sum_prefix, self.sum_prefix[-1] + np.cumsum(sums, axis=0)])
+        new = np.sort(values)
+        self.ordered = np.insert(self.ordered, np.searchsorted(self.ordered, new), new)
+        return self
+
+    def windows(self, freq='month', window=1):
+        """``(period end months, first month offsets, last month offsets + 1)`` of full windows"""
+        step = FREQUENCIES[freq]
+        length = step * window
+        first_period = self.start - self.start % step
+        last = self.start + self.months - 1
+        ends = np.arange(first_period + length - 1, last - last % step + step, step)
+        low = np.clip(ends - length + 1 - self.start, 0, self.months)
+        high = np.clip(ends + 1 - self.start, 0, self.months)
+        return ends, low, high
+
+    def _count_at_most(self, buckets, x):
+        """Values ``<= x`` (one per query) summed over each query's buckets (-1 = none)"""
+        valid = buckets >= 0
+        safe = np.where(valid, buckets, 0)
+        first = np.where(valid, self.offsets[safe], 0)
+        low, high = first.copy(), np.where(valid, self.offsets[safe + 1], 0)
+        largest = int((high - low).max()) if high.size else 0
+        limit = max(len(self.values) - 1, 0)
+        for _ in range(int(largest).bit_length()):
+            middle = (low + high) // 2
+            active = low < high
+            below = active & (self.values[np.minimum(middle, limit)] <= x[:, None])
+            low = np.where(below, middle + 1, low)
+            high = np.where(active & ~below, middle, high)
+        return (low - first).sum(axis=1)
+
+    def order_statistics(self, buckets, ranks):
+        """Value at zero-based ``ranks`` within the union of each query's buckets"""
+        low = np.zeros(len(ranks), dtype=np.int64)
+        high = np.full(len(ranks), max(len(self.ordered) - 1, 0), dtype=np.int64)
+        for _ in range(max(len(self.ordered), 1).bit_length()):
+            middle = (low + high) // 2
+            enough = self._count_at_most(buckets, self.ordered[middle]) >= ranks + 1
+            high = np.where(enough, middle, high)
+            low = np.where(enough, low, middle + 1)
+        return self.ordered[low]
+
+    def rolling(self, freq='month', window=1, stats=DEFAULT_STATS):
+        """Statistics of every full rolling window, as ``(period labels, {stat: (groups, periods)})``"""
+        ends, low, high = self.windows(freq, window)
+        counts = (self.count_prefix[high] - self.count_prefix[low]).T
+        sums = (self.sum_prefix[high] - self.sum_prefix[low]).T
+        result = {}
+        queries = None
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name in stats:
+                if name == 'count':
+                    result[name] = counts.astype(np.int64)
+                elif name == 'sum':
+                    result[name] = sums
+                elif name == 'mean':
+                    result[name] = sums / counts
+                else:
+                    if queries is None:
+                        # Buckets of every (group, window) query, padded with -1
+                        span = int((high - low).max()) if len(ends) else 0
+                        months = low[:, None] + np.arange(span)
+                        buckets = np.where(months < high[:, None], months * self.groups, -1)
+                        queries = (buckets[None, :, :] + np.arange(self.groups)[:, None, None])
+                        # Explicit shape: no windows (e.g. no sales) leaves nothing to infer from
+                        queries = np.where(buckets[None, :, :] >= 0, queries, -1).reshape(
+                            self.groups * len(ends), span)
+                    q = QUANTILES[name] if name in QUANTILES else \
+                        float(PERCENTILE.match(name).group(1)) / 100
+                    result[name] = self._quantile(queries, counts.ravel(), q).reshape(counts.shape)
+        return [period_label(end, freq) for end in ends], result
+
+    def _quantile(self, buckets, counts, q):
+        result = np.full(len(counts), np.nan)
+        present = counts > 0
+        if not present.any():
+            return result
+        position = q * (counts[present] - 1)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, counts[present].astype(np.int64) - 1)
+        values = self.order_statistics(np.concatenate([buckets[present], buckets[present]]),
+                                       np.concatenate([below, above]))
+        low, high = values[:len(below)], values[len(below):]
+        result[present] = low + (high - low) * (position - below)
+        return result